@@ -100,12 +100,26 @@ class CompilerArgs(T.MutableSequence[str]):
         self._container: T.List[str] = list(iterable) if iterable is not None else []
         self.pre: T.Deque[str] = collections.deque()
         self.post: T.Deque[str] = collections.deque()
+        # All distinct arguments in _container, pre and post, so that unique
+        # arguments can be looked up without scanning the lists. It is built
+        # on demand, and dropped by operations that may remove arguments.
+        self._index: T.Optional[T.Set[str]] = None
+
+    def _get_index(self) -> T.Set[str]:
+        if self._index is None:
+            self._index = set(self._container)
+            self._index.update(self.pre)
+            self._index.update(self.post)
+        return self._index
 
     # Flush the saved pre and post list into the _container list
     #
     # This correctly deduplicates the entries after _can_dedup definition
     # Note: This function is designed to work without delete operations, as deletions are worsening the performance a lot.
+    # Flushing never changes the set of distinct arguments, so _index stays valid.
     def flush_pre_post(self) -> None:
+        if not self.pre and not self.post:
+            return
         new: T.List[str] = []
         pre_flush_set: T.Set[str] = set()
         post_flush: T.Deque[str] = collections.deque()
@@ -113,26 +127,23 @@ class CompilerArgs(T.MutableSequence[str]):
 
         #The two lists are here walked from the front to the back, in order to not need removals for deduplication
         for a in self.pre:
-            dedup = self._can_dedup(a)
             if a not in pre_flush_set:
                 new.append(a)
-                if dedup is Dedup.OVERRIDDEN:
+                if self._can_dedup(a) is Dedup.OVERRIDDEN:
                     pre_flush_set.add(a)
         for a in reversed(self.post):
-            dedup = self._can_dedup(a)
             if a not in post_flush_set:
                 post_flush.appendleft(a)
-                if dedup is Dedup.OVERRIDDEN:
+                if self._can_dedup(a) is Dedup.OVERRIDDEN:
                     post_flush_set.add(a)
 
         #pre and post will overwrite every element that is in the container
         #only copy over args that are in _container but not in the post flush or pre flush set
-        if pre_flush_set or post_flush_set:
-            for a in self._container:
-                if a not in post_flush_set and a not in pre_flush_set:
-                    new.append(a)
-        else:
+        overridden = pre_flush_set | post_flush_set
+        if overridden.isdisjoint(self._container):
             new.extend(self._container)
+        else:
+            new.extend([a for a in self._container if a not in overridden])
         new.extend(post_flush)
 
         self._container = new
@@ -166,10 +177,12 @@ class CompilerArgs(T.MutableSequence[str]):
     def __setitem__(self, index: T.Union[int, slice], value: T.Union[str, T.Iterable[str]]) -> None:  # noqa: F811
         self.flush_pre_post()
         self._container[index] = value  # type: ignore  # TODO: fix 'Invalid index type' and 'Incompatible types in assignment' errors
+        self._index = None
 
     def __delitem__(self, index: T.Union[int, slice]) -> None:
         self.flush_pre_post()
         del self._container[index]
+        self._index = None
 
     def __len__(self) -> int:
         return len(self._container) + len(self.pre) + len(self.post)
@@ -177,6 +190,8 @@ class CompilerArgs(T.MutableSequence[str]):
     def insert(self, index: int, value: str) -> None:
         self.flush_pre_post()
         self._container.insert(index, value)
+        if self._index is not None:
+            self._index.add(value)
 
     def copy(self) -> 'CompilerArgs':
         self.flush_pre_post()
@@ -220,7 +235,25 @@ class CompilerArgs(T.MutableSequence[str]):
     def _should_prepend(cls, arg: str) -> bool:
         return arg.startswith(cls.prepend_prefixes)
 
+    @classmethod
+    @lru_cache(maxsize=None)
+    def _classify(cls, arg: str) -> T.Tuple[Dedup, bool]:
+        """How to de-dup the argument, and whether it is prepended."""
+        return cls._can_dedup(arg), cls._should_prepend(arg)
+
+    def _native_list(self, container: T.List[str]) -> T.List[str]:
+        # The returned list is handed out to callers that may mutate it, which
+        # would leave _index stale if it were _container itself.
+        args = self.compiler.unix_args_to_native(container)
+        if args is container:
+            args = args.copy()
+        return args
+
     def to_native(self, copy: bool = False) -> T.List[str]:
+        '''Return the arguments in the native syntax of the compiler.
+
+        The result is always a new list, which the caller may mutate.
+        '''
         # Check if we need to add --start/end-group for circular dependencies
         # between static libraries, and for recursively searching for symbols
         # needed by static libraries that are provided by object files or
@@ -230,7 +263,7 @@ class CompilerArgs(T.MutableSequence[str]):
             new = self.copy()
         else:
             new = self
-        return self.compiler.unix_args_to_native(new._container)
+        return self._native_list(new._container)
 
     def append_direct(self, arg: str) -> None:
         '''
@@ -243,6 +276,8 @@ class CompilerArgs(T.MutableSequence[str]):
             self.append(arg)
         else:
             self._container.append(arg)
+            if self._index is not None:
+                self._index.add(arg)
 
     def extend_direct(self, iterable: T.Iterable[str]) -> None:
         '''
@@ -279,20 +314,28 @@ class CompilerArgs(T.MutableSequence[str]):
         tmp_pre: T.Deque[str] = collections.deque()
         if not isinstance(args, collections.abc.Iterable):
             raise TypeError(f'can only concatenate Iterable[str] (not "{args}") to CompilerArgs')
+        index = self._index
         for arg in args:
             # If the argument can be de-duped, do it either by removing the
             # previous occurrence of it and adding a new one, or not adding the
             # new occurrence.
-            dedup = self._can_dedup(arg)
+            dedup, prepend = self._classify(arg)
             if dedup is Dedup.UNIQUE:
+                if index is None:
+                    index = self._get_index()
                 # Argument already exists and adding a new instance is useless
-                if arg in self._container or arg in self.pre or arg in self.post:
+                if arg in index:
                     continue
-            if self._should_prepend(arg):
+            if prepend:
                 tmp_pre.appendleft(arg)
             else:
                 self.post.append(arg)
+                if index is not None:
+                    index.add(arg)
         self.pre.extendleft(tmp_pre)
+        if index is not None:
+            # Arguments to prepend only count once all of them are added
+            index.update(tmp_pre)
         #pre and post is going to be merged later before a iter call
         return self
 
@@ -0,0 +1,101 @@
+# SPDX-License-Identifier: Apache-2.0
+# Copyright 2025 The Meson development team
+
+"""An on disk cache of parsed build files.
+
+Every reconfigure evaluates all build files again, but usually only a few of
+them have changed since the last run. Their parsed trees are therefore
+stored in the private directory of the build directory, and loaded instead
+of parsing the file again as long as neither its contents nor the Meson
+version have changed.
+
+There is a single entry per file, named after the hash of its path, which is
+replaced whenever the file changes, so the cache does not grow over time.
+Files whose parsing emitted warnings are never stored, as loading them from
+the cache would lose the warnings.
+"""
+
+from __future__ import annotations
+
+import gc
+import hashlib
+import os
+import pickle
+import tempfile
+import typing as T
+from functools import lru_cache
+
+from . import mlog, mparser
+from .coredata import version as meson_version
+
+
+class ASTCache:
+
+    def __init__(self, cache_dir: str):
+        self.cache_dir = cache_dir
+
+    def _path(self, filename: str) -> str:
+        key = hashlib.sha256(filename.encode('utf-8')).hexdigest()
+        return os.path.join(self.cache_dir, key + '.dat')
+
+    def parse(self, code: str, filename: str) -> mparser.CodeBlockNode:
+        """Parse the code of a build file, or load it from the cache.
+
+        :param code: The contents of the build file
+        :param filename: The file name used in the nodes and error messages
+        :return: The parsed code block
+        """
+        digest = hashlib.sha256(code.encode('utf-8')).hexdigest()
+        # The project tests lex additional keywords
+        header = (meson_version, 'MESON_RUNNING_IN_PROJECT_TESTS' in os.environ, filename, digest)
+        fname = self._path(filename)
+        try:
+            with open(fname, 'rb') as f:
+                if pickle.load(f) == header:
+                    return self._load_tree(f)
+        except FileNotFoundError:
+            pass
+        except (OSError, pickle.UnpicklingError, EOFError, AttributeError, ImportError, TypeError) as e:
+            mlog.debug(f'Ignoring unreadable AST cache entry {fname}: {e}')
+
+        warnings = mlog.get_warning_count()
+        ast = mparser.Parser(code, filename).parse()
+        if mlog.get_warning_count() == warnings:
+            self.store(fname, header, ast)
+        return ast
+
+    @staticmethod
+    def _load_tree(f: T.BinaryIO) -> mparser.CodeBlockNode:
+        # A tree consists of many small objects, creating them is a lot
+        # faster without the garbage collector running in between
+        enabled = gc.isenabled()
+        gc.disable()
+        try:
+            return T.cast('mparser.CodeBlockNode', pickle.load(f))
+        finally:
+            if enabled:
+                gc.enable()
+
+    def store(self, fname: str, header: T.Tuple[str, bool, str, str], ast: mparser.CodeBlockNode) -> None:
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            fd, tmpname = tempfile.mkstemp(dir=self.cache_dir, suffix='.tmp')
+        except OSError as e:
+            mlog.debug(f'Could not write AST cache entry {fname}: {e}')
+            return
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                pickle.dump(header, f)
+                pickle.dump(ast, f)
+            os.replace(tmpname, fname)
+        except (OSError, pickle.PicklingError, RecursionError) as e:
+            mlog.debug(f'Could not write AST cache entry {fname}: {e}')
+            try:
+                os.unlink(tmpname)
+            except OSError:
+                pass
+
+
+@lru_cache(maxsize=None)
+def get_ast_cache(cache_dir: str) -> ASTCache:
+    return ASTCache(cache_dir)
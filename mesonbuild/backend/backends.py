@@ -210,6 +210,8 @@ class TestSerialisation:
     depends: T.List[str]
     version: str
     verbose: bool
+    cpu_weight: int = 1
+    memory: int = 0
 
     def __post_init__(self) -> None:
         if self.exe_wrapper is not None:
@@ -1310,7 +1312,7 @@ class Backend:
                                    isinstance(exe, build.Executable),
                                    [x.get_id() for x in depends],
                                    self.environment.coredata.version,
-                                   t.verbose)
+                                   t.verbose, t.cpu_weight, t.memory)
             arr.append(ts)
         return arr
 
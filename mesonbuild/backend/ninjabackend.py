@@ -5,17 +5,22 @@
 from __future__ import annotations
 
 from collections import OrderedDict
+from contextlib import contextmanager
 from dataclasses import dataclass
 from enum import Enum, unique
 from functools import lru_cache
 from pathlib import PurePath, Path
 from textwrap import dedent
+import hashlib
+import io
 import itertools
 import json
 import os
 import pickle
 import re
+import shutil
 import subprocess
+import tempfile
 import typing as T
 
 from . import backends
@@ -24,6 +29,7 @@ from .. import environment, mesonlib
 from .. import build
 from .. import mlog
 from .. import compilers
+from .. import profiler
 from ..arglist import CompilerArgs
 from ..compilers import Compiler
 from ..linkers import ArLikeLinker, RSPFileSyntax
@@ -122,6 +128,13 @@ raw_names = {'DEPFILE_UNQUOTED', 'DESC', 'pool', 'description', 'targetdep', 'dy
 NINJA_QUOTE_BUILD_PAT = re.compile(r"[$ :\n]")
 NINJA_QUOTE_VAR_PAT = re.compile(r"[$ \n]")
 
+# Size of the write buffer for build.ninja, which is written in many small
+# chunks and can grow to hundreds of megabytes for large projects.
+NINJA_WRITE_BUFFER_SIZE = 1024 * 1024
+
+# The same paths and arguments are quoted over and over again for every
+# source of a target, so remember the most recent results.
+@lru_cache(maxsize=65536)
 def ninja_quote(text: str, is_build_line: bool = False) -> str:
     if '\n' in text:
         errmsg = f'''Ninja does not support newlines in rules. The content was:
@@ -137,6 +150,10 @@ Please report this error with a test case to the Meson bug tracker.'''
 
     return text
 
+@lru_cache(maxsize=65536)
+def ninja_quote_arg(arg: str, qf: T.Callable[[str], str]) -> str:
+    return ninja_quote(qf(arg))
+
 
 @dataclass
 class TargetDependencyScannerInfo:
@@ -185,6 +202,22 @@ class NinjaComment:
             outfile.write('\n')
         outfile.write('\n')
 
+@dataclass
+class NinjaVariable:
+
+    """A top level variable holding command line arguments.
+
+    Its value is quoted the same way as the arguments of a build statement
+    that doesn't use a response file.
+    """
+
+    name: str
+    value: T.List[str]
+
+    def write(self, outfile: T.TextIO) -> None:
+        value = ' '.join([ninja_quote(i) if i == '&&' else ninja_quote_arg(i, quote_func) for i in self.value])
+        outfile.write(f'{self.name} = {value}\n\n')
+
 class NinjaRule:
     def __init__(self, rule: str, command: CommandArgOrStr, args: CommandArgOrStr,
                  description: str, rspable: bool = False, deps: T.Optional[str] = None,
@@ -328,6 +361,7 @@ class NinjaBuildElement:
         self.deps = set()
         self.orderdeps = set()
         self.elems = []
+        self.shared_items: T.Dict[str, NinjaVariable] = {}
         self.all_outputs = all_outputs
         self.output_errors = ''
 
@@ -355,6 +389,15 @@ class NinjaBuildElement:
         if name == 'DEPFILE':
             self.elems.append((name + '_UNQUOTED', elems))
 
+    def share_item(self, name: str, var: NinjaVariable) -> None:
+        """Refer to var for the leading values of the item name.
+
+        The values of var must be a prefix of the values of the item. As
+        response files are quoted differently, this only has an effect if no
+        response file is used.
+        """
+        self.shared_items[name] = var
+
     @mesonlib.lazy_property
     def _should_use_rspfile(self) -> bool:
         # 'phony' is a rule built-in to ninja
@@ -427,11 +470,15 @@ class NinjaBuildElement:
             should_quote = name not in raw_names
             line = f' {name} = '
             newelems = []
+            var = self.shared_items.get(name)
+            if var is not None and qf is quote_func:
+                newelems.append('$' + var.name)
+                elems = elems[len(var.value):]
             for i in elems:
                 if not should_quote or i == '&&': # Hackety hack hack
                     newelems.append(ninja_quote(i))
                 else:
-                    newelems.append(ninja_quote(qf(i)))
+                    newelems.append(ninja_quote_arg(i, qf))
             line += ' '.join(newelems)
             line += '\n'
             outfile.write(line)
@@ -510,6 +557,13 @@ class NinjaBackend(backends.Backend):
         self.implicit_meson_outs: T.List[str] = []
         self._uses_dyndeps = False
         self._generated_header_cache: T.Dict[str, T.List[FileOrString]] = {}
+        # With backend_split_ninja the build statements of targets are
+        # collected per subdir, and written to separate files
+        self.build_fragments: T.Dict[str, T.List[T.Union[NinjaBuildElement, NinjaComment, NinjaVariable]]] = {}
+        self.current_fragment: T.Optional[str] = None
+        # The arguments shared by all sources of a target compiled with the
+        # same language, and the number of sources using them so far
+        self.shared_compile_args: T.Dict[T.Tuple[str, str], T.Tuple[NinjaVariable, int]] = {}
         # nvcc chokes on thin archives:
         #   nvlink fatal   : Could not open input file 'libfoo.a.p'
         #   nvlink fatal   : elfLink internal error
@@ -552,12 +606,12 @@ class NinjaBackend(backends.Backend):
                 continue
             if compiler.id == 'pgi' and mesonlib.is_windows():
                 # for the purpose of this function, PGI doesn't act enough like MSVC
-                return open(tempfilename, 'a', encoding='utf-8')
+                return open(tempfilename, 'a', encoding='utf-8', buffering=NINJA_WRITE_BUFFER_SIZE)
             if compiler.get_argument_syntax() == 'msvc':
                 break
         else:
             # None of our compilers are MSVC, we're done.
-            return open(tempfilename, 'a', encoding='utf-8')
+            return open(tempfilename, 'a', encoding='utf-8', buffering=NINJA_WRITE_BUFFER_SIZE)
         filebase = 'incdetect.' + compilers.lang_suffixes[compiler.language][0]
         filename = os.path.join(self.environment.get_scratch_dir(),
                                 filebase)
@@ -596,7 +650,7 @@ class NinjaBackend(backends.Backend):
                 if match:
                     with open(tempfilename, 'ab') as binfile:
                         binfile.write(b'msvc_deps_prefix = ' + match.group(1) + b'\n')
-                    return open(tempfilename, 'a', encoding='utf-8')
+                    return open(tempfilename, 'a', encoding='utf-8', buffering=NINJA_WRITE_BUFFER_SIZE)
             return None
 
         # Some cl wrappers (e.g. Squish Coco) output dependency info
@@ -645,10 +699,19 @@ class NinjaBackend(backends.Backend):
 
 ''')
 
-        with self.detect_vs_dep_prefix(tempfilename) as outfile:
-            self.generate_rules()
+        # Build statements are written out to a spool file as soon as each
+        # target has been generated instead of being kept in memory until the
+        # end, as the rules, which need to know how often they are used, have
+        # to come first in build.ninja.
+        with self.detect_vs_dep_prefix(tempfilename) as outfile, \
+                tempfile.TemporaryFile('w+', encoding='utf-8', buffering=NINJA_WRITE_BUFFER_SIZE,
+                                       dir=self.environment.get_scratch_dir()) as buildsfile:
+            with profiler.span('rules', 'backend'):
+                self.generate_rules()
 
             self.build_elements = []
+            self.build_fragments = {}
+            self.shared_compile_args = {}
             self.generate_phony()
             self.add_build_comment(NinjaComment('Build rules for targets'))
 
@@ -660,15 +723,20 @@ class NinjaBackend(backends.Backend):
                         captured_compile_args_per_target[target.get_id()] = self.generate_common_compile_args_per_src_type(target)
 
             for t in ProgressBar(self.build.get_targets().values(), desc='Generating targets'):
-                self.generate_target(t)
+                with self.build_fragment(t.get_subdir()), profiler.span(t.get_id(), 'backend target'):
+                    self.generate_target(t)
+                self.write_builds(buildsfile)
             mlog.log_timestamp("Targets generated")
             self.add_build_comment(NinjaComment('Test rules'))
-            self.generate_tests()
+            with profiler.span('tests', 'backend'):
+                self.generate_tests()
             mlog.log_timestamp("Tests generated")
             self.add_build_comment(NinjaComment('Install rules'))
-            self.generate_install()
+            with profiler.span('install', 'backend'):
+                self.generate_install()
             mlog.log_timestamp("Install generated")
-            self.generate_dist()
+            with profiler.span('dist', 'backend'):
+                self.generate_dist()
             mlog.log_timestamp("Dist generated")
             key = OptionKey('b_coverage')
             if (key in self.environment.coredata.optstore and
@@ -677,19 +745,26 @@ class NinjaBackend(backends.Backend):
                 mlog.debug(f'Using {gcovr_exe} ({gcovr_version}), {lcov_exe} and {llvm_cov_exe} for code coverage')
                 if gcovr_exe or (lcov_exe and genhtml_exe):
                     self.add_build_comment(NinjaComment('Coverage rules'))
-                    self.generate_coverage_rules(gcovr_exe, gcovr_version, llvm_cov_exe)
+                    with profiler.span('coverage', 'backend'):
+                        self.generate_coverage_rules(gcovr_exe, gcovr_version, llvm_cov_exe)
                     mlog.log_timestamp("Coverage rules generated")
                 else:
                     # FIXME: since we explicitly opted in, should this be an error?
                     # The docs just say these targets will be created "if possible".
                     mlog.warning('Need gcovr or lcov/genhtml to generate any coverage reports')
             self.add_build_comment(NinjaComment('Suffix'))
-            self.generate_utils()
+            with profiler.span('utils', 'backend'):
+                self.generate_utils()
             mlog.log_timestamp("Utils generated")
             self.generate_ending()
+            with profiler.span('write build.ninja', 'backend'):
+                self.write_builds(buildsfile)
 
-            self.write_rules(outfile)
-            self.write_builds(outfile)
+                self.write_rules(outfile)
+                buildsfile.seek(0)
+                shutil.copyfileobj(buildsfile, outfile, NINJA_WRITE_BUFFER_SIZE)
+                mlog.log_timestamp("build.ninja generated")
+                self.write_build_fragments(outfile)
 
             default = 'default all\n\n'
             outfile.write(default)
@@ -704,7 +779,8 @@ class NinjaBackend(backends.Backend):
                 and os.path.exists(os.path.join(self.environment.build_dir, '.ninja_log'))):
             subprocess.call(self.ninja_command + ['-t', 'restat'], cwd=self.environment.build_dir)
             subprocess.call(self.ninja_command + ['-t', 'cleandead'], cwd=self.environment.build_dir)
-        self.generate_compdb()
+        with profiler.span('compdb', 'backend'):
+            self.generate_compdb()
         self.generate_rust_project_json()
 
         if capture:
@@ -903,7 +979,8 @@ class NinjaBackend(backends.Backend):
         # Initialize an empty introspection source list
         self.introspection_data[name] = {}
         # Generate rules for all dependency targets
-        self.process_target_dependencies(target)
+        with profiler.span('dependencies', 'backend step', target=name):
+            self.process_target_dependencies(target)
 
         self.generate_shlib_aliases(target, self.get_target_dir(target))
 
@@ -938,171 +1015,173 @@ class NinjaBackend(backends.Backend):
         # a language that is handled below, such as C or C++
         transpiled_sources: T.List[str]
 
-        if 'vala' in target.compilers:
-            # Sources consumed by valac are filtered out. These only contain
-            # C/C++ sources, objects, generated libs, and unknown sources now.
-            target_sources, generated_sources, \
-                transpiled_sources = self.generate_vala_compile(target)
-        elif 'cython' in target.compilers:
-            target_sources, generated_sources, \
-                transpiled_sources = self.generate_cython_transpile(target)
-        else:
-            target_sources = self.get_target_sources(target)
-            generated_sources = self.get_target_generated_sources(target)
-            transpiled_sources = []
-        self.scan_fortran_module_outputs(target)
-        # Generate rules for GeneratedLists
-        self.generate_generator_list_rules(target)
-
-        # Generate rules for building the remaining source files in this target
-        outname = self.get_target_filename(target)
-        obj_list = []
-        is_unity = target.is_unity
-        header_deps = []
-        unity_src = []
-        unity_deps = [] # Generated sources that must be built before compiling a Unity target.
-        header_deps += self.get_generated_headers(target)
-
-        if is_unity:
-            # Warn about incompatible sources if a unity build is enabled
-            langs = set(target.compilers.keys())
-            langs_cant = langs.intersection(backends.LANGS_CANT_UNITY)
-            if langs_cant:
-                langs_are = langs = ', '.join(langs_cant).upper()
-                langs_are += ' are' if len(langs_cant) > 1 else ' is'
-                msg = f'{langs_are} not supported in Unity builds yet, so {langs} ' \
-                      f'sources in the {target.name!r} target will be compiled normally'
-                mlog.log(mlog.red('FIXME'), msg)
-
-        # Get a list of all generated headers that will be needed while building
-        # this target's sources (generated sources and preexisting sources).
-        # This will be set as dependencies of all the target's sources. At the
-        # same time, also deal with generated sources that need to be compiled.
-        generated_source_files: T.List[File] = []
-        for rel_src in generated_sources.keys():
-            raw_src = File.from_built_relative(rel_src)
-            if self.environment.is_source(rel_src):
-                if is_unity and self.get_target_source_can_unity(target, rel_src):
-                    unity_deps.append(raw_src)
-                    abs_src = os.path.join(self.environment.get_build_dir(), rel_src)
-                    unity_src.append(abs_src)
-                else:
-                    generated_source_files.append(raw_src)
-            elif self.environment.is_object(rel_src):
-                obj_list.append(rel_src)
-            elif self.environment.is_library(rel_src) or modules.is_module_library(rel_src):
-                pass
-            elif is_compile_target:
-                generated_source_files.append(raw_src)
+        with profiler.span('compile', 'backend step', target=name):
+            if 'vala' in target.compilers:
+                # Sources consumed by valac are filtered out. These only contain
+                # C/C++ sources, objects, generated libs, and unknown sources now.
+                target_sources, generated_sources, \
+                    transpiled_sources = self.generate_vala_compile(target)
+            elif 'cython' in target.compilers:
+                target_sources, generated_sources, \
+                    transpiled_sources = self.generate_cython_transpile(target)
             else:
-                # Assume anything not specifically a source file is a header. This is because
-                # people generate files with weird suffixes (.inc, .fh) that they then include
-                # in their source files.
-                header_deps.append(raw_src)
-
-        # For D language, the object of generated source files are added
-        # as order only deps because other files may depend on them
-        d_generated_deps = []
-
-        # These are the generated source files that need to be built for use by
-        # this target. We create the Ninja build file elements for this here
-        # because we need `header_deps` to be fully generated in the above loop.
-        for src in generated_source_files:
-            if self.environment.is_llvm_ir(src):
-                o, s = self.generate_llvm_ir_compile(target, src)
-            else:
-                o, s = self.generate_single_compile(target, src, True, order_deps=header_deps)
-            compiled_sources.append(s)
-            source2object[s] = o
-            obj_list.append(o)
-            if s.split('.')[-1] in compilers.lang_suffixes['d']:
-                d_generated_deps.append(o)
+                target_sources = self.get_target_sources(target)
+                generated_sources = self.get_target_generated_sources(target)
+                transpiled_sources = []
+            self.scan_fortran_module_outputs(target)
+            # Generate rules for GeneratedLists
+            self.generate_generator_list_rules(target)
+
+            # Generate rules for building the remaining source files in this target
+            outname = self.get_target_filename(target)
+            obj_list = []
+            is_unity = target.is_unity
+            header_deps = []
+            unity_src = []
+            unity_deps = [] # Generated sources that must be built before compiling a Unity target.
+            header_deps += self.get_generated_headers(target)
+
+            if is_unity:
+                # Warn about incompatible sources if a unity build is enabled
+                langs = set(target.compilers.keys())
+                langs_cant = langs.intersection(backends.LANGS_CANT_UNITY)
+                if langs_cant:
+                    langs_are = langs = ', '.join(langs_cant).upper()
+                    langs_are += ' are' if len(langs_cant) > 1 else ' is'
+                    msg = f'{langs_are} not supported in Unity builds yet, so {langs} ' \
+                          f'sources in the {target.name!r} target will be compiled normally'
+                    mlog.log(mlog.red('FIXME'), msg)
+
+            # Get a list of all generated headers that will be needed while building
+            # this target's sources (generated sources and preexisting sources).
+            # This will be set as dependencies of all the target's sources. At the
+            # same time, also deal with generated sources that need to be compiled.
+            generated_source_files: T.List[File] = []
+            for rel_src in generated_sources.keys():
+                raw_src = File.from_built_relative(rel_src)
+                if self.environment.is_source(rel_src):
+                    if is_unity and self.get_target_source_can_unity(target, rel_src):
+                        unity_deps.append(raw_src)
+                        abs_src = os.path.join(self.environment.get_build_dir(), rel_src)
+                        unity_src.append(abs_src)
+                    else:
+                        generated_source_files.append(raw_src)
+                elif self.environment.is_object(rel_src):
+                    obj_list.append(rel_src)
+                elif self.environment.is_library(rel_src) or modules.is_module_library(rel_src):
+                    pass
+                elif is_compile_target:
+                    generated_source_files.append(raw_src)
+                else:
+                    # Assume anything not specifically a source file is a header. This is because
+                    # people generate files with weird suffixes (.inc, .fh) that they then include
+                    # in their source files.
+                    header_deps.append(raw_src)
+
+            # For D language, the object of generated source files are added
+            # as order only deps because other files may depend on them
+            d_generated_deps = []
+
+            # These are the generated source files that need to be built for use by
+            # this target. We create the Ninja build file elements for this here
+            # because we need `header_deps` to be fully generated in the above loop.
+            for src in generated_source_files:
+                if self.environment.is_llvm_ir(src):
+                    o, s = self.generate_llvm_ir_compile(target, src)
+                else:
+                    o, s = self.generate_single_compile(target, src, True, order_deps=header_deps)
+                compiled_sources.append(s)
+                source2object[s] = o
+                obj_list.append(o)
+                if s.split('.')[-1] in compilers.lang_suffixes['d']:
+                    d_generated_deps.append(o)
 
-        use_pch = self.target_uses_pch(target)
-        if use_pch and target.has_pch():
-            pch_objects = self.generate_pch(target, header_deps=header_deps)
-        else:
-            pch_objects = []
+            use_pch = self.target_uses_pch(target)
+            if use_pch and target.has_pch():
+                pch_objects = self.generate_pch(target, header_deps=header_deps)
+            else:
+                pch_objects = []
 
-        o, od = self.flatten_object_list(target)
-        obj_targets = [t for t in od if t.uses_fortran()]
-        obj_list.extend(o)
+            o, od = self.flatten_object_list(target)
+            obj_targets = [t for t in od if t.uses_fortran()]
+            obj_list.extend(o)
 
-        fortran_order_deps = [File(True, *os.path.split(self.get_target_filename(t))) for t in obj_targets]
-        fortran_inc_args: T.List[str] = []
-        if target.uses_fortran():
-            fortran_inc_args = mesonlib.listify([target.compilers['fortran'].get_include_args(
-                self.get_target_private_dir(t), is_system=False) for t in obj_targets])
+            fortran_order_deps = [File(True, *os.path.split(self.get_target_filename(t))) for t in obj_targets]
+            fortran_inc_args: T.List[str] = []
+            if target.uses_fortran():
+                fortran_inc_args = mesonlib.listify([target.compilers['fortran'].get_include_args(
+                    self.get_target_private_dir(t), is_system=False) for t in obj_targets])
 
-        # Generate compilation targets for sources generated by transpilers.
-        #
-        # Do not try to unity-build the generated source files, as these
-        # often contain duplicate symbols and will fail to compile properly.
-        #
-        # Gather all generated source files and header before generating the
-        # compilation rules, to be able to add correct dependencies on the
-        # generated headers.
-        transpiled_source_files = []
-        for src in transpiled_sources:
-            raw_src = File.from_built_relative(src)
-            # Generated targets are ordered deps because the must exist
-            # before the sources compiling them are used. After the first
-            # compile we get precise dependency info from dep files.
-            # This should work in all cases. If it does not, then just
-            # move them from orderdeps to proper deps.
-            if self.environment.is_header(src):
-                header_deps.append(raw_src)
-            else:
-                transpiled_source_files.append(raw_src)
-        for src in transpiled_source_files:
-            o, s = self.generate_single_compile(target, src, True, [], header_deps)
-            obj_list.append(o)
-
-        # Generate compile targets for all the preexisting sources for this target
-        for src in target_sources.values():
-            if not self.environment.is_header(src) or is_compile_target:
-                if self.environment.is_llvm_ir(src):
-                    o, s = self.generate_llvm_ir_compile(target, src)
-                    obj_list.append(o)
-                elif is_unity and self.get_target_source_can_unity(target, src):
-                    abs_src = os.path.join(self.environment.get_build_dir(),
-                                           src.rel_to_builddir(self.build_to_src))
-                    unity_src.append(abs_src)
+            # Generate compilation targets for sources generated by transpilers.
+            #
+            # Do not try to unity-build the generated source files, as these
+            # often contain duplicate symbols and will fail to compile properly.
+            #
+            # Gather all generated source files and header before generating the
+            # compilation rules, to be able to add correct dependencies on the
+            # generated headers.
+            transpiled_source_files = []
+            for src in transpiled_sources:
+                raw_src = File.from_built_relative(src)
+                # Generated targets are ordered deps because the must exist
+                # before the sources compiling them are used. After the first
+                # compile we get precise dependency info from dep files.
+                # This should work in all cases. If it does not, then just
+                # move them from orderdeps to proper deps.
+                if self.environment.is_header(src):
+                    header_deps.append(raw_src)
                 else:
-                    o, s = self.generate_single_compile(target, src, False, [],
-                                                        header_deps + d_generated_deps + fortran_order_deps,
-                                                        fortran_inc_args)
+                    transpiled_source_files.append(raw_src)
+            for src in transpiled_source_files:
+                o, s = self.generate_single_compile(target, src, True, [], header_deps)
+                obj_list.append(o)
+
+            # Generate compile targets for all the preexisting sources for this target
+            for src in target_sources.values():
+                if not self.environment.is_header(src) or is_compile_target:
+                    if self.environment.is_llvm_ir(src):
+                        o, s = self.generate_llvm_ir_compile(target, src)
+                        obj_list.append(o)
+                    elif is_unity and self.get_target_source_can_unity(target, src):
+                        abs_src = os.path.join(self.environment.get_build_dir(),
+                                               src.rel_to_builddir(self.build_to_src))
+                        unity_src.append(abs_src)
+                    else:
+                        o, s = self.generate_single_compile(target, src, False, [],
+                                                            header_deps + d_generated_deps + fortran_order_deps,
+                                                            fortran_inc_args)
+                        obj_list.append(o)
+                        compiled_sources.append(s)
+                        source2object[s] = o
+
+            if is_unity:
+                for src in self.generate_unity_files(target, unity_src):
+                    o, s = self.generate_single_compile(target, src, True, unity_deps + header_deps + d_generated_deps,
+                                                        fortran_order_deps, fortran_inc_args, unity_src)
                     obj_list.append(o)
                     compiled_sources.append(s)
                     source2object[s] = o
-
-        if is_unity:
-            for src in self.generate_unity_files(target, unity_src):
-                o, s = self.generate_single_compile(target, src, True, unity_deps + header_deps + d_generated_deps,
-                                                    fortran_order_deps, fortran_inc_args, unity_src)
-                obj_list.append(o)
-                compiled_sources.append(s)
-                source2object[s] = o
         if is_compile_target:
             # Skip the link stage for this special type of target
             return
-        linker, stdlib_args = self.determine_linker_and_stdlib_args(target)
+        with profiler.span('link', 'backend step', target=name):
+            linker, stdlib_args = self.determine_linker_and_stdlib_args(target)
 
-        if not isinstance(target, build.StaticLibrary):
-            final_obj_list = obj_list
-        elif target.prelink:
-            final_obj_list = self.generate_prelink(target, obj_list)
-        else:
-            final_obj_list = obj_list
-        elem = self.generate_link(target, outname, final_obj_list, linker, pch_objects, stdlib_args=stdlib_args)
-        self.generate_dependency_scan_target(target, compiled_sources, source2object, generated_source_files, fortran_order_deps)
-        self.add_build(elem)
-        #In AIX, we archive shared libraries. If the instance is a shared library, we add a command to archive the shared library
-        #object and create the build element.
-        if isinstance(target, build.SharedLibrary) and self.environment.machines[target.for_machine].is_aix():
-            if target.aix_so_archive:
-                elem = NinjaBuildElement(self.all_outputs, linker.get_archive_name(outname), 'AIX_LINKER', [outname])
-                self.add_build(elem)
+            if not isinstance(target, build.StaticLibrary):
+                final_obj_list = obj_list
+            elif target.prelink:
+                final_obj_list = self.generate_prelink(target, obj_list)
+            else:
+                final_obj_list = obj_list
+            elem = self.generate_link(target, outname, final_obj_list, linker, pch_objects, stdlib_args=stdlib_args)
+            self.generate_dependency_scan_target(target, compiled_sources, source2object, generated_source_files, fortran_order_deps)
+            self.add_build(elem)
+            #In AIX, we archive shared libraries. If the instance is a shared library, we add a command to archive the shared library
+            #object and create the build element.
+            if isinstance(target, build.SharedLibrary) and self.environment.machines[target.for_machine].is_aix():
+                if target.aix_so_archive:
+                    elem = NinjaBuildElement(self.all_outputs, linker.get_archive_name(outname), 'AIX_LINKER', [outname])
+                    self.add_build(elem)
 
     def should_use_dyndeps_for_target(self, target: 'build.BuildTarget') -> bool:
         if not self.ninja_has_dyndeps:
@@ -1177,7 +1256,8 @@ class NinjaBackend(backends.Backend):
     def process_target_dependencies(self, target) -> None:
         for t in target.get_dependencies():
             if t.get_id() not in self.processed_targets:
-                self.generate_target(t)
+                with self.build_fragment(t.get_subdir()), profiler.span(t.get_id(), 'backend target'):
+                    self.generate_target(t)
 
     def custom_target_generator_inputs(self, target) -> None:
         for s in target.sources:
@@ -1395,7 +1475,33 @@ class NinjaBackend(backends.Backend):
         self.rules.append(comment)
 
     def add_build_comment(self, comment: NinjaComment) -> None:
-        self.build_elements.append(comment)
+        self._get_build_list().append(comment)
+
+    def add_build_variable(self, variable: NinjaVariable) -> None:
+        self._get_build_list().append(variable)
+
+    def _get_build_list(self) -> T.List[T.Union[NinjaBuildElement, NinjaComment, NinjaVariable]]:
+        if self.current_fragment is None:
+            return self.build_elements
+        return self.build_fragments.setdefault(self.current_fragment, [])
+
+    @contextmanager
+    def build_fragment(self, subdir: str) -> T.Iterator[None]:
+        """Add the build statements generated in this context to the file of subdir.
+
+        This is a no-op unless we are already collecting build statements per
+        subdir, so that targets generated as dependencies of another one end
+        up in their own subdir's file.
+        """
+        if not self.environment.coredata.optstore.get_value('backend_split_ninja'):
+            yield
+            return
+        prev = self.current_fragment
+        self.current_fragment = subdir
+        try:
+            yield
+        finally:
+            self.current_fragment = prev
 
     def add_rule(self, rule: NinjaRule) -> None:
         if rule.name in self.ruledict:
@@ -1405,7 +1511,7 @@ class NinjaBackend(backends.Backend):
 
     def add_build(self, build: NinjaBuildElement) -> None:
         build.check_outputs()
-        self.build_elements.append(build)
+        self._get_build_list().append(build)
 
         if build.rulename != 'phony':
             # reference rule
@@ -1415,7 +1521,7 @@ class NinjaBackend(backends.Backend):
                 mlog.warning(f"build statement for {build.outfilenames} references nonexistent rule {build.rulename}")
 
     def write_rules(self, outfile: T.TextIO) -> None:
-        for b in self.build_elements:
+        for b in itertools.chain(*self.build_fragments.values()):
             if isinstance(b, NinjaBuildElement):
                 b.count_rule_references()
 
@@ -1423,9 +1529,59 @@ class NinjaBackend(backends.Backend):
             r.write(outfile)
 
     def write_builds(self, outfile: T.TextIO) -> None:
-        for b in ProgressBar(self.build_elements, desc='Writing build.ninja'):
+        """Write out the build statements collected so far and forget them."""
+        for b in self.build_elements:
+            if isinstance(b, NinjaBuildElement):
+                b.count_rule_references()
             b.write(outfile)
-        mlog.log_timestamp("build.ninja generated")
+        self.build_elements = []
+
+    def write_build_fragments(self, outfile: T.TextIO) -> None:
+        """Write the build statements of each subdir to a file of its own.
+
+        The files are included from build.ninja with subninja, and are only
+        rewritten if their content changed since the last time, which is
+        tracked by their hash.
+        """
+        fragdir = os.path.join(self.environment.get_scratch_dir(), 'ninja')
+        manifest = os.path.join(fragdir, 'fragments.json')
+        if not self.build_fragments:
+            if os.path.exists(fragdir):
+                mesonlib.windows_proof_rmtree(fragdir)
+            return
+
+        old_hashes: T.Dict[str, str] = {}
+        try:
+            with open(manifest, encoding='utf-8') as f:
+                old_hashes = json.load(f)
+        except (OSError, ValueError):
+            pass
+
+        new_hashes: T.Dict[str, str] = {}
+        rewritten = 0
+        for subdir, elements in sorted(self.build_fragments.items()):
+            buf = io.StringIO()
+            for b in elements:
+                b.write(buf)
+            content = buf.getvalue()
+            digest = hashlib.sha256(content.encode('utf-8')).hexdigest()
+            fname = os.path.join(fragdir, subdir, 'build.ninja')
+            if old_hashes.get(subdir) != digest or not os.path.exists(fname):
+                os.makedirs(os.path.dirname(fname), exist_ok=True)
+                with open(fname + '~', 'w', encoding='utf-8') as f:
+                    f.write(content)
+                os.replace(fname + '~', fname)
+                rewritten += 1
+            new_hashes[subdir] = digest
+            relname = '/'.join(p for p in [self.environment.private_dir, 'ninja', subdir, 'build.ninja'] if p)
+            outfile.write(f'subninja {ninja_quote(relname, True)}\n')
+        outfile.write('\n')
+
+        for subdir in old_hashes.keys() - new_hashes.keys():
+            mesonlib.windows_proof_rm(os.path.join(fragdir, subdir, 'build.ninja'))
+        with open(manifest, 'w', encoding='utf-8') as f:
+            json.dump(new_hashes, f)
+        mlog.debug(f'Rewrote {rewritten} of {len(new_hashes)} per directory ninja files')
 
     def generate_phony(self) -> None:
         self.add_build_comment(NinjaComment('Phony build target, always out of date'))
@@ -2955,31 +3111,38 @@ https://gcc.gnu.org/bugzilla/show_bug.cgi?id=47485'''))
         commands += compiler.get_include_args(self.get_target_private_dir(target), False)
         return commands
 
+    @lru_cache(maxsize=None)
+    def _generate_single_compile_common_args(self, target: build.BuildTarget, compiler: Compiler) -> ImmutableListProtocol[str]:
+        """The arguments used to compile every source of target with compiler.
+
+        These only depend on the target, so they are computed once instead of
+        for every source.
+        """
+        commands = self._generate_single_compile_base_args(target, compiler)
+
+        # Include PCH header as first thing as it must be the first one or it will be
+        # ignored by gcc https://gcc.gnu.org/bugzilla/show_bug.cgi?id=100462
+        use_pch = self.target_uses_pch(target)
+        if use_pch and 'mw' not in compiler.id:
+            commands += self.get_pch_include_args(compiler, target)
+
+        commands += self._generate_single_compile_target_args(target, compiler)
+
+        # Metrowerks compilers require PCH include args to come after intraprocedural analysis args
+        if use_pch and 'mw' in compiler.id:
+            commands += self.get_pch_include_args(compiler, target)
+
+        return list(commands)
+
     # Returns a dictionary, mapping from each compiler src type (e.g. 'c', 'cpp', etc.) to a list of compiler arg strings
     # used for that respective src type.
     # Currently used for the purpose of populating VisualStudio intellisense fields but possibly useful in other scenarios.
     def generate_common_compile_args_per_src_type(self, target: build.BuildTarget) -> dict[str, list[str]]:
         src_type_to_args = {}
 
-        use_pch = self.target_uses_pch(target)
-
         for src_type_str in target.compilers.keys():
             compiler = target.compilers[src_type_str]
-            commands = self._generate_single_compile_base_args(target, compiler)
-
-            # Include PCH header as first thing as it must be the first one or it will be
-            # ignored by gcc https://gcc.gnu.org/bugzilla/show_bug.cgi?id=100462
-            if use_pch and 'mw' not in compiler.id:
-                commands += self.get_pch_include_args(compiler, target)
-
-            commands += self._generate_single_compile_target_args(target, compiler)
-
-            # Metrowerks compilers require PCH include args to come after intraprocedural analysis args
-            if use_pch and 'mw' in compiler.id:
-                commands += self.get_pch_include_args(compiler, target)
-
-            commands = commands.compiler.compiler_args(commands)
-
+            commands = compiler.compiler_args(self._generate_single_compile_common_args(target, compiler))
             src_type_to_args[src_type_str] = commands.to_native()
         return src_type_to_args
 
@@ -2999,21 +3162,12 @@ https://gcc.gnu.org/bugzilla/show_bug.cgi?id=47485'''))
             raise AssertionError(f'BUG: sources should not contain headers {src!r}')
 
         compiler = get_compiler_for_source(target.compilers.values(), src)
-        commands = self._generate_single_compile_base_args(target, compiler)
-
-        # Include PCH header as first thing as it must be the first one or it will be
-        # ignored by gcc https://gcc.gnu.org/bugzilla/show_bug.cgi?id=100462
-        use_pch = self.target_uses_pch(target)
-        if use_pch and 'mw' not in compiler.id:
-            commands += self.get_pch_include_args(compiler, target)
-
-        commands += self._generate_single_compile_target_args(target, compiler)
+        commands = compiler.compiler_args(self._generate_single_compile_common_args(target, compiler))
 
-        # Metrowerks compilers require PCH include args to come after intraprocedural analysis args
-        if use_pch and 'mw' in compiler.id:
-            commands += self.get_pch_include_args(compiler, target)
-
-        commands = commands.compiler.compiler_args(commands)
+        args_key = (target.get_id(), compiler.get_language())
+        if args_key not in self.shared_compile_args:
+            varname = re.sub(r'[^a-zA-Z0-9_]', '_', f'{compiler.get_language()}_ARGS_{target.get_id()}')
+            self.shared_compile_args[args_key] = (NinjaVariable(varname, commands.to_native(copy=True)), 0)
 
         # Create introspection information
         if is_generated is False:
@@ -3130,7 +3284,9 @@ https://gcc.gnu.org/bugzilla/show_bug.cgi?id=47485'''))
                     result += c
                 return result
             element.add_item('CUDA_ESCAPED_TARGET', quote_make_target(rel_obj))
-        element.add_item('ARGS', commands)
+        args = commands.to_native()
+        element.add_item('ARGS', args)
+        self.share_compile_args(args_key, element, args)
 
         self.add_dependency_scanner_entries_to_element(target, compiler, element, src)
         self.add_build(element)
@@ -3138,6 +3294,23 @@ https://gcc.gnu.org/bugzilla/show_bug.cgi?id=47485'''))
         assert isinstance(rel_src, str)
         return (rel_obj, rel_src.replace('\\', '/'))
 
+    def share_compile_args(self, key: T.Tuple[str, str], element: NinjaBuildElement, args: T.List[str]) -> None:
+        """Refer to the arguments common to all sources of a target through a variable.
+
+        Sources of a target compiled with the same language only differ in a
+        handful of arguments, so instead of repeating all of them for every
+        source they are defined once. The variable is only added once a
+        second source uses it, targets with a single source don't need it.
+        """
+        var, uses = self.shared_compile_args[key]
+        if not var.value or args[:len(var.value)] != var.value:
+            return
+        if uses == 1:
+            self.add_build_variable(var)
+        if uses >= 1:
+            element.share_item('ARGS', var)
+        self.shared_compile_args[key] = (var, uses + 1)
+
     def add_dependency_scanner_entries_to_element(self, target: build.BuildTarget, compiler, element, src) -> None:
         if not self.should_use_dyndeps_for_target(target):
             return
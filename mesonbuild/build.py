@@ -270,6 +270,8 @@ class Build:
         self.test_setup_default_name = None
         self.find_overrides: T.Dict[str, T.Union['Executable', programs.ExternalProgram, programs.OverrideProgram]] = {}
         self.searched_programs: T.Set[str] = set() # The list of all programs that have been searched for.
+        # Targets whose outputs are passed to install, postconf or dist scripts
+        self.script_targets: T.List[T.Union[BuildTarget, CustomTarget, CustomTargetIndex]] = []
 
         # If we are doing a cross build we need two caches, if we're doing a
         # build == host compilation the both caches should point to the same place.
@@ -370,6 +372,48 @@ class Build:
 
         return link_args.get(compiler.get_language(), [])
 
+    def prune_subprojects(self) -> int:
+        """Remove everything of subprojects that the main project does not use.
+
+        Tests and benchmarks of subprojects are removed, and so are their
+        targets unless they are referenced, directly or indirectly, by a target,
+        test or benchmark of the main project, or by a script.
+
+        :return: The number of targets removed
+        """
+        self.tests = [t for t in self.tests if t.project_name == self.project_name]
+        self.benchmarks = [t for t in self.benchmarks if t.project_name == self.project_name]
+
+        roots: T.List[object] = [t for t in self.targets.values() if not t.subproject]
+        roots.extend(self.script_targets)
+        for t in itertools.chain(self.tests, self.benchmarks):
+            roots.extend([t.exe, t.depends, t.cmd_args])
+
+        # Rather than following the attributes known to hold other targets,
+        # which would silently break with every new one, walk all attributes
+        # of the objects that may refer to targets.
+        containers = (Target, CustomTargetIndex, GeneratedList, Generator, ExtractedObjects,
+                      StructuredSources, BothLibraries, dependencies.InternalDependency)
+        seen: T.Set[int] = set()
+        stack = roots
+        while stack:
+            obj = stack.pop()
+            if id(obj) in seen:
+                continue
+            seen.add(id(obj))
+            if isinstance(obj, (list, tuple, set, frozenset, OrderedSet)):
+                stack.extend(obj)
+            elif isinstance(obj, dict):
+                stack.extend(obj.keys())
+                stack.extend(obj.values())
+            elif isinstance(obj, containers):
+                stack.extend(vars(obj).values())
+
+        unused = [k for k, t in self.targets.items() if t.subproject and id(t) not in seen]
+        for k in unused:
+            del self.targets[k]
+        return len(unused)
+
 @dataclass(eq=False)
 class IncludeDirs(HoldableObject):
 
@@ -1087,15 +1131,30 @@ class BuildTarget(Target):
         return ExtractedObjects(self, self.sources, self.generated, self.objects,
                                 recursive, pch=True)
 
+    @staticmethod
+    def clear_link_graph_caches() -> None:
+        """Forget the memoized results of walking the link graph.
+
+        They are cached for all targets, as the backends ask for them many
+        times, and depend on every target they reach, so a change to the
+        link targets of any target invalidates all of them.
+        """
+        for method in (BuildTarget.get_transitive_link_deps, BuildTarget.get_transitive_link_deps_mapping,
+                       BuildTarget.get_link_dep_subdirs, BuildTarget.get_dependencies,
+                       BuildTarget.get_internal_static_libraries):
+            method.cache_clear()
+
     def get_all_link_deps(self) -> ImmutableListProtocol[BuildTargetTypes]:
         return self.get_transitive_link_deps()
 
     @lru_cache(maxsize=None)
     def get_transitive_link_deps(self) -> ImmutableListProtocol[BuildTargetTypes]:
-        result: T.List[Target] = []
+        # Libraries reachable through several paths are only listed once,
+        # otherwise the list grows exponentially with diamond shaped graphs.
+        result: OrderedSet[BuildTargetTypes] = OrderedSet()
         for i in self.link_targets:
-            result += i.get_all_link_deps()
-        return result
+            result.update(i.get_all_link_deps())
+        return list(result)
 
     def get_link_deps_mapping(self, prefix: str) -> T.Mapping[str, str]:
         return self.get_transitive_link_deps_mapping(prefix)
@@ -1296,19 +1355,30 @@ class BuildTarget(Target):
         # get_internal_static_libraries(): Installed static libraries include
         # objects from all their dependencies already.
         result: OrderedSet[BuildTargetTypes] = OrderedSet()
+        visited: T.Set[T.Tuple[BuildTargetTypes, bool]] = set()
         for t in itertools.chain(self.link_targets, self.link_whole_targets):
             if t not in result:
                 result.add(t)
                 if isinstance(t, StaticLibrary):
-                    t.get_dependencies_recurse(result, include_proc_macros = self.uses_rust())
+                    t.get_dependencies_recurse(result, include_proc_macros=self.uses_rust(), visited=visited)
         return result
 
-    def get_dependencies_recurse(self, result: OrderedSet[BuildTargetTypes], include_internals: bool = True, include_proc_macros: bool = False) -> None:
+    def get_dependencies_recurse(self, result: OrderedSet[BuildTargetTypes], include_internals: bool = True, include_proc_macros: bool = False,
+                                 visited: T.Optional[T.Set[T.Tuple[BuildTargetTypes, bool]]] = None) -> None:
         # self is always a static library because we don't need to pull dependencies
         # of shared libraries. If self is installed (not internal) it already
         # include objects extracted from all its internal dependencies so we can
         # skip them.
         include_internals = include_internals and self.is_internal()
+        # Internal libraries are not added to the result when include_internals
+        # is false, and neither are link_whole targets, so they may be reached
+        # again and again. As the result only ever grows, walking a library a
+        # second time with the same flags cannot add anything.
+        if visited is None:
+            visited = set()
+        if (self, include_internals) in visited:
+            return
+        visited.add((self, include_internals))
         for t in self.link_targets:
             if t in result:
                 continue
@@ -1317,9 +1387,9 @@ class BuildTarget(Target):
             if include_internals or not t.is_internal():
                 result.add(t)
             if isinstance(t, StaticLibrary):
-                t.get_dependencies_recurse(result, include_internals, include_proc_macros)
+                t.get_dependencies_recurse(result, include_internals, include_proc_macros, visited)
         for t in self.link_whole_targets:
-            t.get_dependencies_recurse(result, include_internals, include_proc_macros)
+            t.get_dependencies_recurse(result, include_internals, include_proc_macros, visited)
 
     def get_source_subdir(self):
         return self.subdir
@@ -1357,8 +1427,12 @@ class BuildTarget(Target):
                 self.extra_files.extend(f for f in dep.extra_files if f not in self.extra_files)
                 self.add_include_dirs(dep.include_directories, dep.get_include_type())
                 self.objects.extend(dep.objects)
-                self.link_targets.extend(dep.libraries)
-                self.link_whole_targets.extend(dep.whole_libraries)
+                if dep.libraries or dep.whole_libraries:
+                    self.link_targets.extend(dep.libraries)
+                    self.link_whole_targets.extend(dep.whole_libraries)
+                    # This may happen after the target was created, for
+                    # instance for the standard library dependencies
+                    self.clear_link_graph_caches()
                 if dep.get_compile_args() or dep.get_link_args():
                     # Those parts that are external.
                     extpart = dependencies.InternalDependency('undefined',
@@ -1433,6 +1507,7 @@ class BuildTarget(Target):
                 raise InvalidArguments(msg)
             self.check_can_link_together(t)
             self.link_targets.append(t)
+        self.clear_link_graph_caches()
 
     def link_whole(self, targets: T.List[BuildTargetTypes], promoted: bool = False) -> None:
         for t in targets:
@@ -1458,6 +1533,7 @@ class BuildTarget(Target):
                     for lib in t.get_internal_static_libraries():
                         self._bundle_static_library(lib, True)
             self.link_whole_targets.append(t)
+        self.clear_link_graph_caches()
 
     @lru_cache(maxsize=None)
     def get_internal_static_libraries(self) -> OrderedSet[BuildTargetTypes]:
@@ -1465,14 +1541,22 @@ class BuildTarget(Target):
         self.get_internal_static_libraries_recurse(result)
         return result
 
-    def get_internal_static_libraries_recurse(self, result: OrderedSet[BuildTargetTypes]) -> None:
+    def get_internal_static_libraries_recurse(self, result: OrderedSet[BuildTargetTypes],
+                                              visited: T.Optional[T.Set[BuildTargetTypes]] = None) -> None:
+        # link_whole targets are not added to the result, see
+        # get_dependencies_recurse() for why they are only walked once.
+        if visited is None:
+            visited = set()
+        if self in visited:
+            return
+        visited.add(self)
         for t in self.link_targets:
             if t.is_internal() and t not in result:
                 result.add(t)
-                t.get_internal_static_libraries_recurse(result)
+                t.get_internal_static_libraries_recurse(result, visited)
         for t in self.link_whole_targets:
             if t.is_internal():
-                t.get_internal_static_libraries_recurse(result)
+                t.get_internal_static_libraries_recurse(result, visited)
 
     def _bundle_static_library(self, t: T.Union[BuildTargetTypes], promoted: bool = False) -> None:
         if self.uses_rust():
@@ -2226,6 +2310,7 @@ class StaticLibrary(BuildTarget):
             result = self.both_lib or self
         if recursive:
             result.link_targets = [t.get(lib_type, True) for t in self.link_targets]
+            self.clear_link_graph_caches()
         return result
 
 class SharedLibrary(BuildTarget):
@@ -2504,6 +2589,7 @@ class SharedLibrary(BuildTarget):
             result = self.both_lib or self
         if recursive:
             result.link_targets = [t.get(lib_type, True) for t in self.link_targets]
+            self.clear_link_graph_caches()
         return result
 
 # A shared library that is meant to be used with dlopen rather than linking
@@ -2616,13 +2702,15 @@ class CustomTargetBase:
 
     rust_crate_type = ''
 
-    def get_dependencies_recurse(self, result: OrderedSet[BuildTargetTypes], include_internals: bool = True) -> None:
+    def get_dependencies_recurse(self, result: OrderedSet[BuildTargetTypes], include_internals: bool = True, include_proc_macros: bool = False,
+                                 visited: T.Optional[T.Set[T.Tuple[BuildTargetTypes, bool]]] = None) -> None:
         pass
 
     def get_internal_static_libraries(self) -> OrderedSet[BuildTargetTypes]:
         return OrderedSet()
 
-    def get_internal_static_libraries_recurse(self, result: OrderedSet[BuildTargetTypes]) -> None:
+    def get_internal_static_libraries_recurse(self, result: OrderedSet[BuildTargetTypes],
+                                              visited: T.Optional[T.Set[BuildTargetTypes]] = None) -> None:
         pass
 
     def get(self, lib_type: T.Literal['static', 'shared'], recursive: bool = False) -> LibTypes:
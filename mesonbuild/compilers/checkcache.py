@@ -0,0 +1,150 @@
+# SPDX-License-Identifier: Apache-2.0
+# Copyright 2025 The Meson development team
+
+"""A content addressed, on disk cache of compiler check results.
+
+The cache in CoreData only lives as long as a single build directory. This
+cache is opt-in (through the ``check_cache_dir`` option) and is meant to be
+shared by many build directories using the same toolchain, such as the many
+fresh build directories a CI system configures for every commit.
+
+Entries are keyed on everything that can influence the result of a check that
+Meson knows about: the compiler command and version, the arguments, the code
+and the environment variables compilers are known to consult. Since results
+are only ever stored for checks whose code is passed as a string, no source
+file contents need to be hashed.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import pickle
+import tempfile
+import typing as T
+from functools import lru_cache
+
+from .. import mlog
+from ..coredata import version as meson_version
+
+if T.TYPE_CHECKING:
+    from .compilers import CompileResult, RunResult
+
+    CacheableResult = T.Union[CompileResult, RunResult]
+
+# Environment variables that compilers and linkers consult on their own and
+# therefore may change the result of a check without changing its arguments.
+CHECK_ENV_VARS = (
+    'PATH', 'CPATH', 'C_INCLUDE_PATH', 'CPLUS_INCLUDE_PATH', 'OBJC_INCLUDE_PATH',
+    'LIBRARY_PATH', 'GCC_EXEC_PREFIX', 'COMPILER_PATH', 'SDKROOT',
+    'MACOSX_DEPLOYMENT_TARGET', 'INCLUDE', 'LIB', 'LIBPATH', 'EXTERNAL_INCLUDE',
+)
+
+# Upper bound of the cache size in bytes, once it is exceeded the least
+# recently used entries are removed until only LOW_WATER_MARK of it is used.
+DEFAULT_MAX_SIZE = 256 * 1024 * 1024
+LOW_WATER_MARK = 0.75
+
+
+def make_key(kind: str, *parts: T.Union[str, T.Sequence[str]]) -> str:
+    """Create a stable hash for a check.
+
+    :param kind: What sort of check this is, ``compile`` or ``run``
+    :param parts: Strings or sequences of strings identifying the check
+    :return: A hex digest suitable for use as a file name
+    """
+    env = [(k, os.environ.get(k)) for k in CHECK_ENV_VARS]
+    data = json.dumps([meson_version, kind, env, list(parts)])
+    return hashlib.sha256(data.encode('utf-8')).hexdigest()
+
+
+class CheckCache:
+
+    """Size bounded LRU cache of check results in a directory.
+
+    Every entry is a single pickle file, named after the hash of its key.
+    Recency is tracked with the mtime of the files, which is bumped on every
+    hit. Writes go through a temporary file and are atomically renamed into
+    place, so several Meson processes may share one cache directory.
+    """
+
+    def __init__(self, cache_dir: str, max_size: int = DEFAULT_MAX_SIZE):
+        self.cache_dir = os.path.join(cache_dir, 'v1')
+        self.max_size = max_size
+        self._size: T.Optional[int] = None
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, key[:2], key + '.dat')
+
+    def lookup(self, key: str) -> T.Optional[CacheableResult]:
+        fname = self._path(key)
+        try:
+            with open(fname, 'rb') as f:
+                result = T.cast('CacheableResult', pickle.load(f))
+        except FileNotFoundError:
+            return None
+        except (OSError, pickle.UnpicklingError, EOFError, AttributeError, ImportError) as e:
+            mlog.debug(f'Ignoring unreadable check cache entry {fname}: {e}')
+            return None
+        try:
+            os.utime(fname)
+        except OSError:
+            pass
+        return result
+
+    def store(self, key: str, result: CacheableResult) -> None:
+        fname = self._path(key)
+        try:
+            os.makedirs(os.path.dirname(fname), exist_ok=True)
+            fd, tmpname = tempfile.mkstemp(dir=os.path.dirname(fname), suffix='.tmp')
+            with os.fdopen(fd, 'wb') as f:
+                pickle.dump(result, f)
+                size = f.tell()
+            os.replace(tmpname, fname)
+        except OSError as e:
+            mlog.debug(f'Could not write check cache entry {fname}: {e}')
+            return
+
+        if self._size is None:
+            self._size = self._scan_size()
+        else:
+            self._size += size
+        if self._size > self.max_size:
+            self.evict()
+
+    def _entries(self) -> T.List[os.DirEntry[str]]:
+        entries: T.List[os.DirEntry[str]] = []
+        try:
+            subdirs = list(os.scandir(self.cache_dir))
+        except FileNotFoundError:
+            return entries
+        for d in subdirs:
+            if d.is_dir():
+                entries.extend(e for e in os.scandir(d.path) if e.name.endswith('.dat'))
+        return entries
+
+    def _scan_size(self) -> int:
+        return sum(e.stat().st_size for e in self._entries())
+
+    def evict(self) -> None:
+        """Remove least recently used entries until below the low water mark."""
+        entries = sorted(self._entries(), key=lambda e: e.stat().st_mtime)
+        size = sum(e.stat().st_size for e in entries)
+        target = int(self.max_size * LOW_WATER_MARK)
+        for e in entries:
+            if size <= target:
+                break
+            try:
+                esize = e.stat().st_size
+                os.unlink(e.path)
+            except OSError:
+                # Another process may have removed it already
+                continue
+            size -= esize
+        self._size = size
+
+
+@lru_cache(maxsize=None)
+def get_check_cache(cache_dir: str) -> CheckCache:
+    return CheckCache(cache_dir)
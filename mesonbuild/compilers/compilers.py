@@ -15,6 +15,7 @@ from functools import lru_cache
 from .. import mlog
 from .. import mesonlib
 from .. import options
+from .. import profiler
 from ..mesonlib import (
     HoldableObject,
     EnvironmentException, MesonException,
@@ -22,6 +23,7 @@ from ..mesonlib import (
 )
 from ..options import OptionKey
 from ..arglist import CompilerArgs
+from .checkcache import get_check_cache, make_key as make_check_key
 
 if T.TYPE_CHECKING:
     from .. import coredata
@@ -33,6 +35,7 @@ if T.TYPE_CHECKING:
     from ..linkers.linkers import DynamicLinker
     from ..mesonlib import MachineChoice
     from ..dependencies import Dependency
+    from .checkcache import CheckCache
 
     CompilerType = T.TypeVar('CompilerType', bound='Compiler')
 
@@ -433,6 +436,13 @@ class CompileResult(HoldableObject):
     output_name: T.Optional[str] = field(default=None, init=False)
     cached: bool = field(default=False, init=False)
 
+def get_persistent_check_cache(cdata: coredata.CoreData) -> T.Optional[CheckCache]:
+    """Get the cross build directory check cache, if the user enabled it."""
+    cache_dir = cdata.optstore.get_value('check_cache_dir')
+    if not cache_dir:
+        return None
+    return get_check_cache(os.path.expanduser(cache_dir))
+
 class Compiler(HoldableObject, metaclass=abc.ABCMeta):
 
     # Libraries to ignore in find_library() since they are provided by the
@@ -658,7 +668,8 @@ class Compiler(HoldableObject, metaclass=abc.ABCMeta):
             else:
                 cmdlist = [p.output_name]
             try:
-                pe, so, se = mesonlib.Popen_safe(cmdlist, env=run_env, cwd=run_cwd)
+                with profiler.span(f'{self.get_display_language()} run', 'compiler check'):
+                    pe, so, se = mesonlib.Popen_safe(cmdlist, env=run_env, cwd=run_cwd)
             except Exception as e:
                 mlog.debug(f'Could not run: {cmdlist} (error: {e})\n')
                 return RunResult(False)
@@ -681,8 +692,18 @@ class Compiler(HoldableObject, metaclass=abc.ABCMeta):
         run_check_cache = env.coredata.run_check_cache
         args = self.build_wrapper_args(env, extra_args, dependencies, CompileCheckMode('link'))
         key = (code, tuple(args))
+        disk_cache = get_persistent_check_cache(env.coredata)
+        disk_key: T.Optional[str] = None
+        p: T.Optional[RunResult] = None
         if key in run_check_cache:
             p = run_check_cache[key]
+        elif disk_cache is not None:
+            wrapper = env.exe_wrapper.get_command() if env.need_exe_wrapper(self.for_machine) and env.has_exe_wrapper() else []
+            disk_key = make_check_key('run', self.exelist, self.version, wrapper, code, args.to_native())
+            p = T.cast('T.Optional[RunResult]', disk_cache.lookup(disk_key))
+            if p is not None:
+                run_check_cache[key] = p
+        if p is not None:
             p.cached = True
             mlog.debug('Using cached run result:')
             mlog.debug('Code:\n', code)
@@ -693,6 +714,8 @@ class Compiler(HoldableObject, metaclass=abc.ABCMeta):
         else:
             p = self.run(code, env, extra_args=extra_args, dependencies=dependencies)
             run_check_cache[key] = p
+            if disk_cache is not None and disk_key is not None and p.compiled:
+                disk_cache.store(disk_key, p)
         return p
 
     def sizeof(self, typename: str, prefix: str, env: 'Environment', *,
@@ -840,7 +863,8 @@ class Compiler(HoldableObject, metaclass=abc.ABCMeta):
             os_env['LC_ALL'] = 'C'
             if no_ccache:
                 os_env['CCACHE_DISABLE'] = '1'
-            p, stdo, stde = Popen_safe_logged(command_list, msg='Command line', cwd=tmpdirname, env=os_env)
+            with profiler.span(f'{self.get_display_language()} {mode.value}', 'compiler check'):
+                p, stdo, stde = Popen_safe_logged(command_list, msg='Command line', cwd=tmpdirname, env=os_env)
 
             result = CompileResult(stdo, stde, command_list, p.returncode, input_name=srcname)
             if want_output:
@@ -858,8 +882,24 @@ class Compiler(HoldableObject, metaclass=abc.ABCMeta):
         textra_args: T.Tuple[str, ...] = tuple(extra_args) if extra_args is not None else tuple()
         key: coredata.CompilerCheckCacheKey = (tuple(self.exelist), self.version, code, textra_args, mode)
 
+        # Compiles of files can't be stored persistently, their content may
+        # change without the key changing
+        disk_cache = get_persistent_check_cache(cdata) if isinstance(code, str) else None
+        disk_key: T.Optional[str] = None
+        if disk_cache is not None and key not in cdata.compiler_check_cache:
+            disk_key = make_check_key('compile', self.exelist, self.version, T.cast('str', code), textra_args, mode.value)
+            cached = T.cast('T.Optional[CompileResult]', disk_cache.lookup(disk_key))
+            if cached is not None:
+                cdata.compiler_check_cache[key] = cached
+
         # Check if not cached, and generate, otherwise get from the cache
-        if key in cdata.compiler_check_cache:
+        if key in cdata.prefetched_checks:
+            # Run ahead for this lookup, which is the first one
+            cdata.prefetched_checks.discard(key)
+            p = cdata.compiler_check_cache[key]
+            p.cached = False
+            yield p
+        elif key in cdata.compiler_check_cache:
             p = cdata.compiler_check_cache[key]
             p.cached = True
             mlog.debug('Using cached compile:')
@@ -871,6 +911,8 @@ class Compiler(HoldableObject, metaclass=abc.ABCMeta):
         else:
             with self.compile(code, extra_args=extra_args, mode=mode, want_output=False, temp_dir=temp_dir) as p:
                 cdata.compiler_check_cache[key] = p
+                if disk_cache is not None and disk_key is not None:
+                    disk_cache.store(disk_key, p)
                 yield p
 
     def get_colorout_args(self, colortype: str) -> T.List[str]:
@@ -77,7 +77,7 @@ class CLikeCompilerArgs(arglist.CompilerArgs):
             group_start = -1
             group_end = -1
             for i, each in enumerate(new):
-                if not GROUP_FLAGS.search(each):
+                if not self._is_group_flag(each):
                     continue
                 group_end = i
                 if group_start < 0:
@@ -108,13 +108,18 @@ class CLikeCompilerArgs(arglist.CompilerArgs):
                     bad_idx_list += [i]
             for i in reversed(bad_idx_list):
                 new.pop(i)
-        return self.compiler.unix_args_to_native(new._container)
+        return self._native_list(new._container)
 
     @staticmethod
     @functools.lru_cache(maxsize=None)
     def _cached_realpath(arg: str) -> str:
         return os.path.realpath(arg)
 
+    @staticmethod
+    @functools.lru_cache(maxsize=None)
+    def _is_group_flag(arg: str) -> bool:
+        return GROUP_FLAGS.search(arg) is not None
+
     def __repr__(self) -> str:
         self.flush_pre_post()
         return f'CLikeCompilerArgs({self.compiler!r}, {self._container!r})'
@@ -467,6 +472,42 @@ class CLikeCompiler(Compiler):
         return self.compiles(t, env, extra_args=extra_args,
                              dependencies=dependencies)[0]
 
+    def _compute_int_from_object(self, expression: str, prefix: str, env: 'Environment',
+                                 extra_args: T.Union[None, T.List[str], T.Callable[[CompileCheckMode], T.List[str]]],
+                                 dependencies: T.Optional[T.List['Dependency']]) -> T.Optional[int]:
+        """Read the value of a constant expression out of an object file.
+
+        The value is written as ASCII digits into an initialized array, which
+        compilers place verbatim in the object file. This is the same approach
+        CMake uses for its type size checks, and it takes a single compile
+        instead of one per bisection step. Returns None if the value could not
+        be found, for example because LTO objects don't contain the data.
+        """
+        digits = ', '.join(f'MESON_DIGIT({10 ** i}LL)' for i in reversed(range(19)))
+        t = f'''{prefix}
+        #include <stddef.h>
+        #define MESON_VALUE ((long long)({expression}))
+        #define MESON_DIGIT(p) (char)('0' + (MESON_VALUE < 0 ? -(MESON_VALUE / p % 10) : MESON_VALUE / p % 10))
+        const char meson_compute_int[] = {{
+            'M', 'E', 'S', 'O', 'N', '_', 'I', 'N', 'T', '[',
+            (char)(MESON_VALUE < 0 ? '-' : '+'), {digits}, ']'
+        }};
+        int main(int argc, char **argv) {{ (void)argv; return meson_compute_int[argc]; }}'''
+        with self._build_wrapper(t, env, extra_args, dependencies, mode=CompileCheckMode.COMPILE, want_output=True) as p:
+            if p.returncode != 0:
+                return None
+            try:
+                with open(p.output_name, 'rb') as f:
+                    data = f.read()
+            except OSError:
+                return None
+        m = re.search(rb'MESON_INT\[([-+])([0-9]{19})\]', data)
+        if not m:
+            mlog.debug('Could not find the value of the expression in the object file')
+            return None
+        value = int(m.group(2))
+        return -value if m.group(1) == b'-' else value
+
     def cross_compute_int(self, expression: str, low: T.Optional[int], high: T.Optional[int],
                           guess: T.Optional[int], prefix: str, env: 'Environment',
                           extra_args: T.Union[None, T.List[str], T.Callable[[CompileCheckMode], T.List[str]]] = None,
@@ -491,6 +532,17 @@ class CLikeCompiler(Compiler):
             except mesonlib.EnvironmentException:
                 pass
 
+        # Try to read the value out of an object file, and confirm it. Only
+        # fall back to the bisection below if that didn't work.
+        value = self._compute_int_from_object(expression, prefix, env, extra_args, dependencies)
+        if value is not None and self._compile_int(f'{expression} == {value}', prefix, env, extra_args, dependencies):
+            if isinstance(low, int) and isinstance(high, int):
+                if high < low:
+                    raise mesonlib.EnvironmentException('high limit smaller than low limit')
+                if not low <= value <= high:
+                    raise mesonlib.EnvironmentException('Value out of given range')
+            return value
+
         # If no bounds are given, compute them in the limit of int32
         maxint = 0x7fffffff
         minint = -0x80000000
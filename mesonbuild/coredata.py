@@ -25,6 +25,7 @@ from .mesonlib import (
 from .options import OptionKey
 
 from .machinefile import CmdLineFileParser
+from .programs import ProgramCache
 
 import ast
 import enum
@@ -40,7 +41,7 @@ if T.TYPE_CHECKING:
     from .compilers.compilers import Compiler, CompileResult, RunResult, CompileCheckMode
     from .dependencies.detect import TV_DepID
     from .environment import Environment
-    from .mesonlib import FileOrString
+    from .mesonlib import FileOrString, FileStamp
     from .cmake.traceparser import CMakeCacheEntry
     from .interpreterbase import SubProject
     from .options import UserOption
@@ -66,6 +67,10 @@ if T.TYPE_CHECKING:
     CompilerCheckCacheKey = T.Tuple[T.Tuple[str, ...], str, FileOrString, T.Tuple[str, ...], CompileCheckMode]
     # code, args
     RunCheckCacheKey = T.Tuple[str, T.Tuple[str, ...]]
+    # command, version of pkg-config, PKG_CONFIG environment variables, args
+    PkgConfigCacheKey = T.Tuple[T.Tuple[str, ...], str, T.Tuple[T.Tuple[str, str], ...], T.Tuple[str, ...]]
+    # (returncode, stdout, stderr), stamps of the files the result depends on
+    PkgConfigCacheEntry = T.Tuple[T.Tuple[int, str, str], T.Tuple[T.Tuple[str, FileStamp], ...]]
 
     # typeshed
     StrOrBytesPath = T.Union[str, bytes, os.PathLike[str], os.PathLike[bytes]]
@@ -281,6 +286,10 @@ class CoreData:
 
         self.compiler_check_cache: T.Dict['CompilerCheckCacheKey', 'CompileResult'] = OrderedDict()
         self.run_check_cache: T.Dict['RunCheckCacheKey', 'RunResult'] = OrderedDict()
+        # Results that were prefetched and not looked up by the evaluation yet
+        self.prefetched_checks: T.Set['CompilerCheckCacheKey'] = set()
+        self.program_cache = ProgramCache()
+        self.pkgconfig_cache: T.Dict['PkgConfigCacheKey', 'PkgConfigCacheEntry'] = {}
 
         # CMake cache
         self.cmake_cache: PerMachine[CMakeStateCache] = PerMachine(CMakeStateCache(), CMakeStateCache())
@@ -436,6 +445,11 @@ class CoreData:
                 'limit',
                 0,
                 min_value=0))
+            self.optstore.add_system_option('backend_split_ninja', options.UserBooleanOption(
+                'backend_split_ninja',
+                'Write the build statements of each directory to a separate '
+                'file, only rewriting the files that changed',
+                False))
         elif backend_name.startswith('vs'):
             self.optstore.add_system_option('backend_startup_project', options.UserStringOption(
                 'backend_startup_project',
@@ -516,6 +530,9 @@ class CoreData:
         self.deps.build.clear()
         self.compiler_check_cache.clear()
         self.run_check_cache.clear()
+        self.prefetched_checks.clear()
+        self.program_cache.clear()
+        self.pkgconfig_cache.clear()
 
     def get_nondefault_buildtype_args(self) -> T.List[T.Union[T.Tuple[str, str, str], T.Tuple[str, bool, bool]]]:
         result: T.List[T.Union[T.Tuple[str, str, str], T.Tuple[str, bool, bool]]] = []
@@ -9,7 +9,7 @@ import typing as T
 from .base import ExternalDependency, DependencyException, DependencyMethods, NotFoundDependency
 
 from ..mesonlib import listify, MachineChoice, PerMachine
-from .. import mlog
+from .. import mlog, profiler
 
 if T.TYPE_CHECKING:
     from ..environment import Environment
@@ -111,8 +111,9 @@ def find_external_dependency(name: str, env: 'Environment', kwargs: T.Dict[str,
     for c in candidates:
         # try this dependency method
         try:
-            d = c()
-            d._check_version()
+            with profiler.span(name, 'dependency'):
+                d = c()
+                d._check_version()
             pkgdep.append(d)
         except DependencyException as e:
             assert isinstance(c, functools.partial), 'for mypy'
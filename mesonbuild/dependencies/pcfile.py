@@ -0,0 +1,131 @@
+# SPDX-License-Identifier: Apache-2.0
+# Copyright 2025 The Meson development team
+
+"""Parsing of pkg-config .pc files.
+
+This follows the behaviour of pkgconf, the pkg-config implementation of most
+current distributions, where it differs from the original pkg-config.
+"""
+
+from __future__ import annotations
+
+import os
+import re
+import shlex
+import typing as T
+
+from .base import DependencyException
+
+# A variable reference in a value
+_VARIABLE_RE = re.compile(r'\$\{([^}]*)\}')
+# The name of a variable or field, followed by its separator
+_KEY_RE = re.compile(r'([A-Za-z0-9_.]+)\s*([:=])')
+# A module in a Requires field, with an optional version constraint
+_REQUIRE_RE = re.compile(r'([^\s,<>=!]+)(?:\s*(<=|>=|!=|=|<|>)\s*([^\s,]+))?')
+
+# Flags whose argument is a separate word, which belongs to their fragment
+_GROUPED_FLAGS = frozenset({'-framework', '-idirafter', '-imacros', '-include', '-iquote', '-isystem', '-Xlinker'})
+
+
+def _logical_lines(content: str) -> T.Iterator[str]:
+    '''Lines with continuations joined and comments removed'''
+    current = ''
+    for line in content.splitlines():
+        comment = re.search(r'(?<!\\)#', line)
+        if comment:
+            line = line[:comment.start()]
+        line = line.replace('\\#', '#')
+        if line.endswith('\\'):
+            current += line[:-1]
+            continue
+        yield current + line
+        current = ''
+    if current:
+        yield current
+
+
+class PcFile:
+
+    '''The contents of a .pc file.
+
+    Variables are expanded in the order they are defined, so the values of a
+    file depend on the variables defined from outside, which is why they are
+    only computed by :meth:`resolve`.
+    '''
+
+    def __init__(self, name: str, path: str) -> None:
+        self.name = name
+        self.path = path
+        # Variables and fields, with whether they are variables, in file order
+        self.entries: T.List[T.Tuple[bool, str, str]] = []
+        with open(path, encoding='utf-8', errors='replace') as f:
+            content = f.read()
+        for line in _logical_lines(content):
+            line = line.strip()
+            m = _KEY_RE.match(line)
+            if m:
+                self.entries.append((m.group(2) == '=', m.group(1), line[m.end():].strip()))
+
+    def resolve(self, globals: T.Mapping[str, str]) -> T.Tuple[T.Dict[str, str], T.Dict[str, str]]:
+        '''Return the expanded variables and fields of the file
+
+           @globals: Variables that take precedence over those of the file
+        '''
+        variables = {'pcfiledir': os.path.dirname(self.path).replace('\\', '/')}
+        fields: T.Dict[str, str] = {}
+
+        def lookup(m: T.Match[str]) -> str:
+            name = m.group(1)
+            return globals.get(name, variables.get(name, ''))
+
+        for is_variable, key, value in self.entries:
+            value = _VARIABLE_RE.sub(lookup, value)
+            if is_variable:
+                variables[key] = value
+            else:
+                # Field names are case insensitive
+                fields[key.lower()] = value
+        variables.update(globals)
+        return variables, fields
+
+
+def parse_requires(value: str) -> T.List[T.Tuple[str, T.Optional[str]]]:
+    '''Split a Requires field into module names and version constraints'''
+    return [(m.group(1), m.group(2) + m.group(3) if m.group(2) else None)
+            for m in _REQUIRE_RE.finditer(value)]
+
+
+def split_fragments(value: str) -> T.List[T.Tuple[str, ...]]:
+    '''Split a Cflags or Libs field into fragments, keeping flags together
+       with their separate arguments'''
+    try:
+        words = shlex.split(value)
+    except ValueError as e:
+        raise DependencyException(f'Could not split flags {value!r}: {e}')
+    fragments: T.List[T.Tuple[str, ...]] = []
+    i = 0
+    while i < len(words):
+        if words[i] in _GROUPED_FLAGS and i + 1 < len(words):
+            fragments.append((words[i], words[i + 1]))
+            i += 2
+        else:
+            fragments.append((words[i],))
+            i += 1
+    return fragments
+
+
+def merge_fragments(fragments: T.Iterable[T.Tuple[str, ...]]) -> T.List[T.Tuple[str, ...]]:
+    '''Remove duplicate fragments
+
+    Search paths only matter the first time they appear, while libraries must
+    come after everything that uses them, so only their last occurrence is
+    kept, as are those of all other flags.
+    '''
+    merged: T.Dict[T.Tuple[str, ...], None] = {}
+    for fragment in fragments:
+        if fragment[0].startswith(('-I', '-L')) and len(fragment) == 1:
+            merged.setdefault(fragment, None)
+        else:
+            merged.pop(fragment, None)
+            merged[fragment] = None
+    return list(merged)
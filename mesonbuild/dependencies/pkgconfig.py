@@ -6,8 +6,9 @@ from __future__ import annotations
 from pathlib import Path
 
 from .base import ExternalDependency, DependencyException, sort_libpaths, DependencyTypeName
+from .pcfile import PcFile, merge_fragments, parse_requires, split_fragments
 from ..mesonlib import (EnvironmentVariables, OrderedSet, PerMachine, Popen_safe, Popen_safe_logged, MachineChoice,
-                        join_args, MesonException)
+                        file_stamp, join_args, MesonException, version_compare)
 from ..options import OptionKey
 from ..programs import find_external_program, ExternalProgram
 from .. import mlog
@@ -22,10 +23,20 @@ if T.TYPE_CHECKING:
     from typing_extensions import Literal
     from .._typing import ImmutableListProtocol
 
+    from ..coredata import PkgConfigCacheEntry, PkgConfigCacheKey
     from ..environment import Environment
     from ..utils.core import EnvironOrDict
     from ..interpreter.type_checking import PkgConfigDefineType
 
+# The Requires and Requires.private fields of a .pc file
+_REQUIRES_RE = re.compile(r'^\s*requires(?:\.private)?\s*:(.*)$', re.IGNORECASE | re.MULTILINE)
+# A Requires.private field that is not empty
+_REQUIRES_PRIVATE_RE = re.compile(r'^\s*requires\.private\s*:[ \t]*\S', re.IGNORECASE | re.MULTILINE)
+# A module in such a field, with an optional version constraint
+_MODULE_RE = re.compile(r'([^\s,<>=!]+)(?:\s*(?:<=|>=|!=|=|<|>)\s*[^\s,]+)?')
+# A line of the output of pkgconf --env
+_ENV_LINE_RE = re.compile(r"(MESON_CFLAGS|MESON_LIBS)='([^']*)'")
+
 class PkgConfigInterface:
     '''Base class wrapping a pkg-config implementation'''
 
@@ -46,7 +57,12 @@ class PkgConfigInterface:
         for_machine = for_machine if env.is_cross_build() else MachineChoice.HOST
         impl = PkgConfigInterface.class_impl[for_machine]
         if impl is False:
-            impl = PkgConfigCLI(env, for_machine, silent, PkgConfigInterface.pkg_bin_per_machine[for_machine])
+            pkg_bin = PkgConfigInterface.pkg_bin_per_machine[for_machine]
+            # An overridden pkg-config is always run
+            if pkg_bin is None and env.coredata.optstore.get_value(OptionKey('pkg_config_impl')) == 'native':
+                impl = PkgConfigNative(env, for_machine, silent)
+            else:
+                impl = PkgConfigCLI(env, for_machine, silent, pkg_bin)
             if not impl.found():
                 impl = None
             if not impl and not silent:
@@ -87,6 +103,28 @@ class PkgConfigInterface:
         self.env = env
         self.for_machine = for_machine
 
+    def _get_search_env(self, uninstalled: bool = False) -> EnvironmentVariables:
+        '''Return the environment variables that tell pkg-config where to
+           look for modules'''
+        env = EnvironmentVariables()
+        key = OptionKey('pkg_config_path', machine=self.for_machine)
+        extra_paths: T.List[str] = self.env.coredata.optstore.get_value(key)[:]
+        if uninstalled:
+            bpath = self.env.get_build_dir()
+            if bpath is not None:
+                # uninstalled can only be used if a build dir exists.
+                uninstalled_path = Path(bpath, 'meson-uninstalled').as_posix()
+                if uninstalled_path not in extra_paths:
+                    extra_paths.insert(0, uninstalled_path)
+        env.set('PKG_CONFIG_PATH', extra_paths)
+        sysroot = self.env.properties[self.for_machine].get_sys_root()
+        if sysroot:
+            env.set('PKG_CONFIG_SYSROOT_DIR', [sysroot])
+        pkg_config_libdir_prop = self.env.properties[self.for_machine].get_pkg_config_libdir()
+        if pkg_config_libdir_prop:
+            env.set('PKG_CONFIG_LIBDIR', pkg_config_libdir_prop)
+        return env
+
     def found(self) -> bool:
         '''Return whether pkg-config is supported'''
         raise NotImplementedError
@@ -125,10 +163,18 @@ class PkgConfigCLI(PkgConfigInterface):
     def __init__(self, env: Environment, for_machine: MachineChoice, silent: bool,
                  pkgbin: T.Optional[ExternalProgram] = None) -> None:
         super().__init__(env, for_machine)
+        # Keys of the cached results that were found valid in this configuration
+        self._validated: T.Set[PkgConfigCacheKey] = set()
         self._detect_pkgbin(pkgbin)
         if self.pkgbin and not silent:
             mlog.log('Found pkg-config:', mlog.green('YES'), mlog.bold(f'({self.pkgbin.get_path()})'), mlog.blue(self.pkgbin_version))
 
+    def __getstate__(self) -> T.Dict[str, T.Any]:
+        state = self.__dict__.copy()
+        # Cached results must be checked again by the next configuration
+        state['_validated'] = set()
+        return state
+
     def found(self) -> bool:
         return bool(self.pkgbin)
 
@@ -149,6 +195,10 @@ class PkgConfigCLI(PkgConfigInterface):
     @lru_cache(maxsize=None)
     def cflags(self, name: str, allow_system: bool = False,
                define_variable: PkgConfigDefineType = None) -> ImmutableListProtocol[str]:
+        if not allow_system and not define_variable:
+            batched = self._cflags_and_libs(name)
+            if batched is not None:
+                return batched[0]
         env = None
         if allow_system:
             env = os.environ.copy()
@@ -164,6 +214,10 @@ class PkgConfigCLI(PkgConfigInterface):
     @lru_cache(maxsize=None)
     def libs(self, name: str, static: bool = False, allow_system: bool = False,
              define_variable: PkgConfigDefineType = None) -> ImmutableListProtocol[str]:
+        if not static and allow_system and not define_variable:
+            batched = self._cflags_and_libs(name)
+            if batched is not None:
+                return batched[1]
         env = None
         if allow_system:
             env = os.environ.copy()
@@ -178,6 +232,41 @@ class PkgConfigCLI(PkgConfigInterface):
             raise DependencyException(f'Could not generate libs for {name}:\n{err}\n')
         return self._split_args(out)
 
+    @lru_cache(maxsize=None)
+    def _supports_env(self) -> bool:
+        # pkgconf prints flags as shell variable assignments with --env,
+        # pkg-config rejects the unknown option
+        ret, _, _ = self._call_pkgbin(['--env=MESON', '--cflags', 'pkg-config'])
+        return ret == 0
+
+    @lru_cache(maxsize=None)
+    def _cflags_and_libs(self, name: str) -> T.Optional[T.Tuple[T.List[str], T.List[str]]]:
+        '''Return the cflags and the libs including system paths of a module
+           with a single invocation, or None if that is not possible, in
+           which case they must be queried separately.
+        '''
+        if not self._supports_env():
+            return None
+        # pkgconf leaves out the cflags of private requirements, and does not
+        # fail when they are missing, with --env
+        found = self._module_files(name, self._setup_env(os.environ))
+        if found is None or any(_REQUIRES_PRIVATE_RE.search(content) for _, content in found[1]):
+            return None
+        env = os.environ.copy()
+        env['PKG_CONFIG_ALLOW_SYSTEM_LIBS'] = '1'
+        ret, out, _ = self._call_pkgbin(['--env=MESON', '--cflags', '--libs', name], env=env)
+        if ret != 0:
+            # Let the separate queries report the error
+            return None
+        values = {'MESON_CFLAGS': '', 'MESON_LIBS': ''}
+        for line in out.splitlines():
+            m = _ENV_LINE_RE.fullmatch(line)
+            if not m:
+                # Quotes in flags are escaped in ways that can't be undone
+                return None
+            values[m.group(1)] = m.group(2)
+        return self._split_args(values['MESON_CFLAGS']), self._split_args(values['MESON_LIBS'])
+
     @lru_cache(maxsize=None)
     def variable(self, name: str, variable_name: str,
                  define_variable: PkgConfigDefineType) -> T.Optional[str]:
@@ -254,23 +343,7 @@ class PkgConfigCLI(PkgConfigInterface):
         return out.strip()
 
     def _get_env(self, uninstalled: bool = False) -> EnvironmentVariables:
-        env = EnvironmentVariables()
-        key = OptionKey('pkg_config_path', machine=self.for_machine)
-        extra_paths: T.List[str] = self.env.coredata.optstore.get_value(key)[:]
-        if uninstalled:
-            bpath = self.env.get_build_dir()
-            if bpath is not None:
-                # uninstalled can only be used if a build dir exists.
-                uninstalled_path = Path(bpath, 'meson-uninstalled').as_posix()
-                if uninstalled_path not in extra_paths:
-                    extra_paths.insert(0, uninstalled_path)
-        env.set('PKG_CONFIG_PATH', extra_paths)
-        sysroot = self.env.properties[self.for_machine].get_sys_root()
-        if sysroot:
-            env.set('PKG_CONFIG_SYSROOT_DIR', [sysroot])
-        pkg_config_libdir_prop = self.env.properties[self.for_machine].get_pkg_config_libdir()
-        if pkg_config_libdir_prop:
-            env.set('PKG_CONFIG_LIBDIR', pkg_config_libdir_prop)
+        env = self._get_search_env(uninstalled)
         env.set('PKG_CONFIG', [join_args(self.pkgbin.get_command())])
         return env
 
@@ -283,13 +356,325 @@ class PkgConfigCLI(PkgConfigInterface):
                 mlog.debug(f'env[{key}]: {value}')
         return env
 
+    @lru_cache(maxsize=None)
+    def _default_search_dirs(self) -> T.List[str]:
+        ret, out, _ = self._call_pkgbin(['--variable', 'pc_path', 'pkg-config'])
+        return [d for d in out.split(os.pathsep) if d] if ret == 0 else []
+
+    def _module_files(self, module: str, env: T.Mapping[str, str]) -> T.Optional[T.Tuple[T.List[str], T.List[T.Tuple[str, str]]]]:
+        '''The search path of pkg-config, and the paths and contents of the
+           .pc files of a module and of all modules it requires, or None if
+           they can't be determined.
+        '''
+        dirs = [d for d in env.get('PKG_CONFIG_PATH', '').split(os.pathsep) if d]
+        libdir = env.get('PKG_CONFIG_LIBDIR')
+        if libdir is not None:
+            dirs += [d for d in libdir.split(os.pathsep) if d]
+        else:
+            dirs += self._default_search_dirs()
+        suffixes = ['.pc'] if 'PKG_CONFIG_DISABLE_UNINSTALLED' in env else ['-uninstalled.pc', '.pc']
+
+        files: T.List[T.Tuple[str, str]] = []
+        todo = [module]
+        seen: T.Set[str] = set()
+        while todo:
+            name = todo.pop()
+            if name in seen:
+                continue
+            seen.add(name)
+            if name.endswith('.pc') or '/' in name or os.sep in name:
+                candidates = [name]
+            else:
+                candidates = [os.path.join(d, name + s) for d in dirs for s in suffixes]
+            fname = next((c for c in candidates if os.path.isfile(c)), None)
+            if fname is None:
+                continue
+            try:
+                with open(fname, encoding='utf-8', errors='replace') as f:
+                    content = f.read()
+            except OSError:
+                return None
+            files.append((fname, content))
+            for requires in _REQUIRES_RE.findall(content):
+                if '$' in requires:
+                    # Modules named through variables are not resolved
+                    return None
+                todo.extend(m.group(1) for m in _MODULE_RE.finditer(requires))
+        return dirs, files
+
+    def _module_stamps(self, module: str, env: T.Mapping[str, str]) -> T.Optional[T.List[T.Tuple[str, T.Optional[T.Tuple[int, int]]]]]:
+        '''Stamps of the search path of pkg-config and of the .pc files of
+           a module and of all modules it requires, or None if they can't be
+           determined.
+        '''
+        found = self._module_files(module, env)
+        if found is None:
+            return None
+        dirs, files = found
+        # Adding or removing a .pc file changes the directory
+        return [(d, file_stamp(d)) for d in dirs] + [(fname, file_stamp(fname)) for fname, _ in files]
+
+    def _stamps(self, args: T.List[str], env: T.Mapping[str, str]) -> T.Optional[T.Tuple[T.Tuple[str, T.Optional[T.Tuple[int, int]]], ...]]:
+        '''Stamps of everything the result of a query depends on, or None
+           if it must not be cached.
+        '''
+        assert isinstance(self.pkgbin, ExternalProgram)
+        pkgbin_path = self.pkgbin.get_path()
+        if pkgbin_path is None or '--list-all' in args:
+            return None
+        stamps = [(pkgbin_path, file_stamp(pkgbin_path))]
+        # The virtual pkg-config module describes pkg-config itself
+        if args[-1] != 'pkg-config':
+            module_stamps = self._module_stamps(args[-1], env)
+            if module_stamps is None:
+                return None
+            stamps += module_stamps
+        return tuple(stamps)
+
     def _call_pkgbin(self, args: T.List[str], env: T.Optional[EnvironOrDict] = None) -> T.Tuple[int, str, str]:
         assert isinstance(self.pkgbin, ExternalProgram)
         env = env or os.environ
         env = self._setup_env(env)
         cmd = self.pkgbin.get_command() + args
+        # Results are stored in the coredata, so that they are kept across
+        # reconfigures, and checked once per configuration before their use
+        cache = self.env.coredata.pkgconfig_cache
+        key: PkgConfigCacheKey = (
+            tuple(cmd), self.pkgbin_version,
+            tuple(sorted((k, v) for k, v in env.items() if k.startswith('PKG_CONFIG'))),
+            tuple(args))
+        entry: T.Optional[PkgConfigCacheEntry] = cache.get(key)
+        if entry is not None and key in self._validated:
+            return entry[0]
+        stamps = self._stamps(args, env)
+        if entry is not None and stamps is not None and entry[1] == stamps:
+            self._validated.add(key)
+            rc, out, err = entry[0]
+            mlog.debug('-----------')
+            mlog.debug(f'Cached: `{join_args(cmd)}` -> {rc}')
+            if out:
+                mlog.debug(f'stdout:\n{out}\n-----------')
+            if err:
+                mlog.debug(f'stderr:\n{err}\n-----------')
+            return entry[0]
         p, out, err = Popen_safe_logged(cmd, env=env)
-        return p.returncode, out.strip(), err.strip()
+        result = p.returncode, out.strip(), err.strip()
+        if stamps is not None:
+            cache[key] = (result, stamps)
+            self._validated.add(key)
+        return result
+
+class PkgConfigNative(PkgConfigInterface):
+    '''Built-in pkg-config implementation
+
+    The .pc files are read and evaluated directly, which avoids starting a
+    pkg-config process for each query. The search path is indexed once, so
+    modules that do not exist are not searched for in every directory again.
+    pkg-config is only run to ask for its default search path and system
+    directories when they are not given in the environment.
+    '''
+
+    def __init__(self, env: Environment, for_machine: MachineChoice, silent: bool) -> None:
+        super().__init__(env, for_machine)
+        environ = self._get_search_env().get_env(os.environ)
+        self.sysroot = environ.get('PKG_CONFIG_SYSROOT_DIR', '')
+        self.globals = {
+            'pc_sysrootdir': self.sysroot or '/',
+            'pc_top_builddir': environ.get('PKG_CONFIG_TOP_BUILD_DIR', '$(top_builddir)'),
+        }
+        self.allow_system_cflags = 'PKG_CONFIG_ALLOW_SYSTEM_CFLAGS' in environ
+        self.allow_system_libs = 'PKG_CONFIG_ALLOW_SYSTEM_LIBS' in environ
+        self.uninstalled = 'PKG_CONFIG_DISABLE_UNINSTALLED' not in environ
+
+        self.search_dirs = self._split_path(environ.get('PKG_CONFIG_PATH'))
+        default_dirs = self._default_dirs(environ, 'PKG_CONFIG_LIBDIR', 'pc_path', None)
+        self.system_include_dirs = self._default_dirs(environ, 'PKG_CONFIG_SYSTEM_INCLUDE_PATH',
+                                                      'pc_system_includedirs', ['/usr/include'])
+        self.system_lib_dirs = self._default_dirs(environ, 'PKG_CONFIG_SYSTEM_LIBRARY_PATH',
+                                                  'pc_system_libdirs', ['/usr/lib', '/lib'])
+        self._found = default_dirs is not None
+        if default_dirs is not None:
+            self.search_dirs += default_dirs
+        if self._found and not silent:
+            mlog.log('Found pkg-config:', mlog.green('YES'), mlog.bold('(native)'))
+
+    def found(self) -> bool:
+        return self._found
+
+    @staticmethod
+    def _split_path(value: T.Optional[str]) -> T.List[str]:
+        return [d for d in value.split(os.pathsep) if d] if value else []
+
+    def _default_dirs(self, environ: T.Mapping[str, str], envvar: str, variable: str,
+                      fallback: T.Optional[T.List[str]]) -> T.Optional[T.List[str]]:
+        '''Return directories from the environment, or the default of the
+           pkg-config program, or the fallback if there is no pkg-config'''
+        if envvar in environ:
+            return self._split_path(environ[envvar])
+        cli = PkgConfigInterface.class_cli_impl[self.for_machine]
+        if cli is False:
+            cli = PkgConfigCLI(self.env, self.for_machine, True)
+            if not cli.found():
+                cli = None
+            PkgConfigInterface.class_cli_impl[self.for_machine] = cli
+        if cli is None:
+            return fallback
+        try:
+            value = cli.variable('pkg-config', variable, None)
+        except DependencyException:
+            value = None
+        return self._split_path(value) if value else fallback
+
+    @lru_cache(maxsize=None)
+    def _index(self) -> T.Tuple[T.Dict[str, str], T.List[str]]:
+        '''Map the names of all modules on the search path to their file, and
+           list the names of all files'''
+        index: T.Dict[str, str] = {}
+        names: T.Dict[str, None] = {}
+        for d in self.search_dirs:
+            try:
+                files = sorted(f for f in os.listdir(d) if f.endswith('.pc'))
+            except OSError:
+                continue
+            found = {f[:-3]: os.path.join(d, f) for f in files}
+            names.update(dict.fromkeys(found))
+            if self.uninstalled:
+                # An uninstalled module is preferred over the installed one
+                # in the same directory
+                found.update({f[:-len('-uninstalled.pc')]: os.path.join(d, f)
+                              for f in files if f.endswith('-uninstalled.pc')})
+            for name, fname in found.items():
+                index.setdefault(name, fname)
+        return index, list(names)
+
+    @lru_cache(maxsize=None)
+    def _load(self, name: str) -> T.Optional[PcFile]:
+        if name.endswith('.pc') and os.path.isfile(name):
+            fname: T.Optional[str] = name
+        else:
+            fname = self._index()[0].get(name)
+        if fname is None:
+            return None
+        mlog.debug(f'Reading pkg-config file {fname!r}')
+        try:
+            return PcFile(name, fname)
+        except OSError as e:
+            raise DependencyException(f'Could not read {fname!r}: {e}')
+
+    @lru_cache(maxsize=None)
+    def _resolve(self, name: str, define_variable: PkgConfigDefineType) -> T.Tuple[T.Dict[str, str], T.Dict[str, str]]:
+        pcfile = self._load(name)
+        if pcfile is None:
+            raise DependencyException(f'Package {name} was not found in the pkg-config search path.')
+        return pcfile.resolve({**self.globals, **dict(define_variable or ())})
+
+    def _requires(self, name: str, private: bool,
+                  define_variable: PkgConfigDefineType) -> T.List[str]:
+        '''Return the modules a module requires, after checking that they
+           exist in the required versions'''
+        fields = self._resolve(name, define_variable)[1]
+        requires = parse_requires(fields.get('requires', ''))
+        if private:
+            requires += parse_requires(fields.get('requires.private', ''))
+        for module, constraint in requires:
+            version = self._resolve(module, define_variable)[1].get('version', '')
+            if constraint is not None and not version_compare(version, constraint):
+                raise DependencyException(f'Package dependency requirement \'{module} {constraint}\' could not be '
+                                          f'satisfied.\nPackage \'{module}\' has version \'{version}\'.')
+        return [module for module, _ in requires]
+
+    def _fragments(self, name: str, field_names: T.Tuple[str, ...], private: bool,
+                   define_variable: PkgConfigDefineType) -> T.List[T.Tuple[str, ...]]:
+        '''Return the merged flags of a module and all modules it requires,
+           which are visited depth first'''
+        merged: T.Dict[str, T.List[T.Tuple[str, ...]]] = {}
+
+        def visit(module: str, parents: T.FrozenSet[str]) -> T.List[T.Tuple[str, ...]]:
+            if module not in merged:
+                fields = self._resolve(module, define_variable)[1]
+                fragments: T.List[T.Tuple[str, ...]] = []
+                for field in field_names:
+                    fragments += split_fragments(fields.get(field, ''))
+                for required in self._requires(module, private, define_variable):
+                    # Requirement cycles are broken like pkg-config does
+                    if required not in parents:
+                        fragments += visit(required, parents | {module})
+                # Merging is associative, so subtrees that are required
+                # multiple times are only merged once
+                merged[module] = merge_fragments(fragments)
+            return merged[module]
+
+        return visit(name, frozenset())
+
+    def _finalize(self, fragments: T.List[T.Tuple[str, ...]], flag: str,
+                  system_dirs: T.Optional[T.List[str]]) -> T.List[str]:
+        '''Prepend the sysroot to search paths, and remove system search paths
+           unless they are allowed'''
+        system = {os.path.normpath(d) for d in system_dirs} if system_dirs is not None else set()
+        result: T.List[str] = []
+        for fragment in fragments:
+            if len(fragment) == 1 and fragment[0].startswith(flag):
+                path = fragment[0][2:]
+                if self.sysroot and path.startswith('/') and not path.startswith(self.sysroot):
+                    path = self.sysroot + path
+                if os.path.normpath(path) in system:
+                    continue
+                fragment = (flag + path,)
+            result += fragment
+        return result
+
+    @lru_cache(maxsize=None)
+    def version(self, name: str) -> T.Optional[str]:
+        mlog.debug(f'Determining dependency {name!r} with native pkg-config')
+        try:
+            version = self._resolve(name, None)[1].get('version', '')
+            # Only public requirements must be satisfied to find a module
+            todo = [name]
+            seen: T.Set[str] = set()
+            while todo:
+                module = todo.pop()
+                if module not in seen:
+                    seen.add(module)
+                    todo += self._requires(module, False, None)
+        except DependencyException as e:
+            mlog.debug(str(e))
+            return None
+        return version
+
+    @lru_cache(maxsize=None)
+    def cflags(self, name: str, allow_system: bool = False,
+               define_variable: PkgConfigDefineType = None) -> ImmutableListProtocol[str]:
+        fragments = self._fragments(name, ('cflags',), True, define_variable)
+        allow_system = allow_system or self.allow_system_cflags
+        cflags = self._finalize(fragments, '-I', None if allow_system else self.system_include_dirs)
+        mlog.debug(f'Got native pkg-config cflags for {name}: {cflags}')
+        return cflags
+
+    @lru_cache(maxsize=None)
+    def libs(self, name: str, static: bool = False, allow_system: bool = False,
+             define_variable: PkgConfigDefineType = None) -> ImmutableListProtocol[str]:
+        field_names = ('libs', 'libs.private') if static else ('libs',)
+        fragments = self._fragments(name, field_names, static, define_variable)
+        allow_system = allow_system or self.allow_system_libs
+        libs = self._finalize(fragments, '-L', None if allow_system else self.system_lib_dirs)
+        mlog.debug(f'Got native pkg-config libs for {name}: {libs}')
+        return libs
+
+    @lru_cache(maxsize=None)
+    def variable(self, name: str, variable_name: str,
+                 define_variable: PkgConfigDefineType) -> T.Optional[str]:
+        variable = self._resolve(name, define_variable)[0].get(variable_name)
+        if variable is None:
+            return None
+        # Paths are relative to the sysroot, like the search paths in flags
+        if self.sysroot and variable.startswith('/') and not variable.startswith(self.sysroot):
+            variable = self.sysroot + variable
+        mlog.debug(f'Got pkg-config variable {variable_name} : {variable}')
+        return variable
+
+    @lru_cache(maxsize=None)
+    def list_all(self) -> ImmutableListProtocol[str]:
+        return self._index()[1]
 
 
 class PkgConfigDependency(ExternalDependency):
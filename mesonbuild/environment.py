@@ -22,7 +22,7 @@ from .mesonlib import (
 )
 from .options import OptionKey
 from . import mlog
-from .programs import ExternalProgram
+from .programs import ExternalProgram, set_program_cache
 
 from .envconfig import (
     BinaryTable, MachineInfo, Properties, known_cpu_families, CMakeVariables,
@@ -590,6 +590,7 @@ class Environment:
             # Just create a fresh coredata in this case
             self.scratch_dir = ''
             self.create_new_coredata(cmd_options)
+        set_program_cache(self.coredata.program_cache)
 
         ## locally bind some unfrozen configuration
 
@@ -5,6 +5,7 @@ from __future__ import annotations
 
 import collections
 import enum
+from concurrent.futures import ThreadPoolExecutor
 import functools
 import os
 import itertools
@@ -100,6 +101,41 @@ if T.TYPE_CHECKING:
         depends: T.List[T.Union[build.BuildTarget, build.CustomTarget, build.CustomTargetIndex]]
 
 
+_T = T.TypeVar('_T')
+
+
+def _run_checks(checks: T.Sequence[T.Callable[[], _T]]) -> T.List[_T]:
+    """Run independent compiler checks concurrently.
+
+    Most of the time of a check is spent waiting on the compiler process, so
+    threads are enough to keep many compilers busy. The output of each check
+    is deferred and then replayed, so both results and logs come out in the
+    same order as if the checks were run one after the other.
+    """
+    workers = min(len(checks), mesonlib.determine_worker_count())
+    if workers <= 1:
+        return [c() for c in checks]
+
+    def wrapper(check: T.Callable[[], _T]) -> T.Tuple[T.Optional[_T], T.Optional[Exception], T.List[T.Callable[[], None]]]:
+        with mlog.deferred() as queue:
+            try:
+                return check(), None, queue
+            except Exception as e:
+                return None, e, queue
+
+    with ThreadPoolExecutor(workers) as executor:
+        outcomes = list(executor.map(wrapper, checks))
+
+    results: T.List[_T] = []
+    for result, exc, queue in outcomes:
+        for q in queue:
+            q()
+        if exc is not None:
+            raise exc
+        results.append(result)
+    return results
+
+
 class _TestMode(enum.Enum):
 
     """Whether we're doing a compiler or linker check."""
@@ -202,8 +238,10 @@ class CompilerHolder(ObjectHolder['Compiler']):
                              'check_header': self.check_header_method,
                              'has_header': self.has_header_method,
                              'has_header_symbol': self.has_header_symbol_method,
+                             'get_supported_headers': self.get_supported_headers_method,
                              'run': self.run_method,
                              'has_function': self.has_function_method,
+                             'get_supported_functions': self.get_supported_functions_method,
                              'has_member': self.has_member_method,
                              'has_members': self.has_members_method,
                              'has_type': self.has_type_method,
@@ -283,6 +321,40 @@ class CompilerHolder(ObjectHolder['Compiler']):
         deps = dependencies.get_leaf_external_dependencies(deps)
         return deps, self._dep_msg(deps, compile_only, endl)
 
+    def prefetch_check(self, method: str, args: T.Tuple[str, ...], prefix: str) -> None:
+        """Run the check done by calling a method with only positional
+        arguments and a prefix, without logging it.
+
+        The compiler invocation must be exactly the same as the one of the
+        method, so that it later finds the result in the check cache.
+        """
+        kwargs: 'HeaderKW' = {
+            'required': False,
+            'args': [],
+            'dependencies': [],
+            'include_directories': [],
+            'prefix': prefix,
+            'no_builtin_args': False,
+        }
+        if method == 'has_header':
+            self.compiler.has_header(args[0], prefix, self.environment,
+                                     extra_args=functools.partial(self._determine_args, kwargs), dependencies=[])
+        elif method == 'has_header_symbol':
+            self.compiler.has_header_symbol(args[0], args[1], prefix, self.environment,
+                                            extra_args=functools.partial(self._determine_args, kwargs), dependencies=[])
+        elif method == 'has_function':
+            self.compiler.has_function(args[0], prefix, self.environment,
+                                       extra_args=self._determine_args(kwargs), dependencies=[])
+        elif method == 'has_type':
+            self.compiler.has_type(args[0], prefix, self.environment,
+                                   extra_args=functools.partial(self._determine_args, kwargs), dependencies=[])
+        elif method == 'has_argument':
+            self.compiler.has_multi_arguments([args[0]], self.environment)
+        elif method == 'has_link_argument':
+            self.compiler.has_multi_link_arguments([args[0]], self.environment)
+        else:
+            raise mesonlib.MesonBugException(f'Compiler method {method} can not be prefetched')
+
     @typed_pos_args('compiler.alignment', str)
     @typed_kwargs(
         'compiler.alignment',
@@ -432,6 +504,25 @@ class CompilerHolder(ObjectHolder['Compiler']):
         mlog.log('Checking for function', mlog.bold(funcname, True), msg, hadtxt, cached_msg)
         return had
 
+    @FeatureNew('compiler.get_supported_functions', '1.8.0')
+    @typed_pos_args('compiler.get_supported_functions', varargs=str)
+    @typed_kwargs('compiler.get_supported_functions', *_COMMON_KWS)
+    def get_supported_functions_method(self, args: T.Tuple[T.List[str]], kwargs: 'CommonKW') -> T.List[str]:
+        extra_args = self._determine_args(kwargs)
+        deps, msg = self._determine_dependencies(kwargs['dependencies'], compile_only=False)
+        results = _run_checks([
+            functools.partial(self.compiler.has_function, funcname, kwargs['prefix'], self.environment,
+                              extra_args=extra_args, dependencies=deps)
+            for funcname in args[0]])
+        supported: T.List[str] = []
+        for funcname, (had, cached) in zip(args[0], results):
+            hadtxt = mlog.green('YES') if had else mlog.red('NO')
+            cached_msg = mlog.blue('(cached)') if cached else ''
+            mlog.log('Checking for function', mlog.bold(funcname, True), msg, hadtxt, cached_msg)
+            if had:
+                supported.append(funcname)
+        return supported
+
     @typed_pos_args('compiler.has_type', str)
     @typed_kwargs('compiler.has_type', _HAS_REQUIRED_KW, *_COMMON_KWS)
     def has_type_method(self, args: T.Tuple[str], kwargs: 'HasKW') -> bool:
@@ -652,6 +743,25 @@ class CompilerHolder(ObjectHolder['Compiler']):
     def has_header_method(self, args: T.Tuple[str], kwargs: 'HeaderKW') -> bool:
         return self._has_header_impl(args[0], kwargs)
 
+    @FeatureNew('compiler.get_supported_headers', '1.8.0')
+    @typed_pos_args('compiler.get_supported_headers', varargs=str)
+    @typed_kwargs('compiler.get_supported_headers', *_COMMON_KWS)
+    def get_supported_headers_method(self, args: T.Tuple[T.List[str]], kwargs: 'CommonKW') -> T.List[str]:
+        extra_args = functools.partial(self._determine_args, kwargs)
+        deps, msg = self._determine_dependencies(kwargs['dependencies'])
+        results = _run_checks([
+            functools.partial(self.compiler.has_header, hname, kwargs['prefix'], self.environment,
+                              extra_args=extra_args, dependencies=deps)
+            for hname in args[0]])
+        supported: T.List[str] = []
+        for hname, (haz, cached) in zip(args[0], results):
+            h = mlog.green('YES') if haz else mlog.red('NO')
+            cached_msg = mlog.blue('(cached)') if cached else ''
+            mlog.log('Has header', mlog.bold(hname, True), msg, h, cached_msg)
+            if haz:
+                supported.append(hname)
+        return supported
+
     @typed_pos_args('compiler.has_header_symbol', str, str)
     @typed_kwargs('compiler.has_header_symbol', *_HEADER_KWS)
     def has_header_symbol_method(self, args: T.Tuple[str, str], kwargs: 'HeaderKW') -> bool:
@@ -793,8 +903,9 @@ class CompilerHolder(ObjectHolder['Compiler']):
         supported_args: T.List[str] = []
         checked = kwargs['checked']
 
-        for arg in args[0]:
-            if not self._has_argument_impl([arg]):
+        results = _run_checks([functools.partial(self._has_argument_impl, [arg]) for arg in args[0]])
+        for arg, result in zip(args[0], results):
+            if not result:
                 msg = f'Compiler for {self.compiler.get_display_language()} does not support "{arg}"'
                 if checked == 'warn':
                     mlog.warning(msg)
@@ -830,11 +941,8 @@ class CompilerHolder(ObjectHolder['Compiler']):
     @noKwargs
     @typed_pos_args('compiler.get_supported_link_arguments', varargs=str)
     def get_supported_link_arguments_method(self, args: T.Tuple[T.List[str]], kwargs: 'TYPE_kwargs') -> T.List[str]:
-        supported_args: T.List[str] = []
-        for arg in args[0]:
-            if self._has_argument_impl([arg], mode=_TestMode.LINKER):
-                supported_args.append(arg)
-        return supported_args
+        results = _run_checks([functools.partial(self._has_argument_impl, [arg], mode=_TestMode.LINKER) for arg in args[0]])
+        return [arg for arg, result in zip(args[0], results) if result]
 
     @FeatureNew('compiler.first_supported_link_argument_method', '0.46.0')
     @noKwargs
@@ -879,7 +987,8 @@ class CompilerHolder(ObjectHolder['Compiler']):
     @noKwargs
     @typed_pos_args('compiler.get_supported_function_attributes', varargs=str)
     def get_supported_function_attributes_method(self, args: T.Tuple[T.List[str]], kwargs: 'TYPE_kwargs') -> T.List[str]:
-        return [a for a in args[0] if self._has_function_attribute_impl(a)]
+        results = _run_checks([functools.partial(self._has_function_attribute_impl, a) for a in args[0]])
+        return [a for a, result in zip(args[0], results) if result]
 
     @FeatureNew('compiler.get_argument_syntax_method', '0.49.0')
     @noPosargs
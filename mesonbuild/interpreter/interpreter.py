@@ -12,10 +12,12 @@ from .. import coredata
 from .. import dependencies
 from .. import mlog
 from .. import options
+from .. import profiler
 from .. import build
 from .. import optinterpreter
 from .. import compilers
 from .. import envconfig
+from ..astcache import ASTCache, get_ast_cache
 from ..wrap import wrap, WrapMode
 from .. import mesonlib
 from ..mesonlib import (EnvironmentVariables, ExecutableSerialisation, MesonBugException, MesonException, HoldableObject,
@@ -210,6 +212,59 @@ class Summary:
             line_len += v_len
         mlog.log(*line, sep=list_sep, display_timestamp=False)
 
+class InstallableFiles:
+
+    """An index of the files and directories that will be installed.
+
+    Variables of dependencies may refer to files of a subproject, as long as
+    they are installed. Data and install directories are only ever appended
+    to the Build, so the index is brought up to date with the new entries
+    when queried instead of being rebuilt for every query. The lists are
+    replaced when the Build of a subproject is merged back, in which case the
+    index is rebuilt once.
+    """
+
+    def __init__(self, srcdir: str, builddir: str):
+        self.srcdir = srcdir
+        self.builddir = builddir
+        self.data: T.List[build.Data] = []
+        self.install_dirs: T.List[build.InstallDir] = []
+        self.files: T.Set[Path] = set()
+        self.dirs: T.Set[str] = set()
+        # The lengths of all strings in self.dirs, any of them that is a
+        # prefix of a path has one of these lengths.
+        self.dir_lengths: T.Set[int] = set()
+        self.data_count = 0
+        self.dirs_count = 0
+
+    def update(self, b: build.Build) -> None:
+        if b.data is not self.data:
+            self.data = b.data
+            self.files.clear()
+            self.data_count = 0
+        for d in self.data[self.data_count:]:
+            for s in d.sources:
+                self.files.add(Path(s.absolute_path(self.srcdir, self.builddir)))
+        self.data_count = len(self.data)
+
+        if b.install_dirs is not self.install_dirs:
+            self.install_dirs = b.install_dirs
+            self.dirs.clear()
+            self.dir_lengths.clear()
+            self.dirs_count = 0
+        for i in self.install_dirs[self.dirs_count:]:
+            d = str(Path(self.srcdir, i.source_subdir))
+            self.dirs.add(d)
+            self.dir_lengths.add(len(d))
+        self.dirs_count = len(self.install_dirs)
+
+    def contains(self, fpath: Path) -> bool:
+        if fpath in self.files:
+            return True
+        # Installed directories match any path starting with them
+        path = str(fpath)
+        return any(path[:n] in self.dirs for n in self.dir_lengths)
+
 known_library_kwargs = (
     build.known_shlib_kwargs |
     build.known_stlib_kwargs |
@@ -297,6 +352,7 @@ class Interpreter(InterpreterBase, HoldableObject):
         self.subprojects: T.Dict[str, SubprojectHolder] = {}
         self.subproject_stack: T.List[str] = []
         self.configure_file_outputs: T.Dict[str, int] = {}
+        self.installable_files = InstallableFiles(self.environment.source_dir, self.environment.build_dir)
         # Passed from the outside, only used in subprojects.
         if default_project_options:
             self.default_project_options = default_project_options.copy()
@@ -336,6 +392,12 @@ class Interpreter(InterpreterBase, HoldableObject):
         self.build_def_files.add(build_filename)
         super().load_root_meson_file()
 
+    def get_ast_cache(self) -> ASTCache:
+        return get_ast_cache(os.path.join(self.environment.get_scratch_dir(), 'ast-cache'))
+
+    def parse_buildfile(self, code: str, fname: str) -> mparser.CodeBlockNode:
+        return self.get_ast_cache().parse(code, fname)
+
     def build_func_dict(self) -> None:
         self.funcs.update({'add_global_arguments': self.func_add_global_arguments,
                            'add_global_link_arguments': self.func_add_global_link_arguments,
@@ -914,7 +976,8 @@ class Interpreter(InterpreterBase, HoldableObject):
 
         r = self.environment.wrap_resolver
         try:
-            subdir, method = r.resolve(subp_name, force_method)
+            with profiler.span(subp_name, 'wrap'):
+                subdir, method = r.resolve(subp_name, force_method)
         except wrap.WrapException as e:
             if force_method is not None:
                 prefix = force_method.title() + ' subproject'
@@ -944,7 +1007,8 @@ class Interpreter(InterpreterBase, HoldableObject):
         }
 
         try:
-            return methods_map[method](subp_name, subdir, default_options, kwargs)
+            with profiler.span(subp_name, 'subproject', method=method):
+                return methods_map[method](subp_name, subdir, default_options, kwargs)
         # Invalid code is always an error
         except InvalidCode:
             raise
@@ -1214,7 +1278,7 @@ class Interpreter(InterpreterBase, HoldableObject):
                 # see if the option file has changed
                 self.coredata.options_files[self.subproject] = (option_file, hashlib.sha1(f.read()).hexdigest())
             oi = optinterpreter.OptionInterpreter(self.environment.coredata.optstore, self.subproject)
-            oi.process(option_file)
+            oi.process(option_file, self.get_ast_cache())
             self.coredata.update_project_options(oi.options, self.subproject)
             self.add_build_def_file(option_file)
         else:
@@ -1678,7 +1742,10 @@ class Interpreter(InterpreterBase, HoldableObject):
         args = mesonlib.listify(args)
 
         extra_info: T.List[mlog.TV_Loggable] = []
-        progobj = self.program_lookup(args, for_machine, default_options, required, search_dirs, wanted, version_arg, version_func, extra_info)
+        span = (profiler.span(', '.join(str(a) for a in args), 'program')
+                if profiler.is_enabled() else profiler.NULL_SPAN)
+        with span:
+            progobj = self.program_lookup(args, for_machine, default_options, required, search_dirs, wanted, version_arg, version_func, extra_info)
         if progobj is None or not self.check_program_version(progobj, wanted, version_func, extra_info):
             progobj = self.notfound_program(args)
 
@@ -2307,7 +2374,9 @@ class Interpreter(InterpreterBase, HoldableObject):
                     kwargs['workdir'],
                     kwargs['protocol'],
                     kwargs['priority'],
-                    kwargs['verbose'])
+                    kwargs['verbose'],
+                    kwargs['cpu_weight'],
+                    kwargs['memory'])
 
     def add_test(self, node: mparser.BaseNode,
                  args: T.Tuple[str, T.Union[build.Executable, build.Jar, ExternalProgram, mesonlib.File, build.CustomTarget, build.CustomTargetIndex]],
@@ -2498,15 +2567,16 @@ class Interpreter(InterpreterBase, HoldableObject):
             self.subdir = prev_subdir
             raise InterpreterException(f"Nonexistent build file '{buildfilename!s}'")
         code = self.read_buildfile(absname, buildfilename)
-        try:
-            codeblock = mparser.Parser(code, absname).parse()
-        except mesonlib.MesonException as me:
-            me.file = absname
-            raise me
-        try:
-            self.evaluate_codeblock(codeblock)
-        except SubdirDoneRequest:
-            pass
+        with profiler.span(buildfilename, 'build file'):
+            try:
+                codeblock = self.parse_buildfile(code, absname)
+            except mesonlib.MesonException as me:
+                me.file = absname
+                raise me
+            try:
+                self.evaluate_codeblock(codeblock)
+            except SubdirDoneRequest:
+                pass
         self.subdir = prev_subdir
 
     # This is either ignored on basically any OS nowadays, or silently gets
@@ -3091,7 +3161,13 @@ class Interpreter(InterpreterBase, HoldableObject):
             return ret
 
     def run(self) -> None:
+        # mesonbuild.ast imports the interpreter
+        from .prefetch import prefetch_checks
+        prefetch_checks(self)
         super().run()
+        if not self.is_subproject() and self.build.subprojects and self.coredata.get_option(OptionKey('prune_subprojects')):
+            pruned = self.build.prune_subprojects()
+            mlog.log('Unused targets of subprojects removed:', mlog.bold(str(pruned)))
         mlog.log('Build targets in project:', mlog.bold(str(len(self.build.targets))))
         FeatureNew.report(self.subproject)
         FeatureDeprecated.report(self.subproject)
@@ -3135,23 +3211,10 @@ class Interpreter(InterpreterBase, HoldableObject):
         srcdir = Path(self.environment.source_dir)
         builddir = Path(self.environment.build_dir)
         if isinstance(fname, P_OBJ.DependencyVariableString):
-            def validate_installable_file(fpath: Path) -> bool:
-                installablefiles: T.Set[Path] = set()
-                for d in self.build.data:
-                    for s in d.sources:
-                        installablefiles.add(Path(s.absolute_path(srcdir, builddir)))
-                installabledirs = [str(Path(srcdir, s.source_subdir)) for s in self.build.install_dirs]
-                if fpath in installablefiles:
-                    return True
-                for d in installabledirs:
-                    if str(fpath).startswith(d):
-                        return True
-                return False
-
-            norm = Path(fname)
             # variables built from a dep.get_variable are allowed to refer to
             # subproject files, as long as they are scheduled to be installed.
-            if validate_installable_file(norm):
+            self.installable_files.update(self.build)
+            if self.installable_files.contains(Path(fname)):
                 return
         norm = Path(os.path.abspath(Path(srcdir, subdir, fname)))
         if os.path.isdir(norm):
@@ -786,7 +786,7 @@ class Test(MesonInterpreterObject):
                  cmd_args: T.List[T.Union[str, mesonlib.File, build.Target, ExternalProgram]],
                  env: mesonlib.EnvironmentVariables,
                  should_fail: bool, timeout: int, workdir: T.Optional[str], protocol: str,
-                 priority: int, verbose: bool):
+                 priority: int, verbose: bool, cpu_weight: int, memory: int):
         super().__init__()
         self.name = name
         self.suite = listify(suite)
@@ -802,6 +802,8 @@ class Test(MesonInterpreterObject):
         self.protocol = TestProtocol.from_str(protocol)
         self.priority = priority
         self.verbose = verbose
+        self.cpu_weight = cpu_weight
+        self.memory = memory
 
     def get_exe(self) -> T.Union[ExternalProgram, build.Executable, build.CustomTarget, build.CustomTargetIndex]:
         return self.exe
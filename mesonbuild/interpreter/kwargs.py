@@ -44,6 +44,8 @@ class BaseTest(TypedDict):
     workdir: T.Optional[str]
     depends: T.List[T.Union[build.CustomTarget, build.BuildTarget]]
     priority: int
+    cpu_weight: int
+    memory: int
     env: EnvironmentVariables
     suite: T.List[str]
 
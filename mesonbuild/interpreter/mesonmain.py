@@ -135,6 +135,7 @@ class MesonMain(MesonInterpreterObject):
                     a.target.build_by_default = True
                 else:
                     a.build_by_default = True
+                self.build.script_targets.append(a)
             else:
                 script_args.extend(a.command)
                 new = True
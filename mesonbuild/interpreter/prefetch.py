@@ -0,0 +1,216 @@
+# SPDX-License-Identifier: Apache-2.0
+# Copyright 2025 The Meson development team
+
+"""Running the compiler checks of a project before evaluating it.
+
+The build files of a project, and of each of its subprojects in turn, are
+evaluated one statement after the other, so their compiler checks run one at
+a time even though most of them do not depend on each other. Before a project
+is evaluated, its build files are therefore scanned for compiler checks whose
+arguments are all string literals, and those are run concurrently. They store
+their results in the compiler check cache, where the evaluation finds them,
+so the results and the order of everything that is logged stay the same.
+
+The results found this way are remembered, so that the evaluation reports
+them like the results of checks it runs itself, rather than as cached.
+
+Checks that are never reached by the evaluation, e.g. because they are in
+a branch for another platform, are run needlessly, so this is only done when
+enabled with the prefetch_checks option.
+"""
+
+from __future__ import annotations
+
+import functools
+import os
+import typing as T
+
+from .. import environment, mesonlib, mlog, mparser, profiler
+from ..ast.visitor import AstVisitor
+from ..mesonlib import MachineChoice
+from ..options import OptionKey
+from .compiler import CompilerHolder, _run_checks
+
+if T.TYPE_CHECKING:
+    from .interpreter import Interpreter
+
+    # The language and machine of a compiler
+    CompilerRef = T.Tuple[str, MachineChoice]
+
+
+# The compiler methods that can be prefetched, with their number of positional
+# arguments and whether they take a prefix
+PREFETCHABLE: T.Dict[str, T.Tuple[int, bool]] = {
+    'has_header': (1, True),
+    'has_header_symbol': (2, True),
+    'has_function': (1, True),
+    'has_type': (1, True),
+    'has_argument': (1, False),
+    'has_link_argument': (1, False),
+}
+
+
+def _literal(node: mparser.BaseNode) -> T.Optional[str]:
+    if isinstance(node, mparser.StringNode) and not node.is_fstring:
+        return node.value
+    return None
+
+
+class CheckCollector(AstVisitor):
+
+    """Find the compiler checks with literal arguments in build files.
+
+    Checks are called on variables holding a compiler, which are only
+    resolved once all build files have been visited, as a variable may be
+    assigned in another file or after its use in a loop. Variables that are
+    assigned anything other than a single compiler are ignored.
+    """
+
+    def __init__(self) -> None:
+        super().__init__()
+        self.assignments: T.Dict[str, T.Set[T.Optional[CompilerRef]]] = {}
+        self.checks: T.List[T.Tuple[T.Union[str, CompilerRef], str, T.Tuple[str, ...], str]] = []
+        # The subdirectories entered, relative to the root of the project
+        self.subdirs: T.List[str] = []
+        self.current_subdir = ''
+
+    @staticmethod
+    def _get_compiler(node: mparser.BaseNode) -> T.Optional[CompilerRef]:
+        if not (isinstance(node, mparser.MethodNode) and node.name.value == 'get_compiler'
+                and isinstance(node.source_object, mparser.IdNode) and node.source_object.value == 'meson'):
+            return None
+        args = node.args
+        if len(args.arguments) != 1:
+            return None
+        lang = _literal(args.arguments[0])
+        if lang is None:
+            return None
+        machine = MachineChoice.HOST
+        for key, value in args.kwargs.items():
+            if not isinstance(key, mparser.IdNode) or key.value != 'native' or not isinstance(value, mparser.BooleanNode):
+                return None
+            if value.value:
+                machine = MachineChoice.BUILD
+        return lang.lower(), machine
+
+    def visit_AssignmentNode(self, node: mparser.AssignmentNode) -> None:
+        self.assignments.setdefault(node.var_name.value, set()).add(self._get_compiler(node.value))
+        super().visit_AssignmentNode(node)
+
+    def visit_PlusAssignmentNode(self, node: mparser.PlusAssignmentNode) -> None:
+        self.assignments.setdefault(node.var_name.value, set()).add(None)
+        super().visit_PlusAssignmentNode(node)
+
+    def visit_ForeachClauseNode(self, node: mparser.ForeachClauseNode) -> None:
+        for var in node.varnames:
+            self.assignments.setdefault(var.value, set()).add(None)
+        super().visit_ForeachClauseNode(node)
+
+    def visit_FunctionNode(self, node: mparser.FunctionNode) -> None:
+        if node.func_name.value == 'subdir' and node.args.arguments:
+            subdir = _literal(node.args.arguments[0])
+            if subdir is not None:
+                self.subdirs.append(os.path.join(self.current_subdir, subdir))
+        super().visit_FunctionNode(node)
+
+    def visit_MethodNode(self, node: mparser.MethodNode) -> None:
+        super().visit_MethodNode(node)
+        signature = PREFETCHABLE.get(node.name.value)
+        if signature is None:
+            return
+        nargs, takes_prefix = signature
+        args = [_literal(a) for a in node.args.arguments]
+        if len(args) != nargs or None in args:
+            return
+        prefix = ''
+        for key, value in node.args.kwargs.items():
+            literal = _literal(value)
+            if not isinstance(key, mparser.IdNode) or key.value != 'prefix' or not takes_prefix or literal is None:
+                return
+            prefix = literal
+
+        receiver: T.Union[None, str, CompilerRef]
+        if isinstance(node.source_object, mparser.IdNode):
+            receiver = node.source_object.value
+        else:
+            receiver = self._get_compiler(node.source_object)
+        if receiver is not None:
+            self.checks.append((receiver, node.name.value, T.cast('T.Tuple[str, ...]', tuple(args)), prefix))
+
+    def resolve(self) -> T.List[T.Tuple[CompilerRef, str, T.Tuple[str, ...], str]]:
+        """The checks found, without duplicates, in the order they appear in."""
+        result: T.Dict[T.Tuple[CompilerRef, str, T.Tuple[str, ...], str], None] = {}
+        for receiver, method, args, prefix in self.checks:
+            if isinstance(receiver, str):
+                refs = self.assignments.get(receiver, set())
+                if len(refs) != 1:
+                    continue
+                ref = next(iter(refs))
+                if ref is None:
+                    continue
+            else:
+                ref = receiver
+            result[(ref, method, args, prefix)] = None
+        return list(result)
+
+
+def collect_checks(interp: Interpreter) -> T.List[T.Tuple[CompilerRef, str, T.Tuple[str, ...], str]]:
+    """Find the compiler checks with literal arguments of the project of an
+    interpreter, in its root build file and the subdirectories it enters."""
+    collector = CheckCollector()
+    interp.ast.accept(collector)
+    srcdir = interp.environment.get_source_dir()
+    visited: T.Set[str] = set()
+    while collector.subdirs:
+        subdir = collector.subdirs.pop(0)
+        fname = os.path.join(srcdir, interp.subdir, subdir, environment.build_filename)
+        if fname in visited or not os.path.isfile(fname):
+            continue
+        visited.add(fname)
+        try:
+            with open(fname, encoding='utf-8') as f:
+                code = f.read()
+            # Warnings of the parser are reported when the file is evaluated,
+            # they must neither be logged nor counted twice
+            with mlog.deferred(), mlog.nested_warnings():
+                ast = interp.parse_buildfile(code, fname)
+        except (OSError, UnicodeDecodeError, mesonlib.MesonException):
+            # The evaluation reports these properly
+            continue
+        collector.current_subdir = subdir
+        ast.accept(collector)
+    return collector.resolve()
+
+
+def _prefetch(holder: CompilerHolder, method: str, args: T.Tuple[str, ...], prefix: str) -> None:
+    try:
+        holder.prefetch_check(method, args, prefix)
+    except mesonlib.MesonException as e:
+        # The evaluation runs the check again, and reports the error there
+        mlog.debug(f'Prefetching {method}{args} failed: {e}')
+
+
+def prefetch_checks(interp: Interpreter) -> None:
+    """Run the compiler checks found in the build files of the project of an
+    interpreter concurrently, to fill the compiler check cache."""
+    if mesonlib.determine_worker_count() <= 1 or not interp.coredata.get_option(OptionKey('prefetch_checks')):
+        return
+    with profiler.span(interp.subproject or interp.active_projectname, 'check prefetch'):
+        holders: T.Dict[CompilerRef, CompilerHolder] = {}
+        checks: T.List[T.Callable[[], None]] = []
+        for ref, method, args, prefix in collect_checks(interp):
+            if ref not in holders:
+                compiler = interp.coredata.compilers[ref[1]].get(ref[0])
+                if compiler is None:
+                    continue
+                holders[ref] = CompilerHolder(compiler, interp)
+            checks.append(functools.partial(_prefetch, holders[ref], method, args, prefix))
+        if len(checks) < 2:
+            return
+        mlog.debug(f'Prefetching {len(checks)} compiler checks')
+        cache = interp.coredata.compiler_check_cache
+        known = set(cache)
+        _run_checks(checks)
+        # Results from the persistent cache were found by earlier runs
+        interp.coredata.prefetched_checks.update(
+            key for key, result in cache.items() if key not in known and not result.cached)
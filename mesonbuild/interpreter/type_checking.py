@@ -496,6 +496,10 @@ TEST_KWS: T.List[KwargInfo] = [
               validator=in_set_validator({'exitcode', 'tap', 'gtest', 'rust'}),
               since_values={'gtest': '0.55.0', 'rust': '0.57.0'}),
     KwargInfo('priority', int, default=0, since='0.52.0'),
+    KwargInfo('cpu_weight', int, default=1, since='1.8.0',
+              validator=lambda x: 'must be at least 1' if x < 1 else None),
+    KwargInfo('memory', int, default=0, since='1.8.0',
+              validator=lambda x: 'must not be negative' if x < 0 else None),
     # TODO: env needs reworks of the way the environment variable holder itself works probably
     ENV_KW,
     DEPENDS_KW.evolve(since='0.46.0'),
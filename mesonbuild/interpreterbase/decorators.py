@@ -11,6 +11,7 @@ from ._unholder import _unholder
 from dataclasses import dataclass
 from functools import wraps
 import abc
+import enum
 import itertools
 import copy
 import typing as T
@@ -168,11 +169,23 @@ def typed_pos_args(name: str, *types: T.Union[T.Type, T.Tuple[T.Type, ...]],
     correct, all of the arguments are string names of files. If the first
     argument is something else the it should be separated.
     """
+    # Everything that does not depend on the actual arguments is computed
+    # once here, instead of on every call of the decorated function.
+    num_types = len(types)
+    if varargs:
+        min_args = num_types + min_varargs
+        max_args = num_types + max_varargs
+    elif optargs:
+        max_args = num_types + len(optargs)
+        all_types = types + tuple(optargs)
+
     def inner(f: TV_func) -> TV_func:
 
         @wraps(f)
         def wrapper(*wrapped_args: T.Any, **wrapped_kwargs: T.Any) -> T.Any:
-            args = get_callee_args(wrapped_args)[1]
+            # The positional arguments are always the second to last
+            # argument, see get_callee_args()
+            args = wrapped_args[-2]
 
             # These are implementation programming errors, end users should never see them.
             assert isinstance(args, list), args
@@ -182,29 +195,25 @@ def typed_pos_args(name: str, *types: T.Union[T.Type, T.Tuple[T.Type, ...]],
                 'varargs and optargs not supported together as this would be ambiguous'
 
             num_args = len(args)
-            num_types = len(types)
-            a_types = types
-
             if varargs:
-                min_args = num_types + min_varargs
-                max_args = num_types + max_varargs
                 if max_varargs == 0 and num_args < min_args:
                     raise InvalidArguments(f'{name} takes at least {min_args} arguments, but got {num_args}.')
                 elif max_varargs != 0 and (num_args < min_args or num_args > max_args):
                     raise InvalidArguments(f'{name} takes between {min_args} and {max_args} arguments, but got {num_args}.')
+                checked: T.Iterable[T.Tuple[T.Any, T.Union[T.Type, T.Tuple[T.Type, ...]]]] = \
+                    itertools.zip_longest(args, types, fillvalue=varargs)
             elif optargs:
                 if num_args < num_types:
                     raise InvalidArguments(f'{name} takes at least {num_types} arguments, but got {num_args}.')
-                elif num_args > num_types + len(optargs):
-                    raise InvalidArguments(f'{name} takes at most {num_types + len(optargs)} arguments, but got {num_args}.')
-                # Add the number of positional arguments required
-                if num_args > num_types:
-                    diff = num_args - num_types
-                    a_types = tuple(list(types) + list(optargs[:diff]))
+                elif num_args > max_args:
+                    raise InvalidArguments(f'{name} takes at most {max_args} arguments, but got {num_args}.')
+                checked = zip(args, all_types)
             elif num_args != num_types:
                 raise InvalidArguments(f'{name} takes exactly {num_types} arguments, but got {num_args}.')
+            else:
+                checked = zip(args, types)
 
-            for i, (arg, type_) in enumerate(itertools.zip_longest(args, a_types, fillvalue=varargs), start=1):
+            for i, (arg, type_) in enumerate(checked, start=1):
                 if not isinstance(arg, type_):
                     if isinstance(type_, tuple):
                         shouldbe = 'one of: {}'.format(", ".join(f'"{t.__name__}"' for t in type_))
@@ -216,24 +225,18 @@ def typed_pos_args(name: str, *types: T.Union[T.Type, T.Tuple[T.Type, ...]],
             # Depending on what kind of function we're calling the length of
             # wrapped_args can vary.
             nargs = list(wrapped_args)
-            i = nargs.index(args)
             if varargs:
                 # if we have varargs we need to split them into a separate
                 # tuple, as python's typing doesn't understand tuples with
                 # fixed elements and variadic elements, only one or the other.
                 # so in that case we need T.Tuple[int, str, float, T.Tuple[str, ...]]
-                pos = args[:len(types)]
-                var = list(args[len(types):])
-                pos.append(var)
-                nargs[i] = tuple(pos)
-            elif optargs:
-                if num_args < num_types + len(optargs):
-                    diff = num_types + len(optargs) - num_args
-                    nargs[i] = tuple(list(args) + [None] * diff)
-                else:
-                    nargs[i] = tuple(args)
+                pos = args[:num_types]
+                pos.append(args[num_types:])
+                nargs[-2] = tuple(pos)
+            elif optargs and num_args < max_args:
+                nargs[-2] = tuple(args + [None] * (max_args - num_args))
             else:
-                nargs[i] = tuple(args)
+                nargs[-2] = tuple(args)
             return f(*nargs, **wrapped_kwargs)
 
         return T.cast('TV_func', wrapper)
@@ -422,6 +425,72 @@ class KwargInfo(T.Generic[_T]):
         )
 
 
+def _types_description(types_tuple: T.Tuple[T.Union[T.Type, ContainerTypeInfo], ...]) -> str:
+    candidates = []
+    for t in types_tuple:
+        if isinstance(t, ContainerTypeInfo):
+            candidates.append(t.description())
+        else:
+            candidates.append(t.__name__)
+    shouldbe = 'one of: ' if len(candidates) > 1 else ''
+    shouldbe += ', '.join(candidates)
+    return shouldbe
+
+def _raw_description(t: object) -> str:
+    """describe a raw type (ie, one that is not a ContainerTypeInfo)."""
+    if isinstance(t, list):
+        if t:
+            return f"array[{' | '.join(sorted(mesonlib.OrderedSet(type(v).__name__ for v in t)))}]"
+        return 'array[]'
+    elif isinstance(t, dict):
+        if t:
+            return f"dict[{' | '.join(sorted(mesonlib.OrderedSet(type(v).__name__ for v in t.values())))}]"
+        return 'dict[]'
+    return type(t).__name__
+
+# Default values of these types are shared between calls instead of copied
+_IMMUTABLE_TYPES = (type(None), bool, int, float, str, bytes, tuple, frozenset, enum.Enum)
+
+class _KwargChecker:
+
+    """A KwargInfo specialised for the function it is used by.
+
+    This is created once, when :func:typed_kwargs decorates a function, and
+    holds everything that does not depend on the actual value passed.
+    """
+
+    __slots__ = ['info', 'name', 'types_tuple', 'plain_types', 'containers', 'feature_name',
+                 'default', 'default_valid', 'copy_default', 'needs_checks']
+
+    def __init__(self, name: str, info: KwargInfo):
+        self.info = info
+        self.name = info.name
+        self.types_tuple = info.types if isinstance(info.types, tuple) else (info.types,)
+        self.plain_types = tuple(t for t in self.types_tuple if not isinstance(t, ContainerTypeInfo))
+        self.containers = tuple(t for t in self.types_tuple if isinstance(t, ContainerTypeInfo))
+        self.feature_name = info.name + ' arg in ' + name
+        self.default = info.default
+        self.default_valid = info.required or self.check_type(info.default)
+
+        # Create a shallow copy of mutable default values. This allows
+        # mutable types to be used safely as default values
+        self.copy_default: T.Optional[T.Callable[[T.Any], T.Any]]
+        if isinstance(self.default, _IMMUTABLE_TYPES):
+            self.copy_default = None
+        elif type(self.default) in {list, dict}:
+            self.copy_default = type(self.default).copy
+        else:
+            self.copy_default = copy.copy
+
+        # Whether anything but the default value has to be done if not set
+        self.needs_checks = info.required or not self.default_valid or bool(info.not_set_warning) or info.convertor is not None
+
+    def check_type(self, value: T.Any) -> bool:
+        if isinstance(value, self.plain_types):
+            return True
+        return any(t.check(value) for t in self.containers)
+
+
 def typed_kwargs(name: str, *types: KwargInfo, allow_unknown: bool = False) -> T.Callable[..., T.Any]:
     """Decorator for type checking keyword arguments.
 
@@ -439,93 +508,65 @@ def typed_kwargs(name: str, *types: KwargInfo, allow_unknown: bool = False) -> T
     """
     def inner(f: TV_func) -> TV_func:
 
-        def types_description(types_tuple: T.Tuple[T.Union[T.Type, ContainerTypeInfo], ...]) -> str:
-            candidates = []
-            for t in types_tuple:
-                if isinstance(t, ContainerTypeInfo):
-                    candidates.append(t.description())
+        checkers = [_KwargChecker(name, info) for info in types]
+        all_names = frozenset(info.name for info in types)
+
+        def emit_feature_change(values: T.Dict[_T, T.Union[str, T.Tuple[str, str]]], feature: T.Union[T.Type['FeatureDeprecated'], T.Type['FeatureNew']],
+                                info: KwargInfo, value: object, subproject: SubProject, node: mparser.BaseNode) -> None:
+            for n, version in values.items():
+                if isinstance(version, tuple):
+                    version, msg = version
                 else:
-                    candidates.append(t.__name__)
-            shouldbe = 'one of: ' if len(candidates) > 1 else ''
-            shouldbe += ', '.join(candidates)
-            return shouldbe
-
-        def raw_description(t: object) -> str:
-            """describe a raw type (ie, one that is not a ContainerTypeInfo)."""
-            if isinstance(t, list):
-                if t:
-                    return f"array[{' | '.join(sorted(mesonlib.OrderedSet(type(v).__name__ for v in t)))}]"
-                return 'array[]'
-            elif isinstance(t, dict):
-                if t:
-                    return f"dict[{' | '.join(sorted(mesonlib.OrderedSet(type(v).__name__ for v in t.values())))}]"
-                return 'dict[]'
-            return type(t).__name__
-
-        def check_value_type(types_tuple: T.Tuple[T.Union[T.Type, ContainerTypeInfo], ...],
-                             value: T.Any) -> bool:
-            for t in types_tuple:
-                if isinstance(t, ContainerTypeInfo):
-                    if t.check(value):
-                        return True
-                elif isinstance(value, t):
-                    return True
-            return False
+                    msg = None
+
+                warning: T.Optional[str] = None
+                if isinstance(n, ContainerTypeInfo):
+                    if n.check_any(value):
+                        warning = f'of type {n.description()}'
+                elif isinstance(n, type):
+                    if isinstance(value, n):
+                        warning = f'of type {n.__name__}'
+                elif isinstance(value, list):
+                    if n in value:
+                        warning = f'value "{n}" in list'
+                elif isinstance(value, dict):
+                    if n in value.keys():
+                        warning = f'value "{n}" in dict keys'
+                elif n == value:
+                    warning = f'value "{n}"'
+                if warning:
+                    feature.single_use(f'"{name}" keyword argument "{info.name}" {warning}', version, subproject, msg, location=node)
 
         @wraps(f)
         def wrapper(*wrapped_args: T.Any, **wrapped_kwargs: T.Any) -> T.Any:
-
-            def emit_feature_change(values: T.Dict[_T, T.Union[str, T.Tuple[str, str]]], feature: T.Union[T.Type['FeatureDeprecated'], T.Type['FeatureNew']]) -> None:
-                for n, version in values.items():
-                    if isinstance(version, tuple):
-                        version, msg = version
-                    else:
-                        msg = None
-
-                    warning: T.Optional[str] = None
-                    if isinstance(n, ContainerTypeInfo):
-                        if n.check_any(value):
-                            warning = f'of type {n.description()}'
-                    elif isinstance(n, type):
-                        if isinstance(value, n):
-                            warning = f'of type {n.__name__}'
-                    elif isinstance(value, list):
-                        if n in value:
-                            warning = f'value "{n}" in list'
-                    elif isinstance(value, dict):
-                        if n in value.keys():
-                            warning = f'value "{n}" in dict keys'
-                    elif n == value:
-                        warning = f'value "{n}"'
-                    if warning:
-                        feature.single_use(f'"{name}" keyword argument "{info.name}" {warning}', version, subproject, msg, location=node)
-
             node, _, _kwargs, subproject = get_callee_args(wrapped_args)
             # Cast here, as the convertor function may place something other than a TYPE_var in the kwargs
             kwargs = T.cast('T.Dict[str, object]', _kwargs)
 
-            if not allow_unknown:
-                all_names = {t.name for t in types}
+            if not allow_unknown and not all_names.issuperset(kwargs):
                 unknowns = set(kwargs).difference(all_names)
-                if unknowns:
-                    ustr = ', '.join([f'"{u}"' for u in sorted(unknowns)])
-                    raise InvalidArguments(f'{name} got unknown keyword arguments {ustr}')
+                ustr = ', '.join([f'"{u}"' for u in sorted(unknowns)])
+                raise InvalidArguments(f'{name} got unknown keyword arguments {ustr}')
+
+            for checker in checkers:
+                value = kwargs.get(checker.name)
+                if value is None and not checker.needs_checks:
+                    # The common case of an unset argument with a default value
+                    default = checker.default
+                    kwargs[checker.name] = default if checker.copy_default is None else checker.copy_default(default)
+                    continue
 
-            for info in types:
-                types_tuple = info.types if isinstance(info.types, tuple) else (info.types,)
-                value = kwargs.get(info.name)
+                info = checker.info
                 if value is not None:
                     if info.since:
-                        feature_name = info.name + ' arg in ' + name
-                        FeatureNew.single_use(feature_name, info.since, subproject, info.since_message, location=node)
+                        FeatureNew.single_use(checker.feature_name, info.since, subproject, info.since_message, location=node)
                     if info.deprecated:
-                        feature_name = info.name + ' arg in ' + name
-                        FeatureDeprecated.single_use(feature_name, info.deprecated, subproject, info.deprecated_message, location=node)
+                        FeatureDeprecated.single_use(checker.feature_name, info.deprecated, subproject, info.deprecated_message, location=node)
                     if info.listify:
                         kwargs[info.name] = value = mesonlib.listify(value)
-                    if not check_value_type(types_tuple, value):
-                        shouldbe = types_description(types_tuple)
-                        raise InvalidArguments(f'{name} keyword argument {info.name!r} was of type {raw_description(value)} but should have been {shouldbe}')
+                    if not checker.check_type(value):
+                        shouldbe = _types_description(checker.types_tuple)
+                        raise InvalidArguments(f'{name} keyword argument {info.name!r} was of type {_raw_description(value)} but should have been {shouldbe}')
 
                     if info.validator is not None:
                         msg = info.validator(value)
@@ -533,20 +574,19 @@ def typed_kwargs(name: str, *types: KwargInfo, allow_unknown: bool = False) -> T
                             raise InvalidArguments(f'{name} keyword argument "{info.name}" {msg}')
 
                     if info.deprecated_values is not None:
-                        emit_feature_change(info.deprecated_values, FeatureDeprecated)
+                        emit_feature_change(info.deprecated_values, FeatureDeprecated, info, value, subproject, node)
 
                     if info.since_values is not None:
-                        emit_feature_change(info.since_values, FeatureNew)
+                        emit_feature_change(info.since_values, FeatureNew, info, value, subproject, node)
 
                 elif info.required:
                     raise InvalidArguments(f'{name} is missing required keyword argument "{info.name}"')
                 else:
                     # set the value to the default, this ensuring all kwargs are present
                     # This both simplifies the typing checking and the usage
-                    assert check_value_type(types_tuple, info.default), f'In function {name} default value of {info.name} is not a valid type, got {type(info.default)} expected {types_description(types_tuple)}'
-                    # Create a shallow copy of the container. This allows mutable
-                    # types to be used safely as default values
-                    kwargs[info.name] = copy.copy(info.default)
+                    assert checker.default_valid, f'In function {name} default value of {info.name} is not a valid type, got {type(info.default)} expected {_types_description(checker.types_tuple)}'
+                    default = checker.default
+                    kwargs[info.name] = default if checker.copy_default is None else checker.copy_default(default)
                     if info.not_set_warning:
                         mlog.warning(info.not_set_warning)
 
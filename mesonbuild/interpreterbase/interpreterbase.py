@@ -5,7 +5,7 @@
 # or an interpreter-based tool.
 from __future__ import annotations
 
-from .. import environment, mparser, mesonlib
+from .. import environment, mparser, mesonlib, profiler
 
 from .baseobjects import (
     InterpreterObject,
@@ -88,6 +88,34 @@ class InterpreterBase:
         # If it was part of a if-clause, it is used to temporally override the
         # current meson version target within that if-block.
         self.tmp_meson_version: T.Optional[str] = None
+        # The handler of every type of statement, evaluate_statement looks up
+        # the type of a node here instead of testing it against every type
+        self.statement_handlers: T.Dict[T.Type[mparser.BaseNode], T.Callable[[T.Any], T.Optional[InterpreterObject]]] = {
+            mparser.FunctionNode: self.function_call,
+            mparser.PlusAssignmentNode: self.evaluate_plusassign,
+            mparser.AssignmentNode: self.assignment,
+            mparser.MethodNode: self.method_call,
+            mparser.StringNode: self.evaluate_string,
+            mparser.BooleanNode: self.evaluate_literal,
+            mparser.IfClauseNode: self.evaluate_if,
+            mparser.IdNode: self.evaluate_id,
+            mparser.ComparisonNode: self.evaluate_comparison,
+            mparser.ArrayNode: self.evaluate_arraystatement,
+            mparser.DictNode: self.evaluate_dictstatement,
+            mparser.NumberNode: self.evaluate_literal,
+            mparser.AndNode: self.evaluate_andstatement,
+            mparser.OrNode: self.evaluate_orstatement,
+            mparser.NotNode: self.evaluate_notstatement,
+            mparser.UMinusNode: self.evaluate_uminusstatement,
+            mparser.ArithmeticNode: self.evaluate_arithmeticstatement,
+            mparser.ForeachClauseNode: self.evaluate_foreach,
+            mparser.IndexNode: self.evaluate_indexing,
+            mparser.TernaryNode: self.evaluate_ternary,
+            mparser.ContinueNode: self.evaluate_continue,
+            mparser.BreakNode: self.evaluate_break,
+            mparser.ParenthesizedNode: self.evaluate_parenthesized,
+            mparser.TestCaseClauseNode: self.evaluate_testcase,
+        }
 
     def handle_meson_version_from_ast(self, strict: bool = True) -> None:
         # do nothing in an AST interpreter
@@ -101,6 +129,9 @@ class InterpreterBase:
             node = mparser.BaseNode(1, 1, errname)
             raise InvalidCode.from_node(f'Build file failed to parse as unicode: {e}', node=node)
 
+    def parse_buildfile(self, code: str, fname: str) -> mparser.CodeBlockNode:
+        return mparser.Parser(code, fname).parse()
+
     def load_root_meson_file(self) -> None:
         mesonfile = os.path.join(self.source_root, self.subdir, environment.build_filename)
         if not os.path.isfile(mesonfile):
@@ -110,7 +141,7 @@ class InterpreterBase:
             raise InvalidCode('Builder file is empty.')
         assert isinstance(code, str)
         try:
-            self.ast = mparser.Parser(code, mesonfile).parse()
+            self.ast = self.parse_buildfile(code, mesonfile)
             self.handle_meson_version_from_ast()
         except mparser.ParseException as me:
             me.file = mesonfile
@@ -165,10 +196,11 @@ class InterpreterBase:
     def run(self) -> None:
         # Evaluate everything after the first line, which is project() because
         # we already parsed that in self.parse_project()
-        try:
-            self.evaluate_codeblock(self.ast, start=1)
-        except SubdirDoneRequest:
-            pass
+        with profiler.span(os.path.join(self.subdir, environment.build_filename), 'build file'):
+            try:
+                self.evaluate_codeblock(self.ast, start=1)
+            except SubdirDoneRequest:
+                pass
 
     def evaluate_codeblock(self, node: mparser.CodeBlockNode, start: int = 0, end: T.Optional[int] = None) -> None:
         if node is None:
@@ -196,63 +228,43 @@ class InterpreterBase:
 
     def evaluate_statement(self, cur: mparser.BaseNode) -> T.Optional[InterpreterObject]:
         self.current_node = cur
-        if isinstance(cur, mparser.FunctionNode):
-            return self.function_call(cur)
-        elif isinstance(cur, mparser.PlusAssignmentNode):
-            self.evaluate_plusassign(cur)
-        elif isinstance(cur, mparser.AssignmentNode):
-            self.assignment(cur)
-        elif isinstance(cur, mparser.MethodNode):
-            return self.method_call(cur)
-        elif isinstance(cur, mparser.StringNode):
-            if cur.is_fstring:
-                if cur.is_multiline:
-                    return self.evaluate_multiline_fstring(cur)
-                else:
-                    return self.evaluate_fstring(cur)
+        try:
+            handler = self.statement_handlers[type(cur)]
+        except KeyError:
+            handler = self._find_statement_handler(type(cur))
+        return handler(cur)
+
+    def _find_statement_handler(self, node_type: T.Type[mparser.BaseNode]) -> T.Callable[[T.Any], T.Optional[InterpreterObject]]:
+        # Subclasses of the node types are evaluated like their base class
+        for base in node_type.__mro__[1:]:
+            handler = self.statement_handlers.get(base)
+            if handler is not None:
+                self.statement_handlers[node_type] = handler
+                return handler
+        raise InvalidCode("Unknown statement.")
+
+    def evaluate_string(self, cur: mparser.StringNode) -> InterpreterObject:
+        if cur.is_fstring:
+            if cur.is_multiline:
+                return self.evaluate_multiline_fstring(cur)
             else:
-                return self._holderify(cur.value)
-        elif isinstance(cur, mparser.BooleanNode):
-            return self._holderify(cur.value)
-        elif isinstance(cur, mparser.IfClauseNode):
-            return self.evaluate_if(cur)
-        elif isinstance(cur, mparser.IdNode):
-            return self.get_variable(cur.value)
-        elif isinstance(cur, mparser.ComparisonNode):
-            return self.evaluate_comparison(cur)
-        elif isinstance(cur, mparser.ArrayNode):
-            return self.evaluate_arraystatement(cur)
-        elif isinstance(cur, mparser.DictNode):
-            return self.evaluate_dictstatement(cur)
-        elif isinstance(cur, mparser.NumberNode):
-            return self._holderify(cur.value)
-        elif isinstance(cur, mparser.AndNode):
-            return self.evaluate_andstatement(cur)
-        elif isinstance(cur, mparser.OrNode):
-            return self.evaluate_orstatement(cur)
-        elif isinstance(cur, mparser.NotNode):
-            return self.evaluate_notstatement(cur)
-        elif isinstance(cur, mparser.UMinusNode):
-            return self.evaluate_uminusstatement(cur)
-        elif isinstance(cur, mparser.ArithmeticNode):
-            return self.evaluate_arithmeticstatement(cur)
-        elif isinstance(cur, mparser.ForeachClauseNode):
-            self.evaluate_foreach(cur)
-        elif isinstance(cur, mparser.IndexNode):
-            return self.evaluate_indexing(cur)
-        elif isinstance(cur, mparser.TernaryNode):
-            return self.evaluate_ternary(cur)
-        elif isinstance(cur, mparser.ContinueNode):
-            raise ContinueRequest()
-        elif isinstance(cur, mparser.BreakNode):
-            raise BreakRequest()
-        elif isinstance(cur, mparser.ParenthesizedNode):
-            return self.evaluate_statement(cur.inner)
-        elif isinstance(cur, mparser.TestCaseClauseNode):
-            return self.evaluate_testcase(cur)
-        else:
-            raise InvalidCode("Unknown statement.")
-        return None
+                return self.evaluate_fstring(cur)
+        return self._holderify(cur.value)
+
+    def evaluate_literal(self, cur: T.Union[mparser.BooleanNode, mparser.NumberNode]) -> InterpreterObject:
+        return self._holderify(cur.value)
+
+    def evaluate_id(self, cur: mparser.IdNode) -> InterpreterObject:
+        return self.get_variable(cur.value)
+
+    def evaluate_continue(self, cur: mparser.ContinueNode) -> T.NoReturn:
+        raise ContinueRequest()
+
+    def evaluate_break(self, cur: mparser.BreakNode) -> T.NoReturn:
+        raise BreakRequest()
+
+    def evaluate_parenthesized(self, cur: mparser.ParenthesizedNode) -> T.Optional[InterpreterObject]:
+        return self.evaluate_statement(cur.inner)
 
     def evaluate_arraystatement(self, cur: mparser.ArrayNode) -> InterpreterObject:
         (arguments, kwargs) = self.reduce_arguments(cur.args)
@@ -524,7 +536,10 @@ class InterpreterBase:
             if not getattr(func, 'no-second-level-holder-flattening', False):
                 func_args, kwargs = resolve_second_level_holders(func_args, kwargs)
             self.current_node = node
-            res = func(node, func_args, kwargs)
+            span = (profiler.span(func_name, 'function', subdir=self.subdir, line=node.lineno)
+                    if profiler.is_enabled() else profiler.NULL_SPAN)
+            with span:
+                res = func(node, func_args, kwargs)
             return self._holderify(res) if res is not None else None
         else:
             self.unknown_function_called(func_name)
@@ -553,17 +568,23 @@ class InterpreterBase:
             elif not isinstance(obj, Disabler):
                 raise InvalidArguments(f'Invalid operation "extract_objects" on {object_display_name} of type {type(obj).__name__}')
         obj.current_node = self.current_node = node
-        res = obj.method_call(method_name, args, kwargs)
+        span = (profiler.span(f'{obj.display_name()}.{method_name}', 'method',
+                              subdir=self.subdir, line=node.lineno)
+                if profiler.is_enabled() else profiler.NULL_SPAN)
+        with span:
+            res = obj.method_call(method_name, args, kwargs)
         return self._holderify(res) if res is not None else None
 
     def _holderify(self, res: T.Union[TYPE_var, InterpreterObject]) -> InterpreterObject:
+        # Always check for an exact match first. Only holdable types are in
+        # the holder map, and this avoids the much slower isinstance check
+        # against them for the most common types.
+        cls = self.holder_map.get(type(res), None)  # type: ignore[arg-type]
+        if cls is not None:
+            # Casts to Interpreter are required here since an assertion would
+            # not work for the `ast` module.
+            return cls(res, T.cast('Interpreter', self))
         if isinstance(res, HoldableTypes):
-            # Always check for an exact match first.
-            cls = self.holder_map.get(type(res), None)
-            if cls is not None:
-                # Casts to Interpreter are required here since an assertion would
-                # not work for the `ast` module.
-                return cls(res, T.cast('Interpreter', self))
             # Try the boundary types next.
             for typ, cls in self.bound_holder_map.items():
                 if isinstance(res, typ):
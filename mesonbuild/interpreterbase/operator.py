@@ -30,3 +30,9 @@ class MesonOperator(Enum):
     IN = 'in'
     NOT_IN = 'not in'
     INDEX = '[]'
+
+    # The operators are used as keys of the operator tables of every object
+    # the interpreter creates. Members are singletons that compare by
+    # identity, so hash them the same way instead of through the much slower
+    # Python level hash of Enum.
+    __hash__ = object.__hash__
@@ -8,6 +8,7 @@ some to logging dir and some goes to both."""
 from __future__ import annotations
 
 import enum
+import functools
 import os
 import io
 import sys
@@ -16,6 +17,7 @@ import platform
 import shlex
 import subprocess
 import shutil
+import threading
 import typing as T
 from contextlib import contextmanager
 from dataclasses import dataclass, field
@@ -74,9 +76,32 @@ class _Logger:
     logged_once: T.Set[T.Tuple[str, ...]] = field(default_factory=set)
     log_warnings_counter = 0
     log_pager: T.Optional['subprocess.Popen'] = None
+    log_local: threading.local = field(default_factory=threading.local)
 
     _LOG_FNAME: T.ClassVar[str] = 'meson-log.txt'
 
+    @contextmanager
+    def deferred(self) -> T.Iterator[T.List[T.Callable[[], None]]]:
+        """Queue up the output of the current thread instead of writing it.
+
+        This is meant for work done in worker threads, the caller can then
+        replay the output of each piece of work in a deterministic order by
+        calling the queued callables.
+        """
+        queue: T.List[T.Callable[[], None]] = []
+        self.log_local.queue = queue
+        try:
+            yield queue
+        finally:
+            self.log_local.queue = None
+
+    def _defer(self, func: T.Callable[..., None], *args: T.Any, **kwargs: T.Any) -> bool:
+        queue: T.Optional[T.List[T.Callable[[], None]]] = getattr(self.log_local, 'queue', None)
+        if queue is None:
+            return False
+        queue.append(functools.partial(func, *args, **kwargs))
+        return True
+
     @contextmanager
     def no_logging(self) -> T.Iterator[None]:
         self.log_disable_stdout = True
@@ -212,6 +237,8 @@ class _Logger:
 
     def debug(self, *args: TV_Loggable, sep: T.Optional[str] = None,
               end: T.Optional[str] = None, display_timestamp: bool = True) -> None:
+        if self._defer(self.debug, *args, sep=sep, end=end, display_timestamp=display_timestamp):
+            return
         arr = process_markup(args, False, display_timestamp)
         if self.log_file is not None:
             print(*arr, file=self.log_file, sep=sep, end=end)
@@ -220,6 +247,9 @@ class _Logger:
     def _log(self, *args: TV_Loggable, is_error: bool = False,
              nested: bool = True, sep: T.Optional[str] = None,
              end: T.Optional[str] = None, display_timestamp: bool = True) -> None:
+        if self._defer(self._log, *args, is_error=is_error, nested=nested, sep=sep,
+                       end=end, display_timestamp=display_timestamp):
+            return
         arr = process_markup(args, False, display_timestamp)
         if self.log_file is not None:
             print(*arr, file=self.log_file, sep=sep, end=end)
@@ -412,6 +442,7 @@ _logger = _Logger()
 cmd_ci_include = _logger.cmd_ci_include
 colorize_console = _logger.colorize_console
 debug = _logger.debug
+deferred = _logger.deferred
 deprecation = _logger.deprecation
 error = _logger.error
 exception = _logger.exception
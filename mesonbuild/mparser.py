@@ -98,6 +98,50 @@ class Token(T.Generic[TV_TokenTypes]):
 IDENT_RE = re.compile('[_a-zA-Z][_0-9a-zA-Z]*')
 
 class Lexer:
+    token_specification = [
+        # Need to be sorted longest to shortest.
+        ('whitespace', re.compile(r'[ \t]+')),
+        ('multiline_fstring', re.compile(r"f'''(.|\n)*?'''", re.M)),
+        ('fstring', re.compile(r"f'([^'\\]|(\\.))*'")),
+        ('id', IDENT_RE),
+        ('number', re.compile(r'0[bB][01]+|0[oO][0-7]+|0[xX][0-9a-fA-F]+|0|[1-9]\d*')),
+        ('eol_cont', re.compile(r'\\[ \t]*(#.*)?\n')),
+        ('eol', re.compile(r'\n')),
+        ('multiline_string', re.compile(r"'''(.|\n)*?'''", re.M)),
+        ('comment', re.compile(r'#.*')),
+        ('lparen', re.compile(r'\(')),
+        ('rparen', re.compile(r'\)')),
+        ('lbracket', re.compile(r'\[')),
+        ('rbracket', re.compile(r'\]')),
+        ('lcurl', re.compile(r'\{')),
+        ('rcurl', re.compile(r'\}')),
+        ('dblquote', re.compile(r'"')),
+        ('string', re.compile(r"'([^'\\]|(\\.))*'")),
+        ('comma', re.compile(r',')),
+        ('plusassign', re.compile(r'\+=')),
+        ('dot', re.compile(r'\.')),
+        ('plus', re.compile(r'\+')),
+        ('dash', re.compile(r'-')),
+        ('star', re.compile(r'\*')),
+        ('percent', re.compile(r'%')),
+        ('fslash', re.compile(r'/')),
+        ('colon', re.compile(r':')),
+        ('equal', re.compile(r'==')),
+        ('nequal', re.compile(r'!=')),
+        ('assign', re.compile(r'=')),
+        ('le', re.compile(r'<=')),
+        ('lt', re.compile(r'<')),
+        ('ge', re.compile(r'>=')),
+        ('gt', re.compile(r'>')),
+        ('questionmark', re.compile(r'\?')),
+    ]
+
+    # All of the above as a single regular expression, with a named group per
+    # token type. Alternatives are tried in order, so the first token type
+    # that matches wins just like when trying the expressions one by one,
+    # but without a failed match for every token type that comes before it.
+    token_regex = re.compile('|'.join(f'(?P<{tid}>{reg.pattern})' for tid, reg in token_specification))
+
     def __init__(self, code: str):
         if code.startswith(codecs.BOM_UTF8.decode('utf-8')):
             line, *_ = code.split('\n', maxsplit=1)
@@ -111,43 +155,6 @@ class Lexer:
         self.in_unit_test = 'MESON_RUNNING_IN_PROJECT_TESTS' in os.environ
         if self.in_unit_test:
             self.keywords.update({'testcase', 'endtestcase'})
-        self.token_specification = [
-            # Need to be sorted longest to shortest.
-            ('whitespace', re.compile(r'[ \t]+')),
-            ('multiline_fstring', re.compile(r"f'''(.|\n)*?'''", re.M)),
-            ('fstring', re.compile(r"f'([^'\\]|(\\.))*'")),
-            ('id', IDENT_RE),
-            ('number', re.compile(r'0[bB][01]+|0[oO][0-7]+|0[xX][0-9a-fA-F]+|0|[1-9]\d*')),
-            ('eol_cont', re.compile(r'\\[ \t]*(#.*)?\n')),
-            ('eol', re.compile(r'\n')),
-            ('multiline_string', re.compile(r"'''(.|\n)*?'''", re.M)),
-            ('comment', re.compile(r'#.*')),
-            ('lparen', re.compile(r'\(')),
-            ('rparen', re.compile(r'\)')),
-            ('lbracket', re.compile(r'\[')),
-            ('rbracket', re.compile(r'\]')),
-            ('lcurl', re.compile(r'\{')),
-            ('rcurl', re.compile(r'\}')),
-            ('dblquote', re.compile(r'"')),
-            ('string', re.compile(r"'([^'\\]|(\\.))*'")),
-            ('comma', re.compile(r',')),
-            ('plusassign', re.compile(r'\+=')),
-            ('dot', re.compile(r'\.')),
-            ('plus', re.compile(r'\+')),
-            ('dash', re.compile(r'-')),
-            ('star', re.compile(r'\*')),
-            ('percent', re.compile(r'%')),
-            ('fslash', re.compile(r'/')),
-            ('colon', re.compile(r':')),
-            ('equal', re.compile(r'==')),
-            ('nequal', re.compile(r'!=')),
-            ('assign', re.compile(r'=')),
-            ('le', re.compile(r'<=')),
-            ('lt', re.compile(r'<')),
-            ('ge', re.compile(r'>=')),
-            ('gt', re.compile(r'>')),
-            ('questionmark', re.compile(r'\?')),
-        ]
 
     def getline(self, line_start: int) -> str:
         return self.code[line_start:self.code.find('\n', line_start)]
@@ -160,68 +167,65 @@ class Lexer:
         bracket_count = 0
         curl_count = 0
         col = 0
-        while loc < len(self.code):
-            matched = False
-            value: str = ''
-            for (tid, reg) in self.token_specification:
-                mo = reg.match(self.code, loc)
-                if mo:
-                    curline = lineno
-                    curline_start = line_start
-                    col = mo.start() - line_start
-                    matched = True
-                    span_start = loc
-                    loc = mo.end()
-                    span_end = loc
-                    bytespan = (span_start, span_end)
-                    value = mo.group()
-                    if tid == 'lparen':
-                        par_count += 1
-                    elif tid == 'rparen':
-                        par_count -= 1
-                    elif tid == 'lbracket':
-                        bracket_count += 1
-                    elif tid == 'rbracket':
-                        bracket_count -= 1
-                    elif tid == 'lcurl':
-                        curl_count += 1
-                    elif tid == 'rcurl':
-                        curl_count -= 1
-                    elif tid == 'dblquote':
-                        raise ParseException('Double quotes are not supported. Use single quotes.', self.getline(line_start), lineno, col)
-                    elif tid in {'string', 'fstring'}:
-                        if value.find("\n") != -1:
-                            msg = ("Newline character in a string detected, use ''' (three single quotes) "
-                                   "for multiline strings instead.\n"
-                                   "This will become a hard error in a future Meson release.")
-                            mlog.warning(mlog.code_line(msg, self.getline(line_start), col), location=BaseNode(lineno, col, filename))
-                        value = value[2 if tid == 'fstring' else 1:-1]
-                    elif tid in {'multiline_string', 'multiline_fstring'}:
-                        value = value[4 if tid == 'multiline_fstring' else 3:-3]
-                        lines = value.split('\n')
-                        if len(lines) > 1:
-                            lineno += len(lines) - 1
-                            line_start = mo.end() - len(lines[-1])
-                    elif tid == 'eol_cont':
-                        lineno += 1
-                        line_start = loc
-                        tid = 'whitespace'
-                    elif tid == 'eol':
-                        lineno += 1
-                        line_start = loc
-                        if par_count > 0 or bracket_count > 0 or curl_count > 0:
-                            tid = 'whitespace'
-                    elif tid == 'id':
-                        if value in self.keywords:
-                            tid = value
-                        else:
-                            if value in self.future_keywords:
-                                mlog.warning(f"Identifier '{value}' will become a reserved keyword in a future release. Please rename it.",
-                                             location=BaseNode(lineno, col, filename))
-                    yield Token(tid, filename, curline_start, curline, col, bytespan, value)
-                    break
-            if not matched:
+        code = self.code
+        match = self.token_regex.match
+        while loc < len(code):
+            mo = match(code, loc)
+            if not mo:
                 raise ParseException('lexer', self.getline(line_start), lineno, col)
+            tid = mo.lastgroup
+            curline = lineno
+            curline_start = line_start
+            col = loc - line_start
+            span_start = loc
+            loc = mo.end()
+            span_end = loc
+            bytespan = (span_start, span_end)
+            value = mo.group()
+            if tid == 'lparen':
+                par_count += 1
+            elif tid == 'rparen':
+                par_count -= 1
+            elif tid == 'lbracket':
+                bracket_count += 1
+            elif tid == 'rbracket':
+                bracket_count -= 1
+            elif tid == 'lcurl':
+                curl_count += 1
+            elif tid == 'rcurl':
+                curl_count -= 1
+            elif tid == 'dblquote':
+                raise ParseException('Double quotes are not supported. Use single quotes.', self.getline(line_start), lineno, col)
+            elif tid in {'string', 'fstring'}:
+                if value.find("\n") != -1:
+                    msg = ("Newline character in a string detected, use ''' (three single quotes) "
+                           "for multiline strings instead.\n"
+                           "This will become a hard error in a future Meson release.")
+                    mlog.warning(mlog.code_line(msg, self.getline(line_start), col), location=BaseNode(lineno, col, filename))
+                value = value[2 if tid == 'fstring' else 1:-1]
+            elif tid in {'multiline_string', 'multiline_fstring'}:
+                value = value[4 if tid == 'multiline_fstring' else 3:-3]
+                lines = value.split('\n')
+                if len(lines) > 1:
+                    lineno += len(lines) - 1
+                    line_start = mo.end() - len(lines[-1])
+            elif tid == 'eol_cont':
+                lineno += 1
+                line_start = loc
+                tid = 'whitespace'
+            elif tid == 'eol':
+                lineno += 1
+                line_start = loc
+                if par_count > 0 or bracket_count > 0 or curl_count > 0:
+                    tid = 'whitespace'
+            elif tid == 'id':
+                if value in self.keywords:
+                    tid = value
+                else:
+                    if value in self.future_keywords:
+                        mlog.warning(f"Identifier '{value}' will become a reserved keyword in a future release. Please rename it.",
+                                     location=BaseNode(lineno, col, filename))
+            yield Token(tid, filename, curline_start, curline, col, bytespan, value)
 
 @dataclass
 class BaseNode:
@@ -9,7 +9,7 @@ import cProfile as profile
 from pathlib import Path
 import typing as T
 
-from . import build, coredata, environment, interpreter, mesonlib, mintro, mlog
+from . import build, coredata, environment, interpreter, mesonlib, mintro, mlog, profiler
 from .mesonlib import MesonException
 from .options import OptionKey
 
@@ -20,6 +20,7 @@ if T.TYPE_CHECKING:
     class CMDOptions(SharedCMDOptions, Protocol):
 
         profile: bool
+        profile_report: bool
         fatal_warnings: bool
         reconfigure: bool
         wipe: bool
@@ -54,6 +55,9 @@ def add_arguments(parser: argparse.ArgumentParser) -> None:
                         version=coredata.version)
     parser.add_argument('--profile-self', action='store_true', dest='profile',
                         help=argparse.SUPPRESS)
+    parser.add_argument('--profile-report', action='store_true',
+                        help='Write a report of where the time of the setup is spent to the meson-logs directory. '
+                             'Since 1.8.0.')
     parser.add_argument('--fatal-meson-warnings', action='store_true', dest='fatal_warnings',
                         help='Make all Meson warnings fatal')
     parser.add_argument('--reconfigure', action='store_true',
@@ -178,14 +182,25 @@ class MesonApp:
 
     # See class Backend's 'generate' for comments on capture args and returned dictionary.
     def generate(self, capture: bool = False, vslite_ctx: T.Optional[dict] = None) -> T.Optional[dict]:
+        if self.options.profile_report:
+            profiler.enable()
         env = environment.Environment(self.source_dir, self.build_dir, self.options)
         mlog.initialize(env.get_log_dir(), self.options.fatal_warnings)
         if self.options.profile:
             mlog.set_timestamp_start(time.monotonic())
         if self.options.clearcache:
             env.coredata.clear_cache()
-        with mesonlib.BuildDirLock(self.build_dir):
-            return self._generate(env, capture, vslite_ctx)
+        try:
+            with mesonlib.BuildDirLock(self.build_dir):
+                return self._generate(env, capture, vslite_ctx)
+        finally:
+            if self.options.profile_report:
+                # Also written when the setup fails, to find out what was
+                # slow up to that point
+                report, trace = profiler.write_report(env.get_log_dir())
+                profiler.disable()
+                mlog.log('Profile report written to', mlog.bold(report))
+                mlog.log('Profile trace written to', mlog.bold(trace))
 
     def _generate(self, env: environment.Environment, capture: bool, vslite_ctx: T.Optional[dict]) -> T.Optional[dict]:
         # Get all user defined options, including options that have been defined
@@ -207,7 +222,8 @@ class MesonApp:
             mlog.log('Build type:', mlog.bold('native build'))
         b = build.Build(env)
 
-        intr = interpreter.Interpreter(b, user_defined_options=user_defined_options)
+        with profiler.span('project', 'phase'):
+            intr = interpreter.Interpreter(b, user_defined_options=user_defined_options)
         # Super hack because mlog.log and mlog.debug have different signatures,
         # and there is currently no way to annotate them correctly, unionize them, or
         # even to write `T.Callable[[*mlog.TV_Loggable], None]`
@@ -220,11 +236,12 @@ class MesonApp:
         logger_fun('Target machine cpu family:', mlog.bold(env.machines.target.cpu_family))
         logger_fun('Target machine cpu:', mlog.bold(env.machines.target.cpu))
         try:
-            if self.options.profile:
-                fname = os.path.join(self.build_dir, 'meson-logs', 'profile-interpreter.log')
-                profile.runctx('intr.run()', globals(), locals(), filename=fname)
-            else:
-                intr.run()
+            with profiler.span('interpreter', 'phase'):
+                if self.options.profile:
+                    fname = os.path.join(self.build_dir, 'meson-logs', 'profile-interpreter.log')
+                    profile.runctx('intr.run()', globals(), locals(), filename=fname)
+                else:
+                    intr.run()
         except Exception as e:
             mintro.write_meson_info_file(b, [e])
             raise
@@ -242,17 +259,19 @@ class MesonApp:
             cdf = env.dump_coredata()
 
             self.finalize_postconf_hooks(b, intr)
-            if self.options.profile:
-                localvars = locals()
-                fname = f'profile-{intr.backend.name}-backend.log'
-                fname = os.path.join(self.build_dir, 'meson-logs', fname)
-                profile.runctx('gen_result = intr.backend.generate(capture, vslite_ctx)', globals(), localvars, filename=fname)
-                captured_compile_args = localvars['gen_result']
-                assert captured_compile_args is None or isinstance(captured_compile_args, dict)
-            else:
-                captured_compile_args = intr.backend.generate(capture, vslite_ctx)
+            with profiler.span(f'{intr.backend.name} backend', 'phase'):
+                if self.options.profile:
+                    localvars = locals()
+                    fname = f'profile-{intr.backend.name}-backend.log'
+                    fname = os.path.join(self.build_dir, 'meson-logs', fname)
+                    profile.runctx('gen_result = intr.backend.generate(capture, vslite_ctx)', globals(), localvars, filename=fname)
+                    captured_compile_args = localvars['gen_result']
+                    assert captured_compile_args is None or isinstance(captured_compile_args, dict)
+                else:
+                    captured_compile_args = intr.backend.generate(capture, vslite_ctx)
 
-            build.save(b, dumpfile)
+            with profiler.span('save build', 'phase'):
+                build.save(b, dumpfile)
             if env.first_invocation:
                 # Use path resolved by coredata because they could have been
                 # read from a pipe and wrote into a private file.
@@ -263,15 +282,17 @@ class MesonApp:
                 coredata.update_cmd_line_file(self.build_dir, self.options)
 
             # Generate an IDE introspection file with the same syntax as the already existing API
-            if self.options.profile:
-                fname = os.path.join(self.build_dir, 'meson-logs', 'profile-introspector.log')
-                profile.runctx('mintro.generate_introspection_file(b, intr.backend)', globals(), locals(), filename=fname)
-            else:
-                mintro.generate_introspection_file(b, intr.backend)
-            mintro.write_meson_info_file(b, [], True)
+            with profiler.span('introspection', 'phase'):
+                if self.options.profile:
+                    fname = os.path.join(self.build_dir, 'meson-logs', 'profile-introspector.log')
+                    profile.runctx('mintro.generate_introspection_file(b, intr.backend)', globals(), locals(), filename=fname)
+                else:
+                    mintro.generate_introspection_file(b, intr.backend)
+                mintro.write_meson_info_file(b, [], True)
 
             # Post-conf scripts must be run after writing coredata or else introspection fails.
-            intr.backend.run_postconf_scripts()
+            with profiler.span('postconf scripts', 'phase'):
+                intr.backend.run_postconf_scripts()
 
             # collect warnings about unsupported build configurations; must be done after full arg processing
             # by Interpreter() init, but this is most visible at the end
@@ -6,20 +6,24 @@ from __future__ import annotations
 
 from pathlib import Path
 from collections import deque
-from contextlib import suppress
+from contextlib import asynccontextmanager, suppress
 from copy import deepcopy
 from fnmatch import fnmatch
 import argparse
 import asyncio
 import datetime
 import enum
+import hashlib
+import heapq
 import json
+import math
 import os
 import pickle
 import platform
 import random
 import re
 import signal
+import statistics
 import subprocess
 import shlex
 import sys
@@ -36,7 +40,7 @@ from .coredata import MesonVersionMismatchException, major_versions_differ
 from .coredata import version as coredata_version
 from .mesonlib import (MesonException, OrderedSet, RealPathAction,
                        get_wine_shortpath, join_args, split_args, setup_vsenv,
-                       determine_worker_count)
+                       determine_worker_count, quiet_git)
 from .options import OptionKey
 from .programs import ExternalProgram
 from .backend.backends import TestProtocol, TestSerialisation
@@ -149,10 +153,48 @@ def add_arguments(parser: argparse.ArgumentParser) -> None:
                         help='Arguments to pass to the specified test(s) or all tests')
     parser.add_argument('--max-lines', default=100, dest='max_lines', type=int,
                         help='Maximum number of lines to show from a long test log. Since 1.5.0.')
+    parser.add_argument('--serial-tests', default='inline', choices=['inline', 'end'],
+                        help='When to run the tests that can not run in parallel: where they are in '
+                        'the order of tests, or after all other tests (default: inline). Since 1.8.0.')
+    parser.add_argument('--memory-budget', default=None, type=int, metavar='MB',
+                        help='Megabytes of memory that tests running at the same time may declare '
+                        'to use (default: the memory of the machine, 0 for no limit). Since 1.8.0.')
+    parser.add_argument('--shard', default=None, type=parse_shard, metavar='K/N',
+                        help='Only run the K-th of N parts of the tests, which take about as long '
+                        'as each other, and add the part to the names of the log files. Since 1.8.0.')
+    parser.add_argument('--affected-by', default=None, metavar='REV_OR_FILE',
+                        help='Only run the tests that depend on the files changed since a git revision, '
+                        'or on the files listed in a file, one per line. Since 1.8.0.')
+    parser.add_argument('--durations', default=None, metavar='FILE',
+                        help='Read the durations of previous runs, which order tests and balance shards, '
+                        'from this file instead of the build directory. Since 1.8.0.')
+    parser.add_argument('--merge-results', default=False, action='store_true',
+                        help='Instead of running tests, combine the JSON and JUnit log files given as '
+                        'arguments into one of each, and exit with the status of a run of all their '
+                        'tests. Since 1.8.0.')
     parser.add_argument('args', nargs='*',
                         help='Optional list of test names to run. "testname" to run all tests with that name, '
                         '"subprojname:testname" to specifically run "testname" from "subprojname", '
-                        '"subprojname:" to run all tests defined by "subprojname".')
+                        '"subprojname:" to run all tests defined by "subprojname". '
+                        'With --merge-results, the log files to combine.')
+
+
+def physical_memory() -> int:
+    '''The memory of the machine in megabytes, or 0 if it is unknown'''
+    try:
+        return os.sysconf('SC_PAGE_SIZE') * os.sysconf('SC_PHYS_PAGES') // (1024 * 1024)
+    except (AttributeError, ValueError, OSError):
+        return 0
+
+
+def parse_shard(value: str) -> T.Tuple[int, int]:
+    try:
+        index, count = (int(v) for v in value.split('/'))
+    except ValueError:
+        raise argparse.ArgumentTypeError(f'{value!r} is not of the form K/N')
+    if not 1 <= index <= count:
+        raise argparse.ArgumentTypeError(f'shard {index} is not between 1 and {count}')
+    return index, count
 
 
 def print_safe(s: str) -> None:
@@ -212,6 +254,17 @@ if not is_windows():
 def env_tuple_to_str(env: T.Iterable[T.Tuple[str, str]]) -> str:
     return ''.join(["{}={} ".format(k, sh_quote(v)) for k, v in env])
 
+def format_result_counts(ok: int, expectedfail: int, fail: int,
+                         unexpectedpass: int, skip: int, timeout: int) -> str:
+    return textwrap.dedent('''
+        Ok:                 {:<4}
+        Expected Fail:      {:<4}
+        Fail:               {:<4}
+        Unexpected Pass:    {:<4}
+        Skipped:            {:<4}
+        Timeout:            {:<4}
+        ''').format(ok, expectedfail, fail, unexpectedpass, skip, timeout)
+
 
 class TestException(MesonException):
     pass
@@ -1239,6 +1292,63 @@ def check_testdata(objs: T.List[TestSerialisation]) -> T.List[TestSerialisation]
             raise MesonVersionMismatchException(obj.version, coredata_version)
     return objs
 
+def test_id(test: TestSerialisation) -> str:
+    '''A name that identifies a test across runs'''
+    # Suites are prefixed with the name of the project
+    return '{}/{}'.format('+'.join(test.suite) or test.project_name, test.name)
+
+class TestDurations:
+    '''How long tests took in previous runs, kept in the build directory.
+
+    Only the most recent durations of each test are kept, so that the
+    expected duration follows changes of the test.
+    '''
+
+    FILENAME = 'meson_test_durations.json'
+    KEEP = 5
+
+    def __init__(self, wd: str, source: T.Optional[str] = None) -> None:
+        '''@source: A file to read the durations from instead, e.g. one shared
+           by several machines; they are still saved in the build directory'''
+        self.filename = os.path.join(wd, 'meson-private', self.FILENAME)
+        self.durations: T.Dict[str, T.List[float]] = {}
+        try:
+            with open(source or self.filename, encoding='utf-8') as f:
+                data = json.load(f)
+            if isinstance(data, dict):
+                self.durations = {k: v for k, v in data.items()
+                                  if isinstance(v, list) and all(isinstance(d, (int, float)) for d in v)}
+        except (OSError, ValueError):
+            pass
+        self.changed = False
+
+    def expected(self, test: TestSerialisation) -> T.Optional[float]:
+        '''The expected duration of a test, or None if it never ran'''
+        durations = self.durations.get(test_id(test))
+        return statistics.median(durations) if durations else None
+
+    def record(self, result: TestRun) -> None:
+        # Interrupted tests did not run to their end
+        if result.res is TestResult.INTERRUPT or result.duration is None:
+            return
+        durations = self.durations.setdefault(test_id(result.test), [])
+        durations.append(round(result.duration, 3))
+        del durations[:-self.KEEP]
+        self.changed = True
+
+    def save(self) -> None:
+        if not self.changed:
+            return
+        tempname = self.filename + '~'
+        try:
+            with open(tempname, 'w', encoding='utf-8') as f:
+                json.dump(self.durations, f)
+            os.replace(tempname, self.filename)
+        except OSError:
+            # The next runs are only scheduled less well
+            pass
+        self.changed = False
+
 # Custom waiting primitives for asyncio
 
 async def queue_iter(q: 'asyncio.Queue[T.Optional[str]]') -> T.AsyncIterator[str]:
@@ -1289,6 +1399,102 @@ async def complete_all(futures: T.Iterable[asyncio.Future],
     check_futures(futures)
 
 
+class ResourcePool:
+    '''A semaphore for tests that use several processors or much memory.
+
+    Tests reserve their share of the processors and of the memory, and
+    start in the order they asked for it, once enough of both is free. A
+    test that needs more than there is, gets all of it.
+    '''
+
+    def __init__(self, cpus: int, memory: int) -> None:
+        self.cpus = cpus
+        # Megabytes, 0 for no limit
+        self.memory = memory
+        self.used_cpus = 0
+        self.used_memory = 0
+        self.waiters: T.Deque[T.Tuple[asyncio.Future, int, int]] = deque()
+        # For the summary: the processor time reserved and the most memory
+        self.cpu_time = 0.0
+        self.peak_memory = 0
+        self.last_change: T.Optional[float] = None
+
+    def _clamp(self, cpus: int, memory: int) -> T.Tuple[int, int]:
+        return min(cpus, self.cpus), min(memory, self.memory) if self.memory else memory
+
+    def _fits(self, cpus: int, memory: int) -> bool:
+        return (self.used_cpus + cpus <= self.cpus and
+                (not self.memory or self.used_memory + memory <= self.memory))
+
+    def _update(self, cpus: int, memory: int) -> None:
+        now = asyncio.get_running_loop().time()
+        if self.last_change is not None:
+            self.cpu_time += self.used_cpus * (now - self.last_change)
+        self.last_change = now
+        self.used_cpus += cpus
+        self.used_memory += memory
+        self.peak_memory = max(self.peak_memory, self.used_memory)
+
+    def _wake(self) -> None:
+        while self.waiters:
+            future, cpus, memory = self.waiters[0]
+            if future.done():
+                self.waiters.popleft()
+                continue
+            if not self._fits(cpus, memory):
+                break
+            self.waiters.popleft()
+            self._update(cpus, memory)
+            future.set_result(None)
+
+    @asynccontextmanager
+    async def reserve(self, cpus: int, memory: int) -> T.AsyncIterator[None]:
+        cpus, memory = self._clamp(cpus, memory)
+        future = asyncio.get_running_loop().create_future()
+        self.waiters.append((future, cpus, memory))
+        self._wake()
+        try:
+            await future
+        except asyncio.CancelledError:
+            if future.done() and not future.cancelled():
+                # The reservation was made just before the cancellation
+                self._update(-cpus, -memory)
+            self._wake()
+            raise
+        try:
+            yield
+        finally:
+            self._update(-cpus, -memory)
+            self._wake()
+
+
+def simulate_schedule(tests: T.Iterable[T.Tuple[float, int, bool]], cpus: int) -> float:
+    '''Return how long running tests, given in order as their duration, the
+       processors they use and whether they run in parallel, takes with the
+       scheduling of TestHarness._run_tests().'''
+    # When each running test ends, and the processors it uses
+    running: T.List[T.Tuple[float, int]] = []
+    now = 0.0
+    free = cpus
+    for duration, weight, is_parallel in tests:
+        weight = min(weight, cpus)
+        if not is_parallel:
+            # Wait for all running tests, then run alone
+            now = max([now] + [end for end, _ in running])
+            running.clear()
+            free = cpus
+            now += duration
+            continue
+        # Tests start in order, once enough processors are free
+        while free < weight:
+            end, used = heapq.heappop(running)
+            now = max(now, end)
+            free += used
+        heapq.heappush(running, (now + duration, weight))
+        free -= weight
+    return max([now] + [end for end, _ in running])
+
+
 class TestSubprocess:
     def __init__(self, p: asyncio.subprocess.Process,
                  stdout: T.Optional[int], stderr: T.Optional[int],
@@ -1629,9 +1835,23 @@ class TestHarness:
 
             if namebase:
                 self.logfile_base += '-' + namebase.replace(' ', '_')
+            if self.options.shard:
+                self.logfile_base += '-shard{}of{}'.format(*self.options.shard)
 
         self.prepare_build()
         self.load_metadata()
+        if self.options.durations and not os.path.isfile(self.options.durations):
+            raise TestException(f'Test durations file {self.options.durations!r} does not exist.')
+        self.durations = TestDurations(self.options.wd, self.options.durations)
+        # The durations of the tests of this run, with whether they ran in
+        # parallel with others, and the time the whole run took
+        self.run_durations: T.List[T.Tuple[float, bool, str]] = []
+        self.wall_time: T.Optional[float] = None
+        # The tests in the order of the run, before --serial-tests=end
+        self.runners: T.List[SingleTestRunner] = []
+        # The processors and memory of the run, if tests declared their use
+        self.resources: T.Optional[ResourcePool] = None
+        self.declares_resources = False
 
         ss = set()
         for t in self.tests:
@@ -1763,6 +1983,10 @@ class TestHarness:
 
         if result.res.is_bad():
             self.collected_failures.append(result)
+        if result.duration is not None:
+            self.run_durations.append((result.duration, result.is_parallel, result.name))
+            if not self.options.benchmark:
+                self.durations.record(result)
         for l in self.loggers:
             l.log(self, result)
 
@@ -1808,15 +2032,44 @@ class TestHarness:
         return prefix + left + middle + right
 
     def summary(self) -> str:
-        return textwrap.dedent('''
-            Ok:                 {:<4}
-            Expected Fail:      {:<4}
-            Fail:               {:<4}
-            Unexpected Pass:    {:<4}
-            Skipped:            {:<4}
-            Timeout:            {:<4}
-            ''').format(self.success_count, self.expectedfail_count, self.fail_count,
-                        self.unexpectedpass_count, self.skip_count, self.timeout_count)
+        summary = format_result_counts(self.success_count, self.expectedfail_count, self.fail_count,
+                                       self.unexpectedpass_count, self.skip_count, self.timeout_count)
+        if self.wall_time is not None and self.options.num_processes > 1 and len(self.run_durations) > 1:
+            critical_path, longest = self.critical_path()
+            summary += textwrap.dedent(f'''
+                Wall time:          {self.wall_time:.2f}s
+                Critical path:      {critical_path:.2f}s (longest test: {longest})
+                ''')
+            if not all(is_parallel for _, is_parallel, _ in self.run_durations):
+                gain = self.serial_tests_gain()
+                summary += f'Serial tests last:  {abs(gain):.2f}s {"faster" if gain >= 0 else "slower"} (estimated)\n'
+            if self.resources and self.declares_resources and self.wall_time > 0:
+                cpu_use = self.resources.cpu_time / (self.resources.cpus * self.wall_time)
+                summary += f'Processor use:      {cpu_use:.0%} of {self.resources.cpus} processes\n'
+                if self.resources.peak_memory:
+                    limit = f' of {self.resources.memory}' if self.resources.memory else ''
+                    summary += f'Memory reserved:    at most {self.resources.peak_memory}{limit} MB\n'
+        return summary
+
+    def critical_path(self) -> T.Tuple[float, str]:
+        '''Return how long the run would have taken with unlimited processes,
+           which is the duration of the tests that ran alone plus that of the
+           longest test that ran in parallel, and the name of the longest
+           test'''
+        serial = sum(d for d, is_parallel, _ in self.run_durations if not is_parallel)
+        longest = max(self.run_durations)
+        parallel = max((d for d, is_parallel, _ in self.run_durations if is_parallel), default=0.0)
+        return serial + parallel, longest[2]
+
+    def serial_tests_gain(self) -> float:
+        '''Estimate how much sooner the run ends with --serial-tests=end than
+           inline, by scheduling the measured durations of its tests both
+           ways'''
+        tests = [(runner.runobj.duration, runner.test.cpu_weight, runner.is_parallel)
+                 for runner in self.runners if runner.runobj.duration is not None]
+        inline = simulate_schedule(tests, self.options.num_processes)
+        end = simulate_schedule(sorted(tests, key=lambda t: not t[2]), self.options.num_processes)
+        return inline - end
 
     def total_failure_count(self) -> int:
         return self.fail_count + self.unexpectedpass_count + self.timeout_count
@@ -1826,7 +2079,7 @@ class TestHarness:
             raise RuntimeError('Test harness object can only be used once.')
         self.is_run = True
         tests = self.get_tests()
-        rebuild_only_tests = tests if self.options.args else []
+        rebuild_only_tests = tests if self.options.args or self.options.shard else []
         if not tests:
             return 0
         if not self.options.no_rebuild and not rebuild_deps(self.ninja, self.options.wd, rebuild_only_tests, self.options.benchmark):
@@ -1837,9 +2090,19 @@ class TestHarness:
             # wrapper script.
             sys.exit(125)
 
+        if self.options.affected_by:
+            # After the rebuild, the dependencies found by the compilers are
+            # known for all tests
+            tests = self.affected_tests(tests)
+            if not tests:
+                print('No tests affected by the changes.')
+                return 0
+        if self.options.num_processes > 1:
+            tests = self.order_tests(tests)
         self.name_max_len = max(uniwidth(self.get_pretty_suite(test)) for test in tests)
+        self.declares_resources = any(test.cpu_weight > 1 or test.memory for test in tests)
         self.options.num_processes = min(self.options.num_processes,
-                                         len(tests) * self.options.repeat)
+                                         sum(test.cpu_weight for test in tests) * self.options.repeat)
         startdir = os.getcwd()
         try:
             os.chdir(self.options.wd)
@@ -1853,12 +2116,78 @@ class TestHarness:
                     self.need_console = any(runner.console_mode is not ConsoleUser.LOGGER
                                             for runner in runners)
 
+            self.runners = runners.copy()
+            if self.options.serial_tests == 'end':
+                # The pool is only emptied once for all serial tests, while
+                # the parallel tests keep all processes busy before them
+                runners.sort(key=lambda runner: not runner.is_parallel)
             self.test_count = len(runners)
             self.run_tests(runners)
         finally:
             os.chdir(startdir)
+            self.durations.save()
         return self.total_failure_count()
 
+    def order_tests(self, tests: T.List[TestSerialisation]) -> T.List[TestSerialisation]:
+        '''Sort tests with the same priority by how long they took in previous
+           runs, longest first, so that no long test is left running alone at
+           the end. Tests that never ran come first, as they may take long.'''
+        def key(test: TestSerialisation) -> T.Tuple[int, float]:
+            expected = self.durations.expected(test)
+            return -test.priority, -math.inf if expected is None else -expected
+        return sorted(tests, key=key)
+
+    def affected_tests(self, tests: T.List[TestSerialisation]) -> T.List[TestSerialisation]:
+        '''Return the tests that run, or depend on, files selected with
+           --affected-by or built from them: their programs, the files in
+           their arguments and the outputs of the targets they depend on'''
+        ninja = self.ninja or environment.detect_ninja()
+        if not ninja or not os.path.exists(os.path.join(self.options.wd, 'build.ninja')):
+            raise TestException('Selecting the tests affected by changes needs the ninja backend.')
+        changed = get_changed_files(self.options.affected_by, self.build_data.environment.get_source_dir())
+        affected = get_affected_files(ninja, self.options.wd, changed)
+        if affected is None:
+            return tests
+        target_filenames = get_target_filenames(self.options.wd)
+
+        def depends_on_affected(test: TestSerialisation) -> bool:
+            workdir = test.workdir or self.options.wd
+            files = test.fname + [os.path.join(workdir, a) for a in test.cmd_args]
+            for target_id in test.depends:
+                files += target_filenames.get(target_id, [])
+            return any(os.path.normpath(os.path.join(self.options.wd, f)) in affected for f in files)
+
+        return [test for test in tests if depends_on_affected(test)]
+
+    def shard_tests(self, tests: T.List[TestSerialisation],
+                    errorfile: T.Optional[T.IO] = None) -> T.List[TestSerialisation]:
+        '''Return the tests of the part selected with --shard.
+
+        Each test, longest first, goes to the part with the least work so
+        far, using the durations of previous runs. Tests that never ran count
+        as long as the median test. All parts are only disjoint if they are
+        computed from the same tests and durations, so a hash of both is
+        printed, which must be the same for all parts.
+        '''
+        index, count = self.options.shard
+        expected = [self.durations.expected(test) for test in tests]
+        known = [d for d in expected if d is not None]
+        default = statistics.median(known) if known else 1.0
+        weights = [default if d is None else d for d in expected]
+        partition = hashlib.sha256(json.dumps(
+            [[test_id(test), weight] for test, weight in zip(tests, weights)]).encode()).hexdigest()
+        loads = [0.0] * count
+        selected: T.List[int] = []
+        # The sort is stable, so tests that take as long keep their order
+        for i in sorted(range(len(tests)), key=lambda i: -weights[i]):
+            shard = min(range(count), key=lambda s: loads[s])
+            loads[shard] += weights[i]
+            if shard == index - 1:
+                selected.append(i)
+        print(f'Shard {index}/{count}: {len(selected)} of {len(tests)} tests, partition {partition[:16]}',
+              file=errorfile)
+        return [tests[i] for i in sorted(selected)]
+
     @staticmethod
     def split_suite_string(suite: str) -> T.Tuple[str, str]:
         if ':' in suite:
@@ -1982,6 +2311,11 @@ class TestHarness:
             print('No suitable tests defined.', file=errorfile)
             return []
 
+        if self.options.shard:
+            tests = self.shard_tests(tests, errorfile)
+            if not tests:
+                print('No tests in this shard.', file=errorfile)
+
         return tests
 
     def flush_logfiles(self) -> None:
@@ -2040,7 +2374,8 @@ class TestHarness:
             l.start_test(self, test)
 
     async def _run_tests(self, runners: T.List[SingleTestRunner]) -> None:
-        semaphore = asyncio.Semaphore(self.options.num_processes)
+        memory = physical_memory() if self.options.memory_budget is None else self.options.memory_budget
+        resources = self.resources = ResourcePool(self.options.num_processes, memory)
         futures: T.Deque[asyncio.Future] = deque()
         running_tests: T.Dict[asyncio.Future, str] = {}
         interrupted = False
@@ -2048,7 +2383,7 @@ class TestHarness:
         loop = asyncio.get_running_loop()
 
         async def run_test(test: SingleTestRunner) -> None:
-            async with semaphore:
+            async with resources.reserve(test.test.cpu_weight, test.test.memory):
                 if interrupted or (self.options.repeat > 1 and self.fail_count):
                     return
                 res = await test.run(self)
@@ -2108,6 +2443,7 @@ class TestHarness:
 
         for l in self.loggers:
             l.start(self)
+        start_time = loop.time()
 
         if sys.platform != 'win32':
             if os.getpgid(0) == os.getpid():
@@ -2130,6 +2466,7 @@ class TestHarness:
 
             await complete_all(futures)
         finally:
+            self.wall_time = loop.time() - start_time
             if sys.platform != 'win32':
                 loop.remove_signal_handler(signal.SIGINT)
                 loop.remove_signal_handler(signal.SIGTERM)
@@ -2138,10 +2475,19 @@ class TestHarness:
 
 def list_tests(th: TestHarness) -> bool:
     tests = th.get_tests(errorfile=sys.stderr)
+    if tests and th.options.affected_by:
+        tests = th.affected_tests(tests)
     for t in tests:
         print(th.get_pretty_suite(t))
     return not tests
 
+def get_target_filenames(wd: str) -> T.Dict[str, T.List[str]]:
+    '''The absolute paths of the outputs of each target, by target id'''
+    targets_file = os.path.join(wd, 'meson-info/intro-targets.json')
+    with open(targets_file, encoding='utf-8') as fp:
+        targets_info = json.load(fp)
+    return {target['id']: target['filename'] for target in targets_info}
+
 def rebuild_deps(ninja: T.List[str], wd: str, tests: T.List[TestSerialisation], benchmark: bool) -> bool:
     def convert_path_to_target(path: str) -> str:
         path = os.path.relpath(path, wd)
@@ -2153,16 +2499,10 @@ def rebuild_deps(ninja: T.List[str], wd: str, tests: T.List[TestSerialisation],
 
     targets: T.Set[str] = set()
     if tests:
-        targets_file = os.path.join(wd, 'meson-info/intro-targets.json')
-        with open(targets_file, encoding='utf-8') as fp:
-            targets_info = json.load(fp)
-
         depends: T.Set[str] = set()
         intro_targets: T.Dict[str, T.List[str]] = {}
-        for target in targets_info:
-            intro_targets[target['id']] = [
-                convert_path_to_target(f)
-                for f in target['filename']]
+        for target_id, filenames in get_target_filenames(wd).items():
+            intro_targets[target_id] = [convert_path_to_target(f) for f in filenames]
         for t in tests:
             for d in t.depends:
                 if d in depends:
@@ -2187,7 +2527,134 @@ def rebuild_deps(ninja: T.List[str], wd: str, tests: T.List[TestSerialisation],
 
     return True
 
+def get_changed_files(affected_by: str, srcdir: str) -> T.Set[str]:
+    '''The absolute paths of the files listed in the file @affected_by, or
+       changed since the git revision @affected_by if there is no such file.
+       Relative paths are relative to the source directory.'''
+    if os.path.isfile(affected_by):
+        with open(affected_by, encoding='utf-8') as f:
+            names = [line.strip() for line in f if line.strip()]
+    else:
+        ok, out = quiet_git(['diff', '--name-only', '--relative', '-z', affected_by, '--'], srcdir)
+        if not ok:
+            raise TestException(f'Could not list the files changed since {affected_by!r}:\n{out.strip()}')
+        names = [n for n in out.split('\0') if n]
+    return {os.path.normpath(os.path.join(srcdir, n)) for n in names}
+
+# A node of the output of "ninja -t graph", with its file name or the name of
+# the rule of a build edge
+_GRAPH_NODE_RE = re.compile(r'^"(\w+)" \[label="(.*?)"(, shape=ellipse)?\]$')
+_GRAPH_EDGE_RE = re.compile(r'^"(\w+)" -> "(\w+)"')
+
+def get_affected_files(ninja: T.List[str], wd: str, changed: T.Set[str]) -> T.Optional[T.Set[str]]:
+    '''The absolute paths of the changed files and of all files built from
+       them, according to the build graph and the dependencies found by the
+       last build, or None if the build files changed, which may affect
+       anything'''
+    def run_tool(*args: str) -> str:
+        p = subprocess.run(ninja + ['-C', wd, '-t', *args], capture_output=True, text=True,
+                           encoding='utf-8', errors='surrogateescape')
+        if p.returncode != 0:
+            raise TestException(f'Could not read the build graph of {wd!r}:\n{p.stderr.strip()}')
+        return p.stdout
+
+    def normalize(path: str) -> str:
+        return os.path.normpath(os.path.join(wd, path))
+
+    # Build edges are nodes too, so that their inputs lead to their outputs
+    users: T.Dict[str, T.Set[str]] = {}
+    paths: T.Dict[str, str] = {}
+    edges: T.List[T.Tuple[str, str]] = []
+    for line in run_tool('graph', 'all', 'meson-test-prereq', 'meson-benchmark-prereq', 'build.ninja').splitlines():
+        m = _GRAPH_NODE_RE.match(line)
+        if m:
+            if not m.group(3):
+                paths[m.group(1)] = normalize(m.group(2))
+            continue
+        m = _GRAPH_EDGE_RE.match(line)
+        if m:
+            edges.append((m.group(1), m.group(2)))
+    for source, dest in edges:
+        users.setdefault(paths.get(source, source), set()).add(paths.get(dest, dest))
+
+    # Headers and other files found by the compilers are not in the graph
+    output = ''
+    for line in run_tool('deps').splitlines():
+        if not line.strip():
+            continue
+        if line.startswith((' ', '\t')):
+            users.setdefault(normalize(line.strip()), set()).add(output)
+        else:
+            output = normalize(line.split(': #deps', 1)[0])
+
+    affected = set(changed)
+    pending = list(changed)
+    while pending:
+        for user in users.get(pending.pop(), ()):
+            if user not in affected:
+                affected.add(user)
+                pending.append(user)
+    if normalize('build.ninja') in affected:
+        return None
+    return affected
+
+def merge_results(options: argparse.Namespace) -> int:
+    '''Combine the JSON and JUnit logs of several runs, e.g. of the shards
+       of the tests, into one of each in the log directory of the build
+       directory, or the directory itself if it has none'''
+    if not options.args:
+        print('No log files to merge given.')
+        return 1
+    logdir = os.path.join(options.wd, 'meson-logs')
+    if not os.path.isdir(logdir):
+        logdir = options.wd
+    logfile_base = os.path.join(logdir, options.logbase)
+
+    # Everything is read before writing, as the output may be an input
+    lines: T.List[str] = []
+    results: T.List[TestResult] = []
+    suites: T.List[et.Element] = []
+    for fname in options.args:
+        try:
+            if fname.endswith('.xml'):
+                root = et.parse(fname).getroot()
+                suites.extend([root] if root.tag == 'testsuite' else root.findall('testsuite'))
+            else:
+                with open(fname, encoding='utf-8') as f:
+                    for line in f:
+                        if line.strip():
+                            results.append(TestResult(json.loads(line)['result']))
+                            lines.append(line.rstrip('\n'))
+        except (OSError, ValueError, KeyError, TypeError, et.ParseError) as e:
+            print(f'Could not read log file {fname!r}: {e}')
+            return 1
+
+    if lines:
+        with open(logfile_base + '.json', 'w', encoding='utf-8') as f:
+            f.writelines(line + '\n' for line in lines)
+    if suites:
+        root = et.Element('testsuites', tests='0', errors='0', failures='0')
+        for suite in suites:
+            root.append(suite)
+            for attr in ['tests', 'errors', 'failures']:
+                root.attrib[attr] = str(int(root.attrib[attr]) + int(suite.get(attr, '0')))
+        with open(logfile_base + '.junit.xml', 'wb') as f:
+            et.ElementTree(root).write(f, encoding='utf-8', xml_declaration=True)
+
+    if not lines:
+        # JUnit logs count the results of TAP tests one by one
+        return int(root.attrib['errors']) + int(root.attrib['failures']) if suites else 0
+    print(format_result_counts(
+        results.count(TestResult.OK), results.count(TestResult.EXPECTEDFAIL),
+        sum(results.count(r) for r in (TestResult.FAIL, TestResult.ERROR, TestResult.INTERRUPT)),
+        results.count(TestResult.UNEXPECTEDPASS), results.count(TestResult.SKIP),
+        results.count(TestResult.TIMEOUT)))
+    return sum(1 for r in results if r.is_bad())
+
 def run(options: argparse.Namespace) -> int:
+    if options.merge_results:
+        return merge_results(options)
+
     if options.benchmark or options.interactive:
         options.num_processes = 1
 
@@ -16,6 +16,7 @@ from .interpreter.type_checking import NoneType, in_set_validator
 
 if T.TYPE_CHECKING:
     from . import coredata
+    from .astcache import ASTCache
     from .interpreterbase import TYPE_var, TYPE_kwargs
     from .interpreterbase import SubProject
     from typing_extensions import TypedDict, Literal
@@ -79,14 +80,17 @@ class OptionInterpreter:
         }
         self.optionstore = optionstore
 
-    def process(self, option_file: str) -> None:
+    def process(self, option_file: str, ast_cache: T.Optional[ASTCache] = None) -> None:
         try:
             with open(option_file, encoding='utf-8') as f:
                 code = f.read()
         except UnicodeDecodeError as e:
             raise mesonlib.MesonException(f'Malformed option file {option_file!r} failed to parse as unicode: {e}')
         try:
-            ast = mparser.Parser(code, option_file).parse()
+            if ast_cache is not None:
+                ast = ast_cache.parse(code, option_file)
+            else:
+                ast = mparser.Parser(code, option_file).parse()
         except mesonlib.MesonException as me:
             me.file = option_file
             raise me
@@ -75,6 +75,7 @@ _BUILTIN_NAMES = {
     'auto_features',
     'backend',
     'buildtype',
+    'check_cache_dir',
     'debug',
     'default_library',
     'default_both_libraries',
@@ -83,7 +84,10 @@ _BUILTIN_NAMES = {
     'install_umask',
     'layout',
     'optimization',
+    'pkg_config_impl',
     'prefer_static',
+    'prefetch_checks',
+    'prune_subprojects',
     'stdsplit',
     'strip',
     'unity',
@@ -683,6 +687,7 @@ BUILTIN_CORE_OPTIONS: T.Dict['OptionKey', 'BuiltinOption'] = OrderedDict([
      ),
     (OptionKey('buildtype'),       BuiltinOption(UserComboOption, 'Build type to use', 'debug',
                                                  choices=buildtypelist)),
+    (OptionKey('check_cache_dir'), BuiltinOption(UserStringOption, 'Directory to share compiler check results in between build directories', '')),
     (OptionKey('debug'),           BuiltinOption(UserBooleanOption, 'Enable debug symbols and other information', True)),
     (OptionKey('default_library'), BuiltinOption(UserComboOption, 'Default library type', 'shared', choices=['shared', 'static', 'both'],
                                                  yielding=False)),
@@ -691,7 +696,10 @@ BUILTIN_CORE_OPTIONS: T.Dict['OptionKey', 'BuiltinOption'] = OrderedDict([
     (OptionKey('install_umask'),   BuiltinOption(UserUmaskOption, 'Default umask to apply on permissions of installed files', '022')),
     (OptionKey('layout'),          BuiltinOption(UserComboOption, 'Build directory layout', 'mirror', choices=['mirror', 'flat'])),
     (OptionKey('optimization'),    BuiltinOption(UserComboOption, 'Optimization level', '0', choices=['plain', '0', 'g', '1', '2', '3', 's'])),
+    (OptionKey('pkg_config_impl'), BuiltinOption(UserComboOption, 'pkg-config implementation to use', 'cli', choices=['cli', 'native'])),
     (OptionKey('prefer_static'),   BuiltinOption(UserBooleanOption, 'Whether to try static linking before shared linking', False)),
+    (OptionKey('prefetch_checks'), BuiltinOption(UserBooleanOption, 'Run the compiler checks of each project ahead concurrently', False)),
+    (OptionKey('prune_subprojects'), BuiltinOption(UserBooleanOption, 'Only generate the targets of subprojects that the main project uses', False)),
     (OptionKey('stdsplit'),        BuiltinOption(UserBooleanOption, 'Split stdout and stderr in test logs', True)),
     (OptionKey('strip'),           BuiltinOption(UserBooleanOption, 'Strip targets on install', False)),
     (OptionKey('unity'),           BuiltinOption(UserComboOption, 'Unity build', 'off', choices=['on', 'off', 'subprojects'])),
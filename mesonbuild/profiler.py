@@ -0,0 +1,198 @@
+# SPDX-License-Identifier: Apache-2.0
+# Copyright 2025 The Meson development team
+
+"""Wall time profiling of ``meson setup``.
+
+When enabled with ``meson setup --profile-report``, spans of work that are
+interesting to a project author (build files, interpreter function calls,
+subprojects, dependency lookups, compiler checks and backend phases) are
+recorded. At the end of the setup they are written out twice: as a report
+aggregating the time spent per category and name, and as a Chrome trace
+event file that can be loaded in chrome://tracing or https://ui.perfetto.dev.
+
+While profiling is disabled, :func:`span` returns a shared no-op context
+manager, so instrumentation can stay in hot code paths. Where even building
+the name and arguments of a span costs too much, callers check
+:func:`is_enabled` first and use :data:`NULL_SPAN` otherwise.
+"""
+
+from __future__ import annotations
+
+import contextlib
+import json
+import os
+import threading
+import time
+import typing as T
+from dataclasses import dataclass
+
+if T.TYPE_CHECKING:
+    from types import TracebackType
+
+    SpanArg = T.Union[str, int]
+
+REPORT_FILENAME = 'profile-report.json'
+TRACE_FILENAME = 'profile-trace.json'
+
+# Number of individual spans listed in the report, slowest first
+SLOWEST_COUNT = 50
+
+
+@dataclass
+class Span:
+
+    name: str
+    category: str
+    start: float
+    duration: float
+    thread: int
+    args: T.Dict[str, SpanArg]
+
+    @property
+    def end(self) -> float:
+        return self.start + self.duration
+
+
+class _Recorder:
+
+    def __init__(self, name: str, category: str, args: T.Dict[str, SpanArg]):
+        self.name = name
+        self.category = category
+        self.args = args
+        self.start = 0.0
+
+    def __enter__(self) -> None:
+        self.start = time.perf_counter()
+
+    def __exit__(self, exc_type: T.Optional[T.Type[BaseException]],
+                 exc_value: T.Optional[BaseException],
+                 traceback: T.Optional[TracebackType]) -> None:
+        duration = time.perf_counter() - self.start
+        # list.append is atomic, spans may be recorded from worker threads
+        _spans.append(Span(self.name, self.category, self.start - _start, duration,
+                           threading.get_ident(), self.args))
+
+
+_enabled = False
+_start = 0.0
+_spans: T.List[Span] = []
+NULL_SPAN: T.ContextManager[None] = contextlib.nullcontext()
+
+
+def enable() -> None:
+    global _enabled, _start
+    _enabled = True
+    _start = time.perf_counter()
+    _spans.clear()
+
+
+def disable() -> None:
+    global _enabled
+    _enabled = False
+
+
+def is_enabled() -> bool:
+    return _enabled
+
+
+def span(name: str, category: str, **args: SpanArg) -> T.ContextManager[None]:
+    """Record the wall time spent in a with block.
+
+    :param name: What is being done, e.g. the name of a function or dependency
+    :param category: The kind of work, spans are aggregated per category
+    :param args: Additional details shown in the trace, e.g. a location
+    """
+    if not _enabled:
+        return NULL_SPAN
+    return _Recorder(name, category, args)
+
+
+def get_spans() -> T.List[Span]:
+    return list(_spans)
+
+
+def _self_times(spans: T.List[Span]) -> T.List[float]:
+    """Duration of each span minus the duration of the spans of the same
+    category directly nested in it, e.g. the time spent in a build file
+    without the time spent in the build files of its subdirectories."""
+    result = [s.duration for s in spans]
+    stacks: T.Dict[T.Tuple[int, str], T.List[int]] = {}
+    order = sorted(range(len(spans)), key=lambda i: (spans[i].start, -spans[i].duration))
+    for i in order:
+        s = spans[i]
+        stack = stacks.setdefault((s.thread, s.category), [])
+        while stack and spans[stack[-1]].end <= s.start:
+            stack.pop()
+        if stack:
+            result[stack[-1]] -= s.duration
+        stack.append(i)
+    return result
+
+
+def make_report(spans: T.List[Span], total: float) -> T.Dict[str, T.Any]:
+    self_times = _self_times(spans)
+    categories: T.Dict[str, T.Dict[str, T.Dict[str, T.Any]]] = {}
+    for s, self_time in zip(spans, self_times):
+        entry = categories.setdefault(s.category, {}).setdefault(
+            s.name, {'name': s.name, 'count': 0, 'total': 0.0, 'self': 0.0, 'max': 0.0})
+        entry['count'] += 1
+        entry['total'] += s.duration
+        entry['self'] += self_time
+        entry['max'] = max(entry['max'], s.duration)
+
+    for entries in categories.values():
+        for entry in entries.values():
+            for k in ('total', 'self', 'max'):
+                entry[k] = round(entry[k], 6)
+
+    slowest = sorted(spans, key=lambda s: s.duration, reverse=True)[:SLOWEST_COUNT]
+    return {
+        'version': 1,
+        'total': round(total, 6),
+        'categories': {
+            cat: sorted(entries.values(), key=lambda e: e['total'], reverse=True)
+            for cat, entries in sorted(categories.items())
+        },
+        'slowest': [
+            {'name': s.name, 'category': s.category, 'start': round(s.start, 6),
+             'duration': round(s.duration, 6), **s.args}
+            for s in slowest
+        ],
+    }
+
+
+def make_trace(spans: T.List[Span]) -> T.Dict[str, T.Any]:
+    pid = os.getpid()
+    events: T.List[T.Dict[str, T.Any]] = [
+        {'name': 'process_name', 'ph': 'M', 'pid': pid, 'tid': 0, 'args': {'name': 'meson setup'}},
+    ]
+    main_thread = threading.main_thread().ident
+    for tid in sorted({s.thread for s in spans}):
+        name = 'main' if tid == main_thread else f'worker {tid}'
+        events.append({'name': 'thread_name', 'ph': 'M', 'pid': pid, 'tid': tid, 'args': {'name': name}})
+    for s in sorted(spans, key=lambda s: (s.start, -s.duration)):
+        events.append({
+            'name': s.name,
+            'cat': s.category,
+            'ph': 'X',
+            'ts': round(s.start * 1e6, 3),
+            'dur': round(s.duration * 1e6, 3),
+            'pid': pid,
+            'tid': s.thread,
+            'args': s.args,
+        })
+    return {'traceEvents': events, 'displayTimeUnit': 'ms'}
+
+
+def write_report(log_dir: str) -> T.Tuple[str, str]:
+    """Write the report and the trace of everything recorded since profiling
+    was enabled to ``log_dir``, and return their paths."""
+    total = time.perf_counter() - _start
+    spans = get_spans()
+    report = os.path.join(log_dir, REPORT_FILENAME)
+    with open(report, 'w', encoding='utf-8') as f:
+        json.dump(make_report(spans, total), f, indent=2)
+    trace = os.path.join(log_dir, TRACE_FILENAME)
+    with open(trace, 'w', encoding='utf-8') as f:
+        json.dump(make_trace(spans), f)
+    return report, trace
@@ -16,9 +16,10 @@ from pathlib import Path
 
 from . import mesonlib
 from . import mlog
-from .mesonlib import MachineChoice, OrderedSet
+from .mesonlib import MachineChoice, OrderedSet, file_stamp
 
 if T.TYPE_CHECKING:
+    from .mesonlib import FileStamp
     from .environment import Environment
     from .interpreter import Interpreter
 
@@ -105,6 +106,11 @@ class ExternalProgram(mesonlib.HoldableObject):
         return ' '.join(self.command)
 
     def get_version(self, interpreter: T.Optional['Interpreter'] = None) -> str:
+        if not self.cached_version and _program_cache is not None:
+            self.cached_version = _program_cache.get_version(self.command, self.version_arg, self.path)
+            if self.cached_version and interpreter:
+                # Running it would have done this
+                interpreter.add_build_def_file(self.get_path())
         if not self.cached_version:
             raw_cmd = self.get_command() + [self.version_arg]
             if interpreter:
@@ -129,6 +135,8 @@ class ExternalProgram(mesonlib.HoldableObject):
             if not match:
                 raise mesonlib.MesonException(f'Could not find a version number in output of {raw_cmd!r}')
             self.cached_version = match.group(1)
+            if _program_cache is not None:
+                _program_cache.store_version(self.command, self.version_arg, self.path, self.cached_version)
         return self.cached_version
 
     @classmethod
@@ -321,7 +329,7 @@ class ExternalProgram(mesonlib.HoldableObject):
         if exclude_paths:
             paths = OrderedSet(path.split(os.pathsep)).difference(exclude_paths)
             path = os.pathsep.join(paths)
-        command = shutil.which(name, path=path)
+        command = _which(name, path)
         if mesonlib.is_windows():
             return self._search_windows_special_cases(name, command, exclude_paths)
         # On UNIX-like platforms, shutil.which() is enough to find
@@ -368,6 +376,102 @@ class OverrideProgram(ExternalProgram):
         super().__init__(name, command=command, silent=silent,
                          search_dirs=search_dirs, exclude_paths=exclude_paths)
 
+
+class ProgramCache:
+
+    """Results of searching programs in PATH, and of their versions.
+
+    The same programs are searched for over and over by projects, subprojects
+    and modules, each time stat()ing them in every directory in PATH, and
+    their versions are found by running them. This is stored in the coredata,
+    so that it is kept across reconfigurations.
+
+    Every entry is checked once per configuration, before it is first used:
+    a program that was found is still valid if it did not change and no
+    directory searched before the one it is in did either, as adding or
+    removing a file changes the modification time of its directory. A program
+    that was not found is still valid if no directory in PATH changed. The
+    version of a program is valid as long as the program did not change.
+    """
+
+    def __init__(self) -> None:
+        # (name, PATH) -> (program or None, stamps of the searched directories and of the program)
+        self.lookups: T.Dict[T.Tuple[str, str], T.Tuple[T.Optional[str], T.Tuple[FileStamp, ...]]] = {}
+        # (command, version argument) -> (version, stamp of the program)
+        self.versions: T.Dict[T.Tuple[T.Tuple[T.Optional[str], ...], str], T.Tuple[str, FileStamp]] = {}
+        self.validated: T.Set[T.Tuple[T.Hashable, ...]] = set()
+
+    def __getstate__(self) -> T.Dict[str, T.Any]:
+        state = self.__dict__.copy()
+        # Entries must be checked again by the next configuration
+        state['validated'] = set()
+        return state
+
+    def clear(self) -> None:
+        self.lookups.clear()
+        self.versions.clear()
+        self.validated.clear()
+
+    @staticmethod
+    def _lookup_stamps(command: T.Optional[str], path: str) -> T.Tuple[FileStamp, ...]:
+        stamps: T.List[FileStamp] = []
+        found_dir = os.path.dirname(command) if command else None
+        for d in path.split(os.pathsep):
+            if d == found_dir:
+                break
+            stamps.append(file_stamp(d or os.curdir))
+        if command:
+            stamps.append(file_stamp(command))
+        return tuple(stamps)
+
+    def which(self, name: str, path: str) -> T.Optional[str]:
+        key = (name, path)
+        entry = self.lookups.get(key)
+        if entry is not None:
+            if key in self.validated:
+                return entry[0]
+            if self._lookup_stamps(entry[0], path) == entry[1]:
+                self.validated.add(key)
+                return entry[0]
+        command = shutil.which(name, path=path)
+        self.lookups[key] = (command, self._lookup_stamps(command, path))
+        self.validated.add(key)
+        return command
+
+    def get_version(self, command: T.List[T.Optional[str]], version_arg: str, path: T.Optional[str]) -> T.Optional[str]:
+        key = (tuple(command), version_arg)
+        entry = self.versions.get(key)
+        if entry is None or path is None:
+            return None
+        if key not in self.validated:
+            if file_stamp(path) != entry[1]:
+                return None
+            self.validated.add(key)
+        return entry[0]
+
+    def store_version(self, command: T.List[T.Optional[str]], version_arg: str, path: T.Optional[str], version: str) -> None:
+        if path is None:
+            return
+        key = (tuple(command), version_arg)
+        self.versions[key] = (version, file_stamp(path))
+        self.validated.add(key)
+
+
+_program_cache: T.Optional[ProgramCache] = None
+
+def set_program_cache(cache: T.Optional[ProgramCache]) -> None:
+    """Set the cache used for all program lookups, or disable caching."""
+    global _program_cache
+    _program_cache = cache
+
+def _which(name: str, path: str) -> T.Optional[str]:
+    # On Windows the result also depends on the working directory and on
+    # PATHEXT, and names with a directory are only looked up once.
+    if _program_cache is None or mesonlib.is_windows() or os.path.dirname(name):
+        return shutil.which(name, path=path)
+    return _program_cache.which(name, path)
+
+
 def find_external_program(env: 'Environment', for_machine: MachineChoice, name: str,
                           display_name: str, default_names: T.List[str],
                           allow_default_for_cross: bool = True,
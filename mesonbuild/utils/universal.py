@@ -52,6 +52,8 @@ if T.TYPE_CHECKING:
     _PL = T.TypeVar('_PL', bound=T.Union[_EnvPickleLoadable, _VerPickleLoadable])
 
 FileOrString = T.Union['File', str]
+# The mtime and size of a file or directory, None if it does not exist
+FileStamp = T.Optional[T.Tuple[int, int]]
 
 _T = T.TypeVar('_T')
 _U = T.TypeVar('_U')
@@ -69,6 +71,7 @@ __all__ = [
     'MachineChoice',
     'EnvironmentException',
     'FileOrString',
+    'FileStamp',
     'GitException',
     'dump_conf_header',
     'OrderedSet',
@@ -102,6 +105,7 @@ __all__ = [
     'do_replacement',
     'expand_arguments',
     'extract_as_list',
+    'file_stamp',
     'first',
     'generate_list',
     'get_compiler_for_source',
@@ -1949,6 +1953,15 @@ def windows_proof_rm(fpath: T.Union[str, Path]) -> None:
     os.unlink(fpath)
 
 
+def file_stamp(path: str) -> FileStamp:
+    """The stat of a file or directory, to find out whether it changed."""
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return st.st_mtime_ns, st.st_size
+
+
 class TemporaryDirectoryWinProof(TemporaryDirectory):
     """
     Like TemporaryDirectory, but cleans things up using
@@ -2126,6 +2139,7 @@ _BUILTIN_NAMES = {
     'auto_features',
     'backend',
     'buildtype',
+    'check_cache_dir',
     'debug',
     'default_library',
     'errorlogs',
@@ -2133,7 +2147,10 @@ _BUILTIN_NAMES = {
     'install_umask',
     'layout',
     'optimization',
+    'pkg_config_impl',
     'prefer_static',
+    'prefetch_checks',
+    'prune_subprojects',
     'stdsplit',
     'strip',
     'unity',
@@ -31,6 +31,7 @@ modules = [
     'mesonbuild/ast/postprocess.py',
     'mesonbuild/ast/visitor.py',
     'mesonbuild/arglist.py',
+    'mesonbuild/astcache.py',
     'mesonbuild/backend/backends.py',
     'mesonbuild/backend/nonebackend.py',
     # 'mesonbuild/coredata.py',
@@ -38,6 +39,7 @@ modules = [
     'mesonbuild/envconfig.py',
     'mesonbuild/interpreter/compiler.py',
     'mesonbuild/interpreter/mesonmain.py',
+    'mesonbuild/interpreter/prefetch.py',
     'mesonbuild/interpreter/interpreterobjects.py',
     'mesonbuild/interpreter/type_checking.py',
     'mesonbuild/machinefile.py',
@@ -80,6 +82,7 @@ modules = [
     'mesonbuild/mtest.py',
     'mesonbuild/optinterpreter.py',
     'mesonbuild/options.py',
+    'mesonbuild/profiler.py',
     'mesonbuild/programs.py',
 ]
 additional = [
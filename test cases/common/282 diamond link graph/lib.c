@@ -0,0 +1,3 @@
+int FUNC(void) {
+    return 0;
+}
@@ -0,0 +1,7 @@
+int top(void);
+int level24(void);
+int level0(void);
+
+int main(void) {
+    return top() + level24() + level0();
+}
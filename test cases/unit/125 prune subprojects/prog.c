@@ -0,0 +1,5 @@
+int used(void);
+
+int main(void) {
+    return used();
+}
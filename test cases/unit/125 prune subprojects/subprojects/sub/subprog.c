@@ -0,0 +1,5 @@
+int unused(void);
+
+int main(void) {
+    return unused();
+}
@@ -0,0 +1,5 @@
+int helper(void);
+
+int used(void) {
+    return helper();
+}
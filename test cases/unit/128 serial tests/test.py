@@ -0,0 +1,9 @@
+#!/usr/bin/env python3
+
+import sys
+import time
+
+name, duration, log = sys.argv[1:]
+with open(log, 'a', encoding='utf-8') as f:
+    f.write(name + '\n')
+time.sleep(float(duration))
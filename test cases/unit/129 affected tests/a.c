@@ -0,0 +1,5 @@
+#include "a.h"
+
+int a(void) {
+    return 0;
+}
@@ -0,0 +1 @@
+int a(void);
@@ -0,0 +1,3 @@
+int b(void) {
+    return 0;
+}
@@ -0,0 +1,6 @@
+#!/usr/bin/env python3
+
+import sys
+
+with open(sys.argv[1], encoding='utf-8') as f:
+    sys.exit(f.read() != 'data\n')
@@ -0,0 +1,5 @@
+#include "a.h"
+
+int main(void) {
+    return a();
+}
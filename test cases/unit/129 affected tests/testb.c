@@ -0,0 +1,5 @@
+int b(void);
+
+int main(void) {
+    return b();
+}
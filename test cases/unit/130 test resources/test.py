@@ -0,0 +1,11 @@
+#!/usr/bin/env python3
+
+import sys
+import time
+
+name, log = sys.argv[1:]
+with open(log, 'a', encoding='utf-8') as f:
+    f.write(f'start {name}\n')
+time.sleep(0.2)
+with open(log, 'a', encoding='utf-8') as f:
+    f.write(f'end {name}\n')
@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+# SPDX-License-Identifier: Apache-2.0
+# Copyright 2025 The Meson development team
+
+'''Measures how long generating build.ninja takes for a large project.
+
+A synthetic project with the given number of C sources, spread over a number
+of static libraries in subdirectories, is created in a temporary directory
+and configured with the Meson in this source tree (or the one given with
+--meson). The wall time and the peak memory use of the setup are reported.
+
+Peak memory is only available on Unix-like systems.
+'''
+
+import argparse
+import os
+import shlex
+import subprocess
+import sys
+import tempfile
+import time
+import typing as T
+
+try:
+    import resource
+except ImportError:
+    resource = None
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+def write_project(srcdir: str, num_sources: int, num_libs: int) -> None:
+    per_lib = max(1, num_sources // num_libs)
+    libs = []
+    with open(os.path.join(srcdir, 'meson.build'), 'w', encoding='utf-8') as f:
+        f.write("project('ninja-benchmark', 'c')\n\n")
+        for l in range(num_libs):
+            name = f'lib{l}'
+            libs.append(name)
+            f.write(f"subdir('{name}')\n")
+        f.write("\nexecutable('app', 'main.c', link_with: [{}])\n".format(', '.join(libs)))
+    with open(os.path.join(srcdir, 'main.c'), 'w', encoding='utf-8') as f:
+        f.write('int main(void) { return 0; }\n')
+
+    for l, name in enumerate(libs):
+        libdir = os.path.join(srcdir, name)
+        os.mkdir(libdir)
+        sources = []
+        for s in range(per_lib):
+            fname = f'src{s}.c'
+            sources.append(f"'{fname}'")
+            with open(os.path.join(libdir, fname), 'w', encoding='utf-8') as f:
+                f.write(f'int {name}_func{s}(void) {{ return {s}; }}\n')
+        with open(os.path.join(libdir, 'meson.build'), 'w', encoding='utf-8') as f:
+            f.write(f"{name} = static_library('{name}',\n  {', '.join(sources)},\n"
+                    "  c_args: ['-DBENCHMARK', '-DSOME_DEFINE=1'],\n"
+                    "  include_directories: include_directories('.'))\n")
+
+def peak_memory() -> T.Optional[int]:
+    if resource is None:
+        return None
+    maxrss = resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss
+    # Linux reports kilobytes, macOS bytes
+    return maxrss if sys.platform == 'darwin' else maxrss * 1024
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.split('\n', 1)[0])
+    parser.add_argument('--sources', type=int, default=100000,
+                        help='Number of source files (default: %(default)s)')
+    parser.add_argument('--libraries', type=int, default=100,
+                        help='Number of libraries to spread the sources over (default: %(default)s)')
+    parser.add_argument('--meson', default=f'{shlex.quote(sys.executable)} {shlex.quote(os.path.join(ROOT, "meson.py"))}',
+                        help='Meson command to benchmark (default: this source tree)')
+    parser.add_argument('--keep', metavar='DIR',
+                        help='Create the project in DIR and keep it instead of using a temporary directory')
+    options = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        workdir = options.keep or tmpdir
+        srcdir = os.path.join(workdir, 'src')
+        builddir = os.path.join(workdir, 'build')
+        os.makedirs(srcdir)
+        print(f'Creating project with {options.sources} sources in {srcdir}')
+        write_project(srcdir, options.sources, options.libraries)
+
+        cmd = shlex.split(options.meson) + ['setup', builddir, srcdir]
+        start = time.perf_counter()
+        p = subprocess.run(cmd, stdout=subprocess.DEVNULL)
+        elapsed = time.perf_counter() - start
+        if p.returncode != 0:
+            print('Configuring the project failed')
+            return p.returncode
+
+        size = os.path.getsize(os.path.join(builddir, 'build.ninja'))
+        print(f'Wall time:       {elapsed:.2f} s')
+        peak = peak_memory()
+        if peak is not None:
+            print(f'Peak memory:     {peak / 2**20:.1f} MiB')
+        print(f'build.ninja:     {size / 2**20:.1f} MiB')
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
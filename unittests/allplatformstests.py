@@ -652,12 +652,338 @@ class AllPlatformTests(BasePlatformTests):
         self.build()
         self.run_tests()
 
+    def test_backend_split_ninja(self):
+        if self.backend is not Backend.ninja:
+            raise SkipTest(f'{self.backend.name!r} backend can\'t split build files')
+        testdir = self.copy_srcdir(os.path.join(self.common_test_dir, '112 subdir subproject'))
+        self.init(testdir, extra_args=['-Dbackend_split_ninja=true'])
+        fragments = [os.path.join(self.privatedir, 'ninja', d, 'build.ninja')
+                     for d in ['prog', os.path.join('subprojects', 'sub')]]
+        with open(os.path.join(self.builddir, 'build.ninja'), encoding='utf-8') as f:
+            build_ninja = f.read()
+        for fname in fragments:
+            self.assertPathExists(fname)
+            relname = os.path.relpath(fname, self.builddir).replace('\\', '/')
+            self.assertIn(f'subninja {relname}', build_ninja)
+        self.build()
+        self.run_tests()
+
+        # Unchanged fragments must not be rewritten
+        mtimes = [os.stat(f).st_mtime_ns for f in fragments]
+        self.utime(os.path.join(testdir, 'meson.build'))
+        self.init(testdir, extra_args=['--reconfigure'])
+        self.assertEqual(mtimes, [os.stat(f).st_mtime_ns for f in fragments])
+        self.assertBuildIsNoop()
+
+        self.setconf('-Dbackend_split_ninja=false')
+        self.build()
+        self.assertPathDoesNotExist(os.path.join(self.privatedir, 'ninja'))
+        self.assertBuildIsNoop()
+
+    def test_shared_compile_args(self):
+        if self.backend is not Backend.ninja:
+            raise SkipTest(f'{self.backend.name!r} backend does not use ninja variables')
+        testdir = os.path.join(self.common_test_dir, '120 extract all shared library')
+        self.init(testdir)
+        with open(os.path.join(self.builddir, 'build.ninja'), encoding='utf-8') as f:
+            build_ninja = f.read()
+        # Both libraries have two C sources, which share their arguments
+        variables = re.findall(r'^(c_ARGS_\w+) = ', build_ninja, re.MULTILINE)
+        self.assertEqual(len(variables), 2, msg=build_ninja)
+        for var in variables:
+            self.assertIn(f' ARGS = ${var}\n', build_ninja)
+        # The variables are expanded by ninja
+        for cmd in self.get_compdb():
+            self.assertNotIn('$', cmd['command'])
+        self.build()
+        self.run_tests()
+        self.assertBuildIsNoop()
+
+    def test_check_cache_dir(self):
+        testdir = os.path.join(self.common_test_dir, '30 sizeof')
+        with tempfile.TemporaryDirectory() as cachedir:
+            self.init(testdir, extra_args=[f'--check-cache-dir={cachedir}'])
+            self.assertNotIn('Using cached compile', self.get_meson_log_raw())
+            self.assertTrue(os.listdir(cachedir))
+            self.new_builddir()
+            self.init(testdir, extra_args=[f'--check-cache-dir={cachedir}'])
+            self.assertIn('Using cached compile', self.get_meson_log_raw())
+
+    def test_profile_report(self):
+        testdir = os.path.join(self.common_test_dir, '98 subproject subdir')
+        self.init(testdir, extra_args=['--profile-report'])
+        with open(os.path.join(self.logdir, 'profile-report.json'), encoding='utf-8') as f:
+            report = json.load(f)
+        categories = report['categories']
+        names = {cat: {e['name'] for e in entries} for cat, entries in categories.items()}
+        self.assertIn('meson.build', names['build file'])
+        self.assertIn(os.path.join('subprojects', 'sub', 'lib', 'meson.build'), names['build file'])
+        self.assertIn('dependency', names['function'])
+        self.assertIn('sub', names['subproject'])
+        self.assertIn('interpreter', names['phase'])
+        self.assertTrue(names['backend target'])
+        self.assertLessEqual({'compile', 'link'}, names['backend step'])
+        for entries in categories.values():
+            for e in entries:
+                self.assertLessEqual(e['self'], e['total'])
+                self.assertLessEqual(e['total'], report['total'])
+        with open(os.path.join(self.logdir, 'profile-trace.json'), encoding='utf-8') as f:
+            trace = json.load(f)
+        events = [e for e in trace['traceEvents'] if e['ph'] == 'X']
+        self.assertEqual(len(events), sum(e['count'] for entries in categories.values() for e in entries))
+
+    def test_ast_cache(self):
+        with tempfile.TemporaryDirectory() as srcdir:
+            with open(os.path.join(srcdir, 'meson.build'), 'w', encoding='utf-8') as f:
+                f.write("project('ast cache')\nsubdir('sub')\nmessage('value is', v)\n")
+            os.mkdir(os.path.join(srcdir, 'sub'))
+            subfile = os.path.join(srcdir, 'sub', 'meson.build')
+            with open(subfile, 'w', encoding='utf-8') as f:
+                f.write("v = 'one'\n")
+            out = self.init(srcdir)
+            self.assertIn('value is one', out)
+            cachedir = os.path.join(self.privatedir, 'ast-cache')
+            self.assertEqual(len(os.listdir(cachedir)), 2)
+            inodes = {e.name: e.inode() for e in os.scandir(cachedir)}
+
+            # Changed files are parsed again and replace their entry, the
+            # entries of unchanged files are not written again
+            with open(subfile, 'w', encoding='utf-8') as f:
+                f.write("v = 'two'\n")
+            out = self.init(srcdir, extra_args=['--reconfigure'])
+            self.assertIn('value is two', out)
+            new_inodes = {e.name: e.inode() for e in os.scandir(cachedir)}
+            self.assertEqual(new_inodes.keys(), inodes.keys())
+            self.assertEqual(len(set(new_inodes.items()) - set(inodes.items())), 1)
+
+            # Files with warnings from the parser are not cached, so that
+            # they are shown again
+            with open(subfile, 'w', encoding='utf-8') as f:
+                f.write("return = 'three'\nv = return\n")
+            for _ in range(2):
+                out = self.init(srcdir, extra_args=['--reconfigure'])
+                self.assertIn('value is three', out)
+                self.assertIn("Identifier 'return' will become a reserved keyword", out)
+
+    def test_prune_subprojects(self):
+        testdir = os.path.join(self.unit_test_dir, '125 prune subprojects')
+        self.init(testdir)
+        names = {t['name'] for t in self.introspect('--targets')}
+        self.assertEqual(names, {'prog', 'used', 'helper', 'unused', 'subprog'})
+        self.assertEqual([t['name'] for t in self.introspect('--tests')], ['subtest'])
+
+        self.new_builddir()
+        out = self.init(testdir, extra_args=['-Dprune_subprojects=true'])
+        self.assertIn('Unused targets of subprojects removed: 2', out)
+        names = {t['name'] for t in self.introspect('--targets')}
+        self.assertEqual(names, {'prog', 'used', 'helper'})
+        self.assertEqual(self.introspect('--tests'), [])
+        self.build()
+
+    def test_prefetch_checks(self):
+        testdir = os.path.join(self.unit_test_dir, '126 prefetch checks')
+        # By default checks are only run when the evaluation reaches them
+        self.init(testdir, override_envvars={'MESON_NUM_PROCESSES': '4'})
+        log = self.get_meson_log_raw()
+        self.assertNotIn('Prefetching', log)
+        self.assertNotIn('unreached-header.h', log)
+
+        self.new_builddir()
+        out = self.init(testdir, extra_args=['-Dprefetch_checks=true'], override_envvars={'MESON_NUM_PROCESSES': '4'})
+        log = self.get_meson_log_raw()
+        self.assertIn('Prefetching 7 compiler checks', log)
+        self.assertIn('unreached-header.h', log)
+        # Prefetched results were not found by an earlier run
+        self.assertRegex(out, r'Has header "stdio.h" : YES \n')
+        self.assertRegex(out, r'Checking for type "size_t" : YES \n')
+        self.assertRegex(out, r'Has header "stdlib.h" : YES \n')
+        self.assertNotIn('(cached)', out)
+
+        self.new_builddir()
+        out = self.init(testdir, extra_args=['-Dprefetch_checks=true'], override_envvars={'MESON_NUM_PROCESSES': '1'})
+        self.assertNotIn('Prefetching', self.get_meson_log_raw())
+        self.assertNotIn('(cached)', out)
+
     def test_testrepeat(self):
         testdir = os.path.join(self.common_test_dir, '206 tap tests')
         self.init(testdir)
         self.build()
         self._run(self.mtest_command + ['--repeat=2'])
 
+    def test_test_durations(self):
+        testdir = os.path.join(self.unit_test_dir, '127 test durations')
+        self.init(testdir)
+        self.build()
+        started = os.path.join(self.builddir, 'started.txt')
+
+        def run() -> T.Tuple[T.List[str], str]:
+            if os.path.exists(started):
+                os.unlink(started)
+            out = self._run(self.mtest_command + ['--num-processes=2'])
+            with open(started, encoding='utf-8') as f:
+                return f.read().splitlines(), out
+
+        # Without history the tests start in declaration order; the first
+        # two start at the same time
+        order, out = run()
+        self.assertEqual(set(order[:2]), {'urgent', 'fast 1'})
+        self.assertEqual(order[2:], ['fast 2', 'slow'])
+        self.assertRegex(out, r'Critical path:\s+1\.\d+s \(longest test: slow\)')
+        with open(os.path.join(self.privatedir, 'meson_test_durations.json'), encoding='utf-8') as f:
+            self.assertEqual(len(json.load(f)['test_durations/slow']), 1)
+
+        # Then the longest start first, after those with a higher priority
+        order, _ = run()
+        self.assertEqual(set(order[:2]), {'urgent', 'slow'})
+        self.assertEqual(order[2:], ['fast 1', 'fast 2'])
+
+    def test_serial_tests(self):
+        testdir = os.path.join(self.unit_test_dir, '128 serial tests')
+        self.init(testdir)
+        self.build()
+        started = os.path.join(self.builddir, 'started.txt')
+
+        def run(*args: str) -> T.Tuple[T.List[str], str]:
+            if os.path.exists(started):
+                os.unlink(started)
+            out = self._run(self.mtest_command + ['--num-processes=2', *args])
+            with open(started, encoding='utf-8') as f:
+                return f.read().splitlines(), out
+
+        # Running the serial tests last saves waiting for parallel 1 and 2
+        order, out = run()
+        self.assertEqual(order, ['parallel 1', 'serial 1', 'parallel 2', 'serial 2', 'parallel 3'])
+        self.assertRegex(out, r'Serial tests last:\s+\d+\.\d+s faster \(estimated\)')
+        order, out = run('--serial-tests=end')
+        self.assertEqual(set(order[:2]), {'parallel 1', 'parallel 2'})
+        self.assertEqual(order[2:], ['parallel 3', 'serial 1', 'serial 2'])
+        self.assertRegex(out, r'Serial tests last:\s+\d+\.\d+s faster \(estimated\)')
+
+    def test_test_shards(self):
+        import xml.etree.ElementTree as et
+
+        testdir = os.path.join(self.unit_test_dir, '127 test durations')
+        self.init(testdir)
+        self.build()
+        started = os.path.join(self.builddir, 'started.txt')
+
+        partitions: T.List[str] = []
+
+        def run(shard: str, *args: str) -> T.Set[str]:
+            if os.path.exists(started):
+                os.unlink(started)
+            out = self._run(self.mtest_command + [f'--shard={shard}', *args])
+            partitions.append(re.search(r'partition ([0-9a-f]+)', out).group(1))
+            if not os.path.exists(started):
+                return set()
+            with open(started, encoding='utf-8') as f:
+                return set(f.read().splitlines())
+
+        # Without history all tests count as long, and are dealt out in
+        # the order of priority
+        self.assertEqual(run('1/2'), {'urgent', 'fast 2'})
+        self.assertEqual(run('2/2'), {'fast 1', 'slow'})
+        self.assertEqual(run('5/5'), set())
+        self._run(self.mtest_command)
+        # The slow test takes longer than all others together. Each shard
+        # records its durations, so the shards share a copy of them.
+        shared = os.path.join(self.builddir, 'shared-durations.json')
+        shutil.copy(os.path.join(self.privatedir, 'meson_test_durations.json'), shared)
+        partitions.clear()
+        self.assertEqual(run('1/2', f'--durations={shared}'), {'slow'})
+        self.assertEqual(run('2/2', f'--durations={shared}'), {'fast 1', 'fast 2', 'urgent'})
+        self.assertEqual(partitions[0], partitions[1])
+        with self.assertRaises(subprocess.CalledProcessError):
+            self._run(self.mtest_command + ['--shard=3/2'])
+
+        logs = [os.path.join(self.logdir, f'testlog-shard{i}of2{ext}')
+                for i in (1, 2) for ext in ('.json', '.junit.xml')]
+        out = self._run(self.mtest_command + ['--merge-results'] + logs)
+        self.assertRegex(out, r'Ok:\s+4')
+        with open(os.path.join(self.logdir, 'testlog.json'), encoding='utf-8') as f:
+            self.assertEqual(sorted(json.loads(l)['name'] for l in f),
+                             ['fast 1', 'fast 2', 'slow', 'urgent'])
+        root = et.parse(os.path.join(self.logdir, 'testlog.junit.xml')).getroot()
+        self.assertEqual(root.attrib['tests'], '4')
+
+        # The exit status counts the failures of all logs
+        failed = os.path.join(self.builddir, 'failed.json')
+        with open(failed, 'w', encoding='utf-8') as f:
+            f.write(json.dumps({'name': 'other', 'result': 'FAIL'}) + '\n')
+        p = subprocess.run(self.mtest_command + ['--merge-results', failed] + logs,
+                           stdout=subprocess.PIPE, stderr=subprocess.STDOUT, text=True)
+        self.assertEqual(p.returncode, 1)
+        self.assertRegex(p.stdout, r'Fail:\s+1')
+
+        # Other durations give other parts, and another partition hash
+        with open(shared, 'w', encoding='utf-8') as f:
+            json.dump({'test_durations/urgent': [5.0], 'test_durations/slow': [0.1],
+                       'test_durations/fast 1': [0.1], 'test_durations/fast 2': [0.1]}, f)
+        self.assertEqual(run('1/2', f'--durations={shared}'), {'urgent'})
+        self.assertNotEqual(partitions[2], partitions[0])
+        with self.assertRaises(subprocess.CalledProcessError):
+            self._run(self.mtest_command + ['--durations=does-not-exist.json'])
+
+    def test_affected_by(self):
+        if self.backend is not Backend.ninja:
+            raise SkipTest(f'Selecting affected tests is only supported with Ninja, not {self.backend.name}')
+        testdir = os.path.join(self.unit_test_dir, '129 affected tests')
+        srcdir = os.path.join(self.builddir, 'src')
+        shutil.copytree(testdir, srcdir)
+        git_init(srcdir)
+        self.new_builddir()
+        self.init(srcdir)
+        self.build()
+        changes = os.path.join(self.builddir, 'changes.txt')
+
+        def affected(*files: str) -> T.Set[str]:
+            with open(changes, 'w', encoding='utf-8') as f:
+                f.write(''.join(n + '\n' for n in files))
+            p = subprocess.run(self.mtest_command + ['--list', f'--affected-by={changes}'],
+                               stdout=subprocess.PIPE, text=True)
+            return set(p.stdout.splitlines())
+
+        # Headers are found through the dependencies of the last build
+        self.assertEqual(affected('a.h'), {'a'})
+        self.assertEqual(affected('b.c'), {'b'})
+        self.assertEqual(affected('data.txt'), {'data'})
+        self.assertEqual(affected('check.py'), {'data'})
+        self.assertEqual(affected('a.c', os.path.join(srcdir, 'b.c')), {'a', 'b'})
+        self.assertEqual(affected('README'), set())
+        self.assertEqual(affected('meson.build'), {'a', 'b', 'data'})
+
+        with open(os.path.join(srcdir, 'b.c'), 'a', encoding='utf-8') as f:
+            f.write('/* changed */\n')
+        out = self._run(self.mtest_command + ['--affected-by=HEAD'])
+        self.assertRegex(out, r'1/1 b\s+OK')
+        _git_add_all(srcdir)
+        out = self._run(self.mtest_command + ['--affected-by=HEAD'])
+        self.assertIn('No tests affected by the changes.', out)
+
+    def test_test_resources(self):
+        testdir = os.path.join(self.unit_test_dir, '130 test resources')
+        self.init(testdir)
+        self.build()
+        log = os.path.join(self.builddir, 'log.txt')
+        out = self._run(self.mtest_command + ['--num-processes=2', '--memory-budget=150'])
+        self.assertRegex(out, r'Processor use:\s+\d+% of 2 processes')
+        self.assertRegex(out, r'Memory reserved:\s+at most 150 of 150 MB')
+
+        # At no time do the running tests use more than the budget
+        cpus = {'heavy': 2}
+        memory = {'big 1': 100, 'big 2': 100, 'huge': 150}
+        running: T.Set[str] = set()
+        with open(log, encoding='utf-8') as f:
+            for line in f:
+                event, name = line.strip().split(' ', 1)
+                if event == 'start':
+                    running.add(name)
+                    self.assertLessEqual(sum(cpus.get(n, 1) for n in running), 2, running)
+                    self.assertLessEqual(sum(memory.get(n, 0) for n in running), 150, running)
+                else:
+                    running.remove(name)
+        self.assertEqual(running, set())
+
     def test_verbose(self):
         testdir = os.path.join(self.common_test_dir, '206 tap tests')
         self.init(testdir)
@@ -1406,6 +1732,22 @@ class AllPlatformTests(BasePlatformTests):
             for src in t['target_sources']:
                 self.assertTrue(expected.issubset(set(src['parameters'])), f'Incorrect values for {t["name"]}')
 
+    def test_cross_compute_int(self):
+        testdir = os.path.join(self.common_test_dir, '1 trivial')
+        env = get_fake_env(testdir, self.builddir, self.prefix)
+        cc = detect_c_compiler(env, MachineChoice.HOST)
+        if not hasattr(cc, 'cross_compute_int'):
+            raise SkipTest('Only C-like compilers implement cross_compute_int')
+        for expression, value in [('0', 0), ('-12345', -12345), ('1 << 20', 1 << 20),
+                                  ('-2147483647 - 1', -2147483648),
+                                  ('sizeof(char)', 1), ('sizeof(struct {char c[37];})', 37)]:
+            with self.subTest(expression):
+                self.assertEqual(cc._compute_int_from_object(expression, '', env, [], []), value)
+                self.assertEqual(cc.cross_compute_int(expression, None, None, None, '', env, [], []), value)
+        self.assertIsNone(cc._compute_int_from_object('not_a_constant', '', env, [], []))
+        with self.assertRaises(EnvironmentException):
+            cc.cross_compute_int('100', 0, 10, None, '', env, [], [])
+
     def test_dist_git(self):
         if not shutil.which('git'):
             raise SkipTest('Git not found')
@@ -26,7 +26,7 @@ import mesonbuild.envconfig
 import mesonbuild.environment
 import mesonbuild.modules.gnome
 import mesonbuild.scripts.env2mfile
-from mesonbuild import coredata
+from mesonbuild import coredata, mparser
 from mesonbuild.compilers.c import ClangCCompiler, GnuCCompiler
 from mesonbuild.compilers.cpp import VisualStudioCPPCompiler
 from mesonbuild.compilers.d import DmdDCompiler
@@ -35,12 +35,14 @@ from mesonbuild.interpreterbase import typed_pos_args, InvalidArguments, ObjectH
 from mesonbuild.interpreterbase import typed_pos_args, InvalidArguments, typed_kwargs, ContainerTypeInfo, KwargInfo
 from mesonbuild.mesonlib import (
     LibType, MachineChoice, PerMachine, Version, is_windows, is_osx,
-    is_cygwin, is_openbsd, search_version, MesonException, python_command,
+    is_cygwin, is_openbsd, search_version, MesonException, python_command, File,
 )
 from mesonbuild.options import OptionKey
+from mesonbuild.interpreter.interpreter import InstallableFiles
 from mesonbuild.interpreter.type_checking import in_set_validator, NoneType
 from mesonbuild.dependencies.pkgconfig import PkgConfigDependency, PkgConfigInterface, PkgConfigCLI
-from mesonbuild.programs import ExternalProgram
+from mesonbuild.programs import ExternalProgram, ProgramCache
+from mesonbuild.mtest import simulate_schedule
 import mesonbuild.modules.pkgconfig
 from mesonbuild import utils
 
@@ -128,6 +130,33 @@ class InternalTests(unittest.TestCase):
         a += ['-I.', '-I./tests2/']
         self.assertEqual(a, ['-I.', '-I./tests2/', '-I./tests/', '-I..'])
 
+    def test_compiler_args_class_unique_after_removal(self):
+        cc = ClangCCompiler([], [], 'fake', MachineChoice.HOST, False, mock.Mock())
+        a = cc.compiler_args(['-c', '-lfoo'])
+        a += ['-lfoo', '-pipe']
+        self.assertEqual(a, ['-c', '-lfoo', '-pipe'])
+        # Unique args that were removed can be added again
+        a.remove('-lfoo')
+        a += ['-lfoo']
+        self.assertEqual(a, ['-c', '-pipe', '-lfoo'])
+        a[0] = '-S'
+        a += ['-c', '-S']
+        self.assertEqual(a, ['-S', '-pipe', '-lfoo', '-c'])
+
+    def test_compiler_args_class_to_native_copy(self):
+        cc = ClangCCompiler([], [], 'fake', MachineChoice.HOST, False, mock.Mock())
+        cc.get_default_include_dirs = lambda: []
+        # A compiler whose native syntax is the same, returning the list as is
+        cc.unix_args_to_native = lambda args: args
+        a = cc.compiler_args(['-c', '-lfoo'])
+        a += ['-lfoo']
+        # Mutating the native list does not affect the de-duplication
+        native = a.to_native()
+        native.remove('-lfoo')
+        self.assertEqual(a, ['-c', '-lfoo'])
+        a += ['-lfoo']
+        self.assertEqual(a.to_native(), ['-c', '-lfoo'])
+
     def test_compiler_args_class_d(self):
         d = DmdDCompiler([], 'fake', MachineChoice.HOST, 'info', 'arch')
         # check include order is kept when deduplicating
@@ -1362,6 +1391,24 @@ class InternalTests(unittest.TestCase):
 
         _(None, mock.Mock(), [], {})
 
+    def test_typed_kwarg_default_not_shared(self) -> None:
+        seen: T.List[T.Tuple[T.List[str], T.Dict[str, str], str]] = []
+        @typed_kwargs(
+            'testfunc',
+            KwargInfo('list', ContainerTypeInfo(list, str), default=[]),
+            KwargInfo('dict', ContainerTypeInfo(dict, str), default={}),
+            KwargInfo('str', str, default='default'),
+        )
+        def _(obj, node, args: T.Tuple, kwargs: T.Dict[str, T.Any]) -> None:
+            seen.append((kwargs['list'].copy(), kwargs['dict'].copy(), kwargs['str']))
+            kwargs['list'].append('mutated')
+            kwargs['dict']['key'] = 'mutated'
+
+        # Mutable defaults are copied for each call, immutable ones are shared
+        _(None, mock.Mock(), [], {})
+        _(None, mock.Mock(), [], {})
+        self.assertEqual(seen, [([], {}, 'default'), ([], {}, 'default')])
+
     def test_typed_kwarg_container_pairs(self) -> None:
         @typed_kwargs(
             'testfunc',
@@ -1586,6 +1633,67 @@ class InternalTests(unittest.TestCase):
         _(None, mock.Mock(), [['']], {'input': ['']})
         self.assertRaises(InvalidArguments, _, None, mock.Mock(), [], {'input': 42})
 
+    @unittest.skipIf(is_windows(), 'PATH lookups are not cached on Windows')
+    def test_program_cache(self) -> None:
+        def make_program(d: str) -> str:
+            prog = os.path.join(d, 'prog')
+            with open(prog, 'w', encoding='utf-8') as f:
+                f.write('#!/bin/sh\n')
+            os.chmod(prog, 0o755)
+            # Make sure the directory looks changed, even on file systems
+            # with a coarse timestamp granularity
+            os.utime(d, ns=(os.stat(d).st_atime_ns, os.stat(d).st_mtime_ns + 10**9))
+            return prog
+
+        with tempfile.TemporaryDirectory() as d1, tempfile.TemporaryDirectory() as d2:
+            path = os.pathsep.join([d1, d2])
+            cache = ProgramCache()
+            self.assertIsNone(cache.which('prog', path))
+            prog2 = make_program(d2)
+            # Results are only checked again by the next configuration
+            self.assertIsNone(cache.which('prog', path))
+            cache = pickle.loads(pickle.dumps(cache))
+            self.assertEqual(cache.which('prog', path), prog2)
+
+            # A program earlier in PATH is found by the next configuration
+            prog1 = make_program(d1)
+            self.assertEqual(cache.which('prog', path), prog2)
+            cache = pickle.loads(pickle.dumps(cache))
+            self.assertEqual(cache.which('prog', path), prog1)
+
+            cache.store_version([prog1], '--version', prog1, '1.0')
+            self.assertEqual(cache.get_version([prog1], '--version', prog1), '1.0')
+            self.assertIsNone(cache.get_version([prog1], '-v', prog1))
+            cache = pickle.loads(pickle.dumps(cache))
+            with open(prog1, 'a', encoding='utf-8') as f:
+                f.write('echo 2.0\n')
+            self.assertIsNone(cache.get_version([prog1], '--version', prog1))
+
+    def test_installable_files(self) -> None:
+        srcdir = os.path.abspath('src')
+        index = InstallableFiles(srcdir, os.path.abspath('build'))
+        b = mock.Mock(data=[], install_dirs=[])
+        index.update(b)
+        self.assertFalse(index.contains(Path(srcdir, 'sub', 'data.txt')))
+
+        # New entries are picked up by the next update
+        b.data.append(mock.Mock(sources=[File(False, 'sub', 'data.txt')]))
+        b.install_dirs.append(mock.Mock(source_subdir='sub/share'))
+        index.update(b)
+        self.assertTrue(index.contains(Path(srcdir, 'sub', 'data.txt')))
+        self.assertFalse(index.contains(Path(srcdir, 'sub', 'other.txt')))
+        self.assertTrue(index.contains(Path(srcdir, 'sub', 'share', 'a', 'b.txt')))
+        self.assertTrue(index.contains(Path(srcdir, 'sub', 'shared.txt')))
+        self.assertFalse(index.contains(Path(srcdir, 'sub', 'shar')))
+
+        # The lists are replaced when a subproject is merged
+        b.data = [mock.Mock(sources=[File(False, 'sub', 'other.txt')])]
+        b.install_dirs = []
+        index.update(b)
+        self.assertFalse(index.contains(Path(srcdir, 'sub', 'data.txt')))
+        self.assertTrue(index.contains(Path(srcdir, 'sub', 'other.txt')))
+        self.assertFalse(index.contains(Path(srcdir, 'sub', 'share', 'a', 'b.txt')))
+
     def test_detect_cpu_family(self) -> None:
         """Test the various cpu families that we detect and normalize.
 
@@ -2132,3 +2240,47 @@ class InternalTests(unittest.TestCase):
                 self.assertEqual(actual.compile_args, expected.compile_args)
                 self.assertEqual(actual.link_args, expected.link_args)
                 self.assertEqual(actual.cmake, expected.cmake)
+
+    def test_simulate_schedule(self) -> None:
+        # duration, processors, is_parallel
+        tests = [(5.0, 1, True), (1.0, 1, False), (2.0, 1, True), (1.0, 1, False), (1.0, 1, True)]
+        # Each serial test waits for all tests before it
+        self.assertEqual(simulate_schedule(tests, 2), 10.0)
+        # The parallel tests run together, the serial ones after them
+        tests.sort(key=lambda t: not t[2])
+        self.assertEqual(simulate_schedule(tests, 2), 7.0)
+        # Tests start in order, once enough processors are free
+        self.assertEqual(simulate_schedule([(1.0, 1, True), (1.0, 2, True), (1.0, 1, True)], 2), 3.0)
+        self.assertEqual(simulate_schedule([(1.0, 4, True), (1.0, 1, True)], 2), 2.0)
+
+    def test_lexer(self):
+        code = textwrap.dedent('''\
+            x += f'@a@' + 'b\\'c' # comment
+            if x <= 0x1F and y != 0o7 or not z >= 10
+              foo(a, b: [1, {'k': 2}], \\
+                  c: f\'\'\'
+            d\'\'\' == true)
+            endif
+            ''')
+        tokens = [(t.tid, t.lineno, t.colno, t.value) for t in mparser.Lexer(code).lex('meson.build')]
+        self.assertEqual([t for t in tokens if t[0] != 'whitespace'], [
+            ('id', 1, 0, 'x'), ('plusassign', 1, 2, '+='), ('fstring', 1, 5, '@a@'), ('plus', 1, 12, '+'),
+            ('string', 1, 14, "b\\'c"), ('comment', 1, 21, '# comment'), ('eol', 1, 30, '\n'),
+            ('if', 2, 0, 'if'), ('id', 2, 3, 'x'), ('le', 2, 5, '<='), ('number', 2, 8, '0x1F'),
+            ('and', 2, 13, 'and'), ('id', 2, 17, 'y'), ('nequal', 2, 19, '!='), ('number', 2, 22, '0o7'),
+            ('or', 2, 26, 'or'), ('not', 2, 29, 'not'), ('id', 2, 33, 'z'), ('ge', 2, 35, '>='),
+            ('number', 2, 38, '10'), ('eol', 2, 40, '\n'),
+            ('id', 3, 2, 'foo'), ('lparen', 3, 5, '('), ('id', 3, 6, 'a'), ('comma', 3, 7, ','),
+            ('id', 3, 9, 'b'), ('colon', 3, 10, ':'), ('lbracket', 3, 12, '['), ('number', 3, 13, '1'),
+            ('comma', 3, 14, ','), ('lcurl', 3, 16, '{'), ('string', 3, 17, 'k'), ('colon', 3, 20, ':'),
+            ('number', 3, 22, '2'), ('rcurl', 3, 23, '}'), ('rbracket', 3, 24, ']'), ('comma', 3, 25, ','),
+            ('id', 4, 6, 'c'), ('colon', 4, 7, ':'), ('multiline_fstring', 4, 9, '\nd'),
+            ('equal', 5, 2, '=='), ('true', 5, 5, 'true'), ('rparen', 5, 9, ')'), ('eol', 5, 10, '\n'),
+            ('endif', 6, 0, 'endif'), ('eol', 6, 5, '\n'),
+        ])
+        with self.assertRaises(mparser.ParseException) as cm:
+            list(mparser.Lexer('x = "a"\n').lex('meson.build'))
+        self.assertEqual((cm.exception.lineno, cm.exception.colno), (1, 4))
+        with self.assertRaises(mparser.ParseException) as cm:
+            list(mparser.Lexer('x = 1\ny = $\n').lex('meson.build'))
+        self.assertEqual((cm.exception.lineno, cm.exception.colno), (2, 3))
@@ -35,7 +35,8 @@ from mesonbuild.compilers.c import AppleClangCCompiler
 from mesonbuild.compilers.cpp import AppleClangCPPCompiler
 from mesonbuild.compilers.objc import AppleClangObjCCompiler
 from mesonbuild.compilers.objcpp import AppleClangObjCPPCompiler
-from mesonbuild.dependencies.pkgconfig import PkgConfigDependency, PkgConfigCLI, PkgConfigInterface
+from mesonbuild.dependencies.base import DependencyException
+from mesonbuild.dependencies.pkgconfig import PkgConfigDependency, PkgConfigCLI, PkgConfigInterface, PkgConfigNative
 from mesonbuild.programs import NonExistingExternalProgram
 import mesonbuild.modules.pkgconfig
 
@@ -1141,6 +1142,91 @@ class LinuxlikeTests(BasePlatformTests):
         pkg_config_path = env.coredata.optstore.get_value('pkg_config_path')
         self.assertEqual(pkg_config_path, [pkg_dir])
 
+    @skipIfNoPkgconfig
+    def test_pkgconfig_cache(self):
+        pkg_dir = self.builddir
+        foo_pc = os.path.join(pkg_dir, 'foo.pc')
+        bar_pc = os.path.join(pkg_dir, 'bar.pc')
+        with open(foo_pc, 'w', encoding='utf-8') as f:
+            f.write('Name: foo\nDescription: foo\nVersion: 1.0\nRequires: bar >= 2\nCflags: -DFOO\nLibs: -lfoo\n')
+        with open(bar_pc, 'w', encoding='utf-8') as f:
+            f.write('Name: bar\nDescription: bar\nVersion: 2.0\nCflags: -DBAR\nLibs: -lbar\n')
+
+        env = get_fake_env(self.builddir, self.builddir, self.prefix)
+        env.coredata.set_options({OptionKey('pkg_config_path'): pkg_dir}, subproject='')
+
+        def query() -> T.Tuple[T.List[str], int]:
+            # A new instance checks the cached results again, like a reconfigure
+            cli = PkgConfigCLI(env, MachineChoice.HOST, silent=True)
+            with mock.patch('mesonbuild.dependencies.pkgconfig.Popen_safe_logged',
+                            wraps=mesonbuild.dependencies.pkgconfig.Popen_safe_logged) as popen:
+                result = [cli.version('foo'), *cli.cflags('foo'), *cli.libs('foo', allow_system=True)]
+            return result, popen.call_count
+
+        expected = ['1.0', '-DFOO', '-DBAR', '-lfoo', '-lbar']
+        result, calls = query()
+        self.assertEqual(result, expected)
+        self.assertGreater(calls, 0)
+        self.assertEqual(query(), (expected, 0))
+
+        # Changing a required module invalidates the results
+        with open(bar_pc, 'w', encoding='utf-8') as f:
+            f.write('Name: bar\nDescription: bar\nVersion: 2.0\nCflags: -DBAR2\nLibs: -lbar\n')
+        os.utime(bar_pc, ns=(os.stat(bar_pc).st_atime_ns, os.stat(bar_pc).st_mtime_ns + 10**9))
+        result, calls = query()
+        self.assertEqual(result, ['1.0', '-DFOO', '-DBAR2', '-lfoo', '-lbar'])
+        self.assertGreater(calls, 0)
+
+        # Only the queries of foo were run again, not those of pkg-config itself
+        env.coredata.clear_cache()
+        self.assertGreater(query()[1], calls)
+
+        # The cflags of private requirements are not left out
+        with open(os.path.join(pkg_dir, 'baz.pc'), 'w', encoding='utf-8') as f:
+            f.write('Name: baz\nDescription: baz\nVersion: 1.0\nRequires.private: bar\nCflags: -DBAZ\nLibs: -lbaz\n')
+        cli = PkgConfigCLI(env, MachineChoice.HOST, silent=True)
+        self.assertEqual(cli.cflags('baz'), ['-DBAZ', '-DBAR2'])
+        self.assertEqual(cli.libs('baz', allow_system=True), ['-lbaz'])
+
+    def test_pkgconfig_native(self):
+        pkg_dir = self.builddir
+        files = {
+            'foo': ('prefix=/opt/foo\nincludedir=${prefix}/include\nlibdir=${prefix}/lib\n'
+                    'Name: foo\nDescription: foo\nVersion: 1.0\n'
+                    'Requires: bar >= 2, baz\nRequires.private: qux\n'
+                    'Cflags: -I${includedir} -DFOO -I/usr/include # comment\n'
+                    'Libs: -L${libdir} -lfoo \\\n  -lm\nLibs.private: -lpthread\n'),
+            'bar': 'Name: bar\nDescription: bar\nVersion: 2.0\nRequires: common\nCflags: -DBAR -pthread\nLibs: -L/opt/bar/lib -lbar -lm\n',
+            'baz': 'Name: baz\nDescription: baz\nVersion: 1.0\nRequires: common\nCflags: -DBAZ -isystem /opt/baz\nLibs: -lbaz\n',
+            'common': 'Name: common\nDescription: common\nVersion: 1.0\nCflags: -I/opt/common/include -pthread\nLibs: -lcommon\n',
+            'qux': 'Name: qux\nDescription: qux\nVersion: 1.0\nCflags: -I/opt/qux/include\nLibs: -lqux\nLibs.private: -lquxpriv\n',
+            'qux-uninstalled': 'Name: qux\nDescription: qux\nVersion: 1.1\nCflags: -I${pcfiledir}/qux\nLibs: -lqux\n',
+            'old': 'Name: old\nDescription: old\nVersion: 1.0\nRequires: bar > 2\n',
+        }
+        for name, content in files.items():
+            with open(os.path.join(pkg_dir, name + '.pc'), 'w', encoding='utf-8') as f:
+                f.write(content)
+
+        env = get_fake_env(self.builddir, self.builddir, self.prefix)
+        env.coredata.set_options({OptionKey('pkg_config_path'): pkg_dir}, subproject='')
+        cli = PkgConfigCLI(env, MachineChoice.HOST, silent=True)
+        native = PkgConfigNative(env, MachineChoice.HOST, silent=True)
+        self.assertTrue(native.found())
+        for name in ['foo', 'qux', 'old', 'missing']:
+            self.assertEqual(native.version(name), cli.version(name))
+        for allow_system in [False, True]:
+            self.assertEqual(native.cflags('foo', allow_system), cli.cflags('foo', allow_system))
+            self.assertEqual(native.libs('foo', False, allow_system), cli.libs('foo', False, allow_system))
+        self.assertEqual(native.libs('qux', True), cli.libs('qux', True))
+        define = (('prefix', '/usr/local'),)
+        for variable in ['libdir', 'pcfiledir', 'missing']:
+            self.assertEqual(native.variable('foo', variable, None), cli.variable('foo', variable, None))
+            self.assertEqual(native.variable('foo', variable, define), cli.variable('foo', variable, define))
+        self.assertEqual(native.cflags('foo', define_variable=define), cli.cflags('foo', define_variable=define))
+        self.assertTrue(set(files).issubset(native.list_all()))
+        with self.assertRaises(DependencyException):
+            native.cflags('missing')
+
     def test_pkgconfig_uninstalled_env_added(self):
         '''
         Checks that the meson-uninstalled dir is added to PKG_CONFIG_PATH